@@ -5,9 +5,11 @@ Supports: Groq.com, Google Gemini, xAI Grok
 import os
 import json
 import re
-import requests
 import time
 
+from llm_cache import cache_enabled, cache_key, get_cached, store_result
+from http_pool import get_session, hedged_call, HEDGE_DELAY
+
 # Try to import google.generativeai for Gemini
 try:
     import google.generativeai as genai
@@ -20,18 +22,18 @@ GROQ_API_KEY = os.environ.get('GROQ_API_KEY')  # Groq.com (fast)
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY') or os.environ.get('GOOGLE_API_KEY')
 GROK_API_KEY = os.environ.get('GROK_API_KEY') or os.environ.get('XAI_API_KEY')  # xAI
 
-def analyze_with_groq(transcript: str, video_duration: float = None) -> dict:
-    """Analyze transcript using Groq.com API (fast LLM inference)"""
-    if not GROQ_API_KEY:
-        raise Exception("Groq not available - missing GROQ_API_KEY")
-    
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    prompt = f"""Analyze this video transcript and find the MOST VIRAL/ENGAGING 60-second segment.
+# Models per provider (part of the response cache key)
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GEMINI_MODEL = "models/gemini-2.0-flash"
+GROK_MODEL = "grok-2-latest"
+
+# Bump when the analysis prompt changes so cached results are not reused
+PROMPT_VERSION = 2
+
+# Per-request timeout (seconds) for every provider
+REQUEST_TIMEOUT = 60
+
+SEGMENT_PROMPT = """Analyze this video transcript and find the MOST VIRAL/ENGAGING 60-second segment.
 
 Look for:
 - Emotional moments (surprise, humor, drama)
@@ -40,41 +42,104 @@ Look for:
 - Hook-worthy content
 
 Transcript:
-{transcript[:15000]}
+{transcript}
 
 Return JSON only:
 {{"start": seconds, "end": seconds, "reason": "why this is viral", "hook": "attention-grabbing 5-word summary"}}"""
+
+
+def _default_segment(reason: str, hook: str = "Check this out") -> dict:
+    """Placeholder segment used when a provider gives no usable answer (never cached)"""
+    return {"start": 30, "end": 90, "reason": reason, "hook": hook, "fallback": True}
+
+
+def _parse_segment(text: str) -> dict:
+    """Pull the JSON object out of a model reply (raises if there is none)"""
+    # Remove markdown code blocks
+    text = re.sub(r'```json\s*', '', text)
+    text = re.sub(r'```\s*', '', text)
+    
+    json_match = re.search(r'\{[^{}]+\}', text, re.DOTALL)
+    if not json_match:
+        raise ValueError(f"No JSON in response: {text[:200]}")
+    return json.loads(json_match.group())
+
+
+def _is_valid_segment(result) -> bool:
+    return bool(result) and 'start' in result and 'end' in result
+
+
+def _chat_completion(url: str, api_key: str, payload: dict) -> dict:
+    """POST an OpenAI-style chat completion over the shared keep-alive session"""
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    response = get_session().post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
     
-    payload = {
-        "model": "llama-3.3-70b-versatile",
+    result = response.json()
+    return _parse_segment(result['choices'][0]['message']['content'].strip())
+
+
+def request_groq(transcript: str) -> dict:
+    """Groq.com segment request - raises on any failure"""
+    if not GROQ_API_KEY:
+        raise Exception("Groq not available - missing GROQ_API_KEY")
+    
+    return _chat_completion("https://api.groq.com/openai/v1/chat/completions", GROQ_API_KEY, {
+        "model": GROQ_MODEL,
         "messages": [
             {"role": "system", "content": "You are a viral content expert. Respond with JSON only."},
-            {"role": "user", "content": prompt}
+            {"role": "user", "content": SEGMENT_PROMPT.format(transcript=transcript[:15000])}
         ],
         "temperature": 0.7,
         "max_tokens": 1000
-    }
+    })
+
+
+def request_gemini(transcript: str) -> dict:
+    """Google Gemini segment request - raises on any failure"""
+    if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
+        raise Exception("Gemini not available - missing API key or package")
+    
+    genai.configure(api_key=GEMINI_API_KEY)
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    
+    response = model.generate_content(
+        SEGMENT_PROMPT.format(transcript=transcript[:15000]),
+        request_options={"timeout": REQUEST_TIMEOUT}
+    )
+    return _parse_segment(response.text.strip())
+
+
+def request_grok(transcript: str) -> dict:
+    """xAI Grok segment request - raises on any failure"""
+    if not GROK_API_KEY:
+        raise Exception("Grok not available - missing XAI_API_KEY")
+    
+    return _chat_completion("https://api.x.ai/v1/chat/completions", GROK_API_KEY, {
+        "model": GROK_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are a viral content expert. Respond with JSON only."},
+            {"role": "user", "content": SEGMENT_PROMPT.format(transcript=transcript[:15000])}
+        ],
+        "temperature": 0.7
+    })
+
+
+def analyze_with_groq(transcript: str, video_duration: float = None) -> dict:
+    """Analyze transcript using Groq.com API (fast LLM inference)"""
+    if not GROQ_API_KEY:
+        raise Exception("Groq not available - missing GROQ_API_KEY")
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = result['choices'][0]['message']['content'].strip()
-        
-        # Remove markdown code blocks
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*', '', text)
-        
-        # Parse JSON from response
-        json_match = re.search(r'\{[^{}]+\}', text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group())
+        return request_groq(transcript)
     except Exception as e:
         print(f"Groq error: {e}")
     
     # Default fallback
-    return {"start": 30, "end": 90, "reason": "Default segment", "hook": "Check this out"}
+    return _default_segment("Default segment")
 
 
 def analyze_with_gemini(transcript: str, video_duration: float = None) -> dict:
@@ -82,36 +147,13 @@ def analyze_with_gemini(transcript: str, video_duration: float = None) -> dict:
     if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
         raise Exception("Gemini not available - missing API key or package")
     
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('models/gemini-2.0-flash')
-    
-    prompt = f"""Analyze this video transcript and find the MOST VIRAL/ENGAGING 60-second segment.
-    
-Look for:
-- Emotional moments (surprise, humor, drama)
-- Key insights or revelations
-- Quotable/memorable statements
-- Hook-worthy content
-
-Transcript:
-{transcript[:15000]}
-
-Return JSON only:
-{{"start": seconds, "end": seconds, "reason": "why this is viral", "hook": "attention-grabbing 5-word summary"}}"""
-    
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        
-        # Parse JSON from response
-        json_match = re.search(r'\{[^{}]+\}', text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group())
+        return request_gemini(transcript)
     except Exception as e:
         print(f"Gemini error: {e}")
     
     # Default fallback
-    return {"start": 30, "end": 90, "reason": "Default segment", "hook": "Check this out"}
+    return _default_segment("Default segment")
 
 
 def analyze_with_grok(transcript: str, video_duration: float = None) -> dict:
@@ -119,54 +161,31 @@ def analyze_with_grok(transcript: str, video_duration: float = None) -> dict:
     if not GROK_API_KEY:
         raise Exception("Grok not available - missing XAI_API_KEY")
     
-    url = "https://api.x.ai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROK_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    prompt = f"""Analyze this video transcript and find the MOST VIRAL/ENGAGING 60-second segment.
-
-Look for:
-- Emotional moments (surprise, humor, drama)
-- Key insights or revelations  
-- Quotable/memorable statements
-- Hook-worthy content
-
-Transcript:
-{transcript[:15000]}
-
-Return JSON only:
-{{"start": seconds, "end": seconds, "reason": "why this is viral", "hook": "attention-grabbing 5-word summary"}}"""
-    
-    payload = {
-        "model": "grok-2-latest",
-        "messages": [
-            {"role": "system", "content": "You are a viral content expert. Respond with JSON only."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7
-    }
-    
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = result['choices'][0]['message']['content'].strip()
-        
-        # Parse JSON from response
-        json_match = re.search(r'\{[^{}]+\}', text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group())
+        return request_grok(transcript)
     except Exception as e:
         print(f"Grok error: {e}")
     
     # Default fallback
-    return {"start": 30, "end": 90, "reason": "Default segment", "hook": "Check this out"}
+    return _default_segment("Default segment")
+
+
+def _clamp_segment(result: dict, video_duration: float = None) -> dict:
+    # Clamp to valid range
+    if video_duration:
+        result['start'] = max(0, min(result['start'], video_duration - 60))
+        result['end'] = min(result['end'], video_duration)
+    return result
 
 
-def analyze_transcript_multi(transcript: str, video_duration: float = None, provider: str = "auto") -> dict:
+def analyze_transcript_multi(
+    transcript: str,
+    video_duration: float = None,
+    provider: str = "auto",
+    use_cache: bool = True,
+    hedge: bool = False,
+    hedge_delay: float = HEDGE_DELAY
+) -> dict:
     """
     Analyze transcript using the best available AI provider.
     
@@ -174,6 +193,10 @@ def analyze_transcript_multi(transcript: str, video_duration: float = None, prov
         transcript: The video transcript text
         video_duration: Optional video duration for validation
         provider: "auto", "groq", "gemini", or "grok"
+        use_cache: Reuse/store results in the LLM response cache
+        hedge: Start the next provider if the current one hasn't answered
+               within hedge_delay seconds; the first valid answer wins
+        hedge_delay: Latency budget per provider in hedged mode
     
     Returns:
         dict with start, end, reason, and hook
@@ -185,42 +208,63 @@ def analyze_transcript_multi(transcript: str, video_duration: float = None, prov
     if provider == "auto":
         # Priority: Groq (fastest) > Gemini > Grok (xAI)
         if GROQ_API_KEY:
-            providers.append(("groq", analyze_with_groq))
+            providers.append(("groq", request_groq, GROQ_MODEL))
         if GEMINI_API_KEY and GEMINI_AVAILABLE:
-            providers.append(("gemini", analyze_with_gemini))
+            providers.append(("gemini", request_gemini, GEMINI_MODEL))
         if GROK_API_KEY:
-            providers.append(("grok", analyze_with_grok))
+            providers.append(("grok", request_grok, GROK_MODEL))
     elif provider == "groq":
-        providers.append(("groq", analyze_with_groq))
+        providers.append(("groq", request_groq, GROQ_MODEL))
     elif provider == "gemini":
-        providers.append(("gemini", analyze_with_gemini))
+        providers.append(("gemini", request_gemini, GEMINI_MODEL))
     elif provider == "grok":
-        providers.append(("grok", analyze_with_grok))
+        providers.append(("grok", request_grok, GROK_MODEL))
     
     if not providers:
         print("[AI] No AI providers available! Set GROQ_API_KEY, GEMINI_API_KEY, or GROK_API_KEY")
-        return {"start": 30, "end": 90, "reason": "No AI available", "hook": "Watch this"}
+        return _default_segment("No AI available", "Watch this")
     
-    for name, analyzer in providers:
-        try:
-            print(f"[AI] Trying {name.upper()}...")
-            result = analyzer(transcript, video_duration)
+    caching = cache_enabled(use_cache)
+    models = {name: model for name, _, model in providers}
+    
+    # Any provider's cached answer beats a network round trip
+    if caching:
+        for name, model in models.items():
+            cached = get_cached(cache_key("segment", transcript, name, model, PROMPT_VERSION))
+            if cached:
+                result = _clamp_segment(dict(cached), video_duration)
+                print(f"[AI] Using cached {name.upper()} result: {result['start']}s - {result['end']}s")
+                return result
+    
+    name, result = None, None
+    if hedge and len(providers) > 1:
+        calls = [(n, lambda request=request: request(transcript)) for n, request, _ in providers]
+        name, result = hedged_call(calls, _is_valid_segment, hedge_delay)
+    else:
+        for candidate, request, _ in providers:
+            try:
+                print(f"[AI] Trying {candidate.upper()}...")
+                answer = request(transcript)
+            except Exception as e:
+                print(f"[AI] {candidate.upper()} failed: {e}")
+                continue
             
             # Validate result
-            if result and 'start' in result and 'end' in result:
-                # Clamp to valid range
-                if video_duration:
-                    result['start'] = max(0, min(result['start'], video_duration - 60))
-                    result['end'] = min(result['end'], video_duration)
-                
-                print(f"[AI] {name.upper()} found segment: {result['start']}s - {result['end']}s")
-                return result
-        except Exception as e:
-            print(f"[AI] {name.upper()} failed: {e}")
-            continue
+            if _is_valid_segment(answer):
+                name, result = candidate, answer
+                break
+            print(f"[AI] {candidate.upper()} returned an invalid response")
+    
+    if result is None:
+        print("[AI] All providers failed, using default")
+        return _default_segment("Fallback segment")
+    
+    if caching:
+        store_result(cache_key("segment", transcript, name, models[name], PROMPT_VERSION), dict(result), name, models[name])
     
-    print("[AI] All providers failed, using default")
-    return {"start": 30, "end": 90, "reason": "Fallback segment", "hook": "Check this out"}
+    result = _clamp_segment(result, video_duration)
+    print(f"[AI] {name.upper()} found segment: {result['start']}s - {result['end']}s")
+    return result
 
 
 def analyze_video_multimodal(video_path: str, provider: str = "gemini") -> dict:
@@ -237,7 +281,7 @@ def analyze_video_multimodal(video_path: str, provider: str = "gemini") -> dict:
     """
     if provider != "gemini" or not GEMINI_API_KEY or not GEMINI_AVAILABLE:
         print("[AI] Multimodal analysis only available with Gemini")
-        return {"start": 30, "end": 90, "reason": "Multimodal not available", "hook": "Watch this"}
+        return _default_segment("Multimodal not available", "Watch this")
     
     print(f"[AI] Uploading video for multimodal analysis...")
     
@@ -261,7 +305,7 @@ def analyze_video_multimodal(video_path: str, provider: str = "gemini") -> dict:
             raise Exception(f"Video processing failed: {video_file.state.name}")
         
         # Analyze with Gemini
-        model = genai.GenerativeModel('models/gemini-2.0-flash')
+        model = genai.GenerativeModel(GEMINI_MODEL)
         
         prompt = """Watch this video and find the MOST VIRAL/ENGAGING 60-second segment.
 
@@ -287,7 +331,7 @@ Return JSON only:
     except Exception as e:
         print(f"[AI] Multimodal analysis error: {e}")
     
-    return {"start": 30, "end": 90, "reason": "Multimodal failed", "hook": "Watch this"}
+    return _default_segment("Multimodal failed", "Watch this")
 
 
 # Test function
@@ -18,16 +18,31 @@ else:
 
 import time
 
-def analyze_transcript(transcript_text, duration):
+from llm_cache import cache_enabled, cache_key, get_cached, store_result
+
+MODEL_NAME = 'models/gemini-2.0-flash'
+
+# Bump when the prompt below changes so cached results are not reused
+PROMPT_VERSION = 1
+
+def analyze_transcript(transcript_text, duration, use_cache=True):
     """
     Sends transcript to Gemini to find the most viral/interesting segment.
+    Results are kept in the LLM response cache unless use_cache is False.
     Returns: JSON object {start, end, reason, content}
     """
     if not api_key:
         print("Error: No Gemini API Key provided. Returning default clip.")
         return {"start": 0, "end": 60, "reason": "No API Key", "content_summary": "Default start"}
 
-    model = genai.GenerativeModel('models/gemini-2.0-flash')
+    key = cache_key("viral_segment", transcript_text, "gemini", MODEL_NAME, PROMPT_VERSION, duration)
+    if cache_enabled(use_cache):
+        cached = get_cached(key)
+        if cached:
+            print("Using cached Gemini analysis.")
+            return cached
+
+    model = genai.GenerativeModel(MODEL_NAME)
 
     prompt = f"""
     You are an expert viral video editor. 
@@ -53,6 +68,8 @@ def analyze_transcript(transcript_text, duration):
         response = model.generate_content(prompt)
         text = response.text.replace("```json", "").replace("```", "").strip()
         data = json.loads(text)
+        if cache_enabled(use_cache):
+            store_result(key, data, "gemini", MODEL_NAME)
         return data
     except Exception as e:
         print(f"Error analyzing transcript: {e}")
@@ -81,7 +98,7 @@ def analyze_video_file(video_path):
             raise ValueError("Video processing failed in Gemini.")
 
         print("Analyzing video content...")
-        model = genai.GenerativeModel('models/gemini-2.0-flash')
+        model = genai.GenerativeModel(MODEL_NAME)
         
         prompt = """
         Watch this video carefully. 
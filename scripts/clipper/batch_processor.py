@@ -6,7 +6,9 @@ import os
 import sys
 import json
 import time
+import queue
 import argparse
+import threading
 from datetime import datetime
 from typing import List, Optional
 import subprocess
@@ -19,6 +21,7 @@ from ai_analyzer import analyze_transcript_multi, analyze_video_multimodal
 from cropper import crop_to_vertical
 from montage import create_montage_short
 from scene_splitter import split_at_scenes, find_best_segments
+from cues import load_cues
 
 
 class BatchProcessor:
@@ -27,8 +30,10 @@ class BatchProcessor:
     Processes multiple videos with configurable options.
     """
     
-    def __init__(self, output_dir: str = "output", log_file: str = None):
+    def __init__(self, output_dir: str = "output", log_file: str = None, use_cache: bool = True, hedge: bool = False):
         self.output_dir = output_dir
+        self.use_cache = use_cache
+        self.hedge = hedge
         self.log_file = log_file or os.path.join(output_dir, "batch_log.json")
         self.results = []
         
@@ -39,6 +44,111 @@ class BatchProcessor:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[{timestamp}] {message}")
     
+    def _new_job(self, url: str, mode: str, subtitle_style: str, ai_provider: str, label: str = "") -> dict:
+        """Create the state passed between pipeline stages"""
+        return {
+            "url": url,
+            "mode": mode,
+            "subtitle_style": subtitle_style,
+            "ai_provider": ai_provider,
+            "label": label,
+            "video_path": None,
+            "subtitle_path": None,
+            "video_id": None,
+            "clip_meta": None,
+            "result": {
+                "input": url,
+                "mode": mode,
+                "status": "pending",
+                "output_files": [],
+                "error": None,
+                "started_at": datetime.now().isoformat(),
+                "completed_at": None
+            }
+        }
+    
+    def _stage_download(self, job: dict):
+        """Stage 1 (network): resolve a local file or download the video + subtitles"""
+        url = job["url"]
+        self.log(f"{job['label']}Processing: {url[:80]}...")
+        
+        # Determine if local file or URL
+        if os.path.exists(url):
+            job["video_path"] = url
+            job["subtitle_path"] = self._find_subtitle(url)
+            job["video_id"] = os.path.splitext(os.path.basename(url))[0]
+        else:
+            # Download from YouTube
+            self.log(f"{job['label']}Downloading video...")
+            download_result = download_video(url, self.output_dir) or {}
+            job["video_path"] = download_result.get('video_path')
+            job["subtitle_path"] = download_result.get('subtitle_path')
+            job["video_id"] = download_result.get('id', 'unknown')
+            
+            if not job["video_path"] or not os.path.exists(job["video_path"]):
+                raise Exception("Download failed")
+        
+        self.log(f"{job['label']}Video: {os.path.basename(job['video_path'])}")
+    
+    def _stage_analyze(self, job: dict):
+        """Stage 2 (remote API): pick the segment for single-clip mode"""
+        if job["mode"] != "single":
+            return
+        
+        self.log(f"{job['label']}Analyzing for best segment...")
+        
+        # Get transcript if available
+        transcript = self._read_transcript(job["subtitle_path"])
+        
+        if transcript:
+            clip_meta = analyze_transcript_multi(transcript, provider=job["ai_provider"], use_cache=self.use_cache, hedge=self.hedge)
+        else:
+            clip_meta = analyze_video_multimodal(job["video_path"], provider="gemini")
+        
+        self.log(f"{job['label']}Found segment: {clip_meta.get('start', 0)}s - {clip_meta.get('end', 60)}s")
+        job["clip_meta"] = clip_meta
+    
+    def _stage_render(self, job: dict):
+        """Stage 3 (CPU): encode the output for the selected mode"""
+        mode = job["mode"]
+        video_path = job["video_path"]
+        video_id = job["video_id"]
+        result = job["result"]
+        
+        if mode == "scenes":
+            # Split into scene-based segments
+            self.log(f"{job['label']}Splitting at scene boundaries...")
+            scene_dir = os.path.join(self.output_dir, f"scenes_{video_id}")
+            result["output_files"] = split_at_scenes(video_path, scene_dir)
+            
+        elif mode == "montage":
+            # Create montage compilation
+            self.log(f"{job['label']}Creating montage compilation...")
+            output_path = os.path.join(self.output_dir, f"montage_{video_id}.mp4")
+            create_montage_short(video_path, output_path, duration=30, clip_length=3, subtitle_path=job["subtitle_path"])
+            result["output_files"] = [output_path]
+            
+        else:
+            # Crop to vertical
+            clip_meta = job["clip_meta"] or {}
+            output_path = os.path.join(self.output_dir, f"short_{video_id}.mp4")
+            crop_to_vertical(
+                video_path,
+                output_path,
+                clip_meta.get('start', 0),
+                clip_meta.get('end', 60),
+                subtitle_path=job["subtitle_path"]
+            )
+            result["output_files"] = [output_path]
+        
+        result["status"] = "success"
+        self.log(f"{job['label']}Completed: {len(result['output_files'])} file(s) created")
+    
+    def _fail_job(self, job: dict, error: Exception):
+        job["result"]["status"] = "error"
+        job["result"]["error"] = str(error)
+        self.log(f"{job['label']}Error: {error}")
+    
     def process_url(
         self, 
         url: str, 
@@ -58,89 +168,16 @@ class BatchProcessor:
         Returns:
             Result dict with status and output paths
         """
-        result = {
-            "input": url,
-            "mode": mode,
-            "status": "pending",
-            "output_files": [],
-            "error": None,
-            "started_at": datetime.now().isoformat(),
-            "completed_at": None
-        }
+        job = self._new_job(url, mode, subtitle_style, ai_provider)
         
         try:
-            self.log(f"Processing: {url[:80]}...")
-            
-            # Determine if local file or URL
-            is_local = os.path.exists(url)
-            
-            if is_local:
-                video_path = url
-                subtitle_path = self._find_subtitle(url)
-                video_id = os.path.splitext(os.path.basename(url))[0]
-            else:
-                # Download from YouTube
-                self.log("Downloading video...")
-                download_result = download_video(url, self.output_dir)
-                video_path = download_result.get('video_path')
-                subtitle_path = download_result.get('subtitle_path')
-                video_id = download_result.get('video_id', 'unknown')
-                
-                if not video_path or not os.path.exists(video_path):
-                    raise Exception("Download failed")
-            
-            self.log(f"Video: {os.path.basename(video_path)}")
-            
-            # Process based on mode
-            if mode == "scenes":
-                # Split into scene-based segments
-                self.log("Splitting at scene boundaries...")
-                scene_dir = os.path.join(self.output_dir, f"scenes_{video_id}")
-                output_files = split_at_scenes(video_path, scene_dir)
-                result["output_files"] = output_files
-                
-            elif mode == "montage":
-                # Create montage compilation
-                self.log("Creating montage compilation...")
-                output_path = os.path.join(self.output_dir, f"montage_{video_id}.mp4")
-                create_montage_short(video_path, output_path, duration=30, clip_length=3, subtitle_path=subtitle_path)
-                result["output_files"] = [output_path]
-                
-            else:
-                # Single clip mode - analyze and extract best segment
-                self.log("Analyzing for best segment...")
-                
-                # Get transcript if available
-                transcript = self._read_transcript(subtitle_path)
-                
-                if transcript:
-                    clip_meta = analyze_transcript_multi(transcript, provider=ai_provider)
-                else:
-                    clip_meta = analyze_video_multimodal(video_path, provider="gemini")
-                
-                self.log(f"Found segment: {clip_meta.get('start', 0)}s - {clip_meta.get('end', 60)}s")
-                
-                # Crop to vertical
-                output_path = os.path.join(self.output_dir, f"short_{video_id}.mp4")
-                crop_to_vertical(
-                    video_path,
-                    output_path,
-                    clip_meta.get('start', 0),
-                    clip_meta.get('end', 60),
-                    subtitle_path=subtitle_path
-                )
-                result["output_files"] = [output_path]
-            
-            result["status"] = "success"
-            self.log(f"Completed: {len(result['output_files'])} file(s) created")
-            
+            for stage in (self._stage_download, self._stage_analyze, self._stage_render):
+                stage(job)
         except Exception as e:
-            result["status"] = "error"
-            result["error"] = str(e)
-            self.log(f"Error: {e}")
+            self._fail_job(job, e)
         
-        result["completed_at"] = datetime.now().isoformat()
-        return result
+        job["result"]["completed_at"] = datetime.now().isoformat()
+        return job["result"]
     
     def _find_subtitle(self, video_path: str) -> Optional[str]:
         """Find sidecar subtitle file for a video"""
@@ -159,21 +196,8 @@ class BatchProcessor:
             return ""
         
         try:
-            with open(subtitle_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Strip timestamps
-            import re
-            if subtitle_path.endswith('.srt'):
-                # Remove SRT formatting
-                content = re.sub(r'\d+\n\d{2}:\d{2}:\d{2},\d{3}\s*-->\s*\d{2}:\d{2}:\d{2},\d{3}\n', '', content)
-            else:
-                # Remove VTT formatting
-                content = re.sub(r'\d{2}:\d{2}:\d{2}\.\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}\.\d{3}.*\n', '', content)
-                content = re.sub(r'WEBVTT.*\n', '', content)
-            
-            return content.strip()
-        except:
+            return load_cues(subtitle_path).text()
+        except Exception:
             return ""
     
     def process_batch(
@@ -182,7 +206,11 @@ class BatchProcessor:
         mode: str = "single",
         subtitle_style: str = "tiktok",
         ai_provider: str = "auto",
-        delay: float = 2.0
+        delay: float = 2.0,
+        pipeline: bool = True,
+        download_workers: int = 2,
+        analysis_workers: int = 2,
+        render_workers: int = 1
     ) -> List[dict]:
         """
         Process multiple URLs in batch.
@@ -192,7 +220,11 @@ class BatchProcessor:
             mode: Processing mode for all videos
             subtitle_style: Subtitle style preset
             ai_provider: AI provider for analysis
-            delay: Delay between processing (seconds)
+            delay: Delay between processing (seconds); in pipeline mode, between download starts
+            pipeline: Overlap download, analysis and render of different items
+            download_workers: Concurrent downloads (network bound)
+            analysis_workers: Concurrent AI analysis calls (remote API bound)
+            render_workers: Concurrent encodes (CPU bound)
         
         Returns:
             List of result dicts
@@ -200,21 +232,28 @@ class BatchProcessor:
         self.log(f"Starting batch processing of {len(urls)} items...")
         self.log(f"Mode: {mode}, Style: {subtitle_style}, AI: {ai_provider}")
         
-        results = []
-        
-        for i, url in enumerate(urls):
-            self.log(f"\n=== Item {i+1}/{len(urls)} ===")
+        if pipeline and len(urls) > 1:
+            self.log(f"Pipeline: {download_workers} download / {analysis_workers} analysis / {render_workers} render workers")
+            results = self._process_pipelined(
+                urls, mode, subtitle_style, ai_provider, delay,
+                [download_workers, analysis_workers, render_workers]
+            )
+        else:
+            results = []
             
-            result = self.process_url(url, mode, subtitle_style, ai_provider)
-            results.append(result)
-            
-            # Save progress
-            self._save_results(results)
-            
-            # Delay between items
-            if i < len(urls) - 1:
-                self.log(f"Waiting {delay}s before next item...")
-                time.sleep(delay)
+            for i, url in enumerate(urls):
+                self.log(f"\n=== Item {i+1}/{len(urls)} ===")
+                
+                result = self.process_url(url, mode, subtitle_style, ai_provider)
+                results.append(result)
+                
+                # Save progress
+                self._save_results(results)
+                
+                # Delay between items
+                if i < len(urls) - 1:
+                    self.log(f"Waiting {delay}s before next item...")
+                    time.sleep(delay)
         
         # Final summary
         success = sum(1 for r in results if r['status'] == 'success')
@@ -225,6 +264,84 @@ class BatchProcessor:
         
         return results
     
+    def _process_pipelined(
+        self,
+        urls: List[str],
+        mode: str,
+        subtitle_style: str,
+        ai_provider: str,
+        delay: float,
+        stage_workers: List[int]
+    ) -> List[dict]:
+        """
+        Run download -> analyze -> render as stages with their own worker pools.
+        
+        Stages are connected by bounded queues, so downloads run ahead of the
+        encoder by at most a couple of items instead of filling the disk.
+        Results are returned in input order.
+        """
+        stages = [self._stage_download, self._stage_analyze, self._stage_render]
+        stage_workers = [max(1, n) for n in stage_workers]
+        
+        # inboxes[i] feeds stage i; the last queue collects finished jobs
+        inboxes = [queue.Queue(maxsize=n * 2) for n in stage_workers] + [queue.Queue()]
+        stop = object()
+        remaining = list(stage_workers)
+        lock = threading.Lock()
+        
+        def worker(i):
+            while True:
+                job = inboxes[i].get()
+                if job is stop:
+                    break
+                if job["result"]["status"] != "error":
+                    try:
+                        stages[i](job)
+                    except Exception as e:
+                        self._fail_job(job, e)
+                inboxes[i + 1].put(job)
+            
+            # Last worker out closes the next stage
+            with lock:
+                remaining[i] -= 1
+                closing = remaining[i] == 0
+            if closing:
+                next_workers = stage_workers[i + 1] if i + 1 < len(stages) else 1
+                for _ in range(next_workers):
+                    inboxes[i + 1].put(stop)
+        
+        def feeder():
+            for n, url in enumerate(urls):
+                if n and delay:
+                    time.sleep(delay)
+                inboxes[0].put(self._new_job(url, mode, subtitle_style, ai_provider, f"[{n+1}/{len(urls)}] "))
+            for _ in range(stage_workers[0]):
+                inboxes[0].put(stop)
+        
+        threads = [threading.Thread(target=feeder, daemon=True)]
+        for i, count in enumerate(stage_workers):
+            threads += [threading.Thread(target=worker, args=(i,), daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        
+        by_label = {}
+        done = []
+        while True:
+            job = inboxes[-1].get()
+            if job is stop:
+                break
+            job["result"]["completed_at"] = datetime.now().isoformat()
+            done.append(job["result"])
+            by_label[job["label"]] = job["result"]
+            
+            # Save progress
+            self._save_results(done)
+        
+        for thread in threads:
+            thread.join()
+        
+        return [by_label[f"[{n+1}/{len(urls)}] "] for n in range(len(urls))]
+    
     def _save_results(self, results: List[dict]):
         """Save results to JSON file"""
         try:
@@ -244,7 +361,8 @@ class BatchProcessor:
         input_file: str,
         mode: str = "single",
         subtitle_style: str = "tiktok",
-        ai_provider: str = "auto"
+        ai_provider: str = "auto",
+        **batch_options
     ) -> List[dict]:
         """
         Process URLs from a text file (one URL per line).
@@ -254,6 +372,7 @@ class BatchProcessor:
             mode: Processing mode
             subtitle_style: Subtitle style
             ai_provider: AI provider
+            **batch_options: Passed through to process_batch (delay, pipeline, *_workers)
         
         Returns:
             List of result dicts
@@ -267,7 +386,7 @@ class BatchProcessor:
         
         self.log(f"Loaded {len(urls)} URLs from {input_file}")
         
-        return self.process_batch(urls, mode, subtitle_style, ai_provider)
+        return self.process_batch(urls, mode, subtitle_style, ai_provider, **batch_options)
 
 
 def main():
@@ -288,6 +407,9 @@ Examples:
   # Use specific AI provider
   python batch_processor.py url --ai grok
 
+  # Tune the download/analysis/render pipeline
+  python batch_processor.py --file urls.txt --download-workers 3 --render-workers 2
+
 URLs file format (one per line):
   https://youtube.com/watch?v=xxx
   # Comments start with #
@@ -306,6 +428,18 @@ URLs file format (one per line):
                         default='auto', help='AI provider for analysis')
     parser.add_argument('--delay', '-d', type=float, default=2.0,
                         help='Delay between items (seconds)')
+    parser.add_argument('--sequential', action='store_true',
+                        help='Process one item at a time instead of pipelining stages')
+    parser.add_argument('--download-workers', type=int, default=2,
+                        help='Concurrent downloads in pipeline mode')
+    parser.add_argument('--analysis-workers', type=int, default=2,
+                        help='Concurrent AI analysis calls in pipeline mode')
+    parser.add_argument('--render-workers', type=int, default=1,
+                        help='Concurrent encodes in pipeline mode')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Race the next AI provider when the current one is slow to answer')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call the AI provider instead of reusing cached analyses')
     
     args = parser.parse_args()
     
@@ -313,14 +447,23 @@ URLs file format (one per line):
         parser.print_help()
         return
     
-    processor = BatchProcessor(output_dir=args.output)
+    processor = BatchProcessor(output_dir=args.output, use_cache=not args.no_cache, hedge=args.hedge)
+    
+    batch_options = {
+        "delay": args.delay,
+        "pipeline": not args.sequential,
+        "download_workers": args.download_workers,
+        "analysis_workers": args.analysis_workers,
+        "render_workers": args.render_workers
+    }
     
     if args.file:
         processor.process_from_file(
             args.file,
             mode=args.mode,
             subtitle_style=args.style,
-            ai_provider=args.ai
+            ai_provider=args.ai,
+            **batch_options
         )
     else:
         processor.process_batch(
@@ -328,7 +471,7 @@ URLs file format (one per line):
             mode=args.mode,
             subtitle_style=args.style,
             ai_provider=args.ai,
-            delay=args.delay
+            **batch_options
         )
 
 
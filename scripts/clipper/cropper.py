@@ -1,59 +1,206 @@
 """
 Enhanced Video Cropper with Shorts Compositing
 Uses FFmpeg for subtitle burning (no ImageMagick needed)
+
+The default path renders the whole Short (trim, zoom, canvas, subtitles)
+in a single FFmpeg process. The MoviePy compositor is kept as a fallback.
 """
-from moviepy.editor import VideoFileClip, CompositeVideoClip, ColorClip
 import os
 import subprocess
 
+from subtitle_animator import (
+    load_clip_entries, write_srt,
+    create_ass_subtitle, burn_animated_subtitles
+)
+
 # Shorts dimensions
 SHORTS_W = 1080
 SHORTS_H = 1920
+SHORTS_FPS = 30
 ZOOM_FACTOR = 1.35  # 35% zoom for "focused" look
 
-def crop_to_vertical(input_path, output_path, start_time, end_time, subtitle_path=None):
+# Style: large white text with black outline, positioned at bottom
+SUBTITLE_FORCE_STYLE = "FontSize=12,PrimaryColour=&HFFFFFF,OutlineColour=&H000000,Outline=1,MarginV=30"
+
+
+def escape_filter_path(path):
+    """Escape a file path for use inside an FFmpeg filter argument (Windows-safe)."""
+    return path.replace("\\", "/").replace(":", "\\:")
+
+
+def build_vertical_filter():
+    """
+    FFmpeg filter chain equivalent to the MoviePy compositing:
+    scale to SHORTS_W * ZOOM_FACTOR wide, keep the centre that fits the
+    canvas and pad the rest with black.
+    """
+    scaled_width = int(SHORTS_W * ZOOM_FACTOR)
+    return (
+        f"scale={scaled_width}:-2,"
+        f"crop='min(iw,{SHORTS_W})':'min(ih,{SHORTS_H})',"
+        f"pad={SHORTS_W}:{SHORTS_H}:(ow-iw)/2:(oh-ih)/2:black,"
+        f"setsar=1,fps={SHORTS_FPS}"
+    )
+
+
+def prepare_clip_subtitles(subtitle_path, output_path, start_time, end_time, animate_style=None):
+    """
+    Write a subtitle file re-timed to the clip window.
+
+    Returns:
+        (filter, temp_path) - the FFmpeg subtitle filter and the file to clean up,
+        or (None, None) if there is nothing to burn.
+    """
+    duration = end_time - start_time
+    base = os.path.splitext(output_path)[0]
+
+    if animate_style:
+        ass_path = create_ass_subtitle(
+            subtitle_path, base + "_subs.ass",
+            style=animate_style, animate=True,
+            offset=start_time, duration=duration
+        )
+        if not ass_path.endswith('.ass'):
+            return None, None
+        return f"ass='{escape_filter_path(ass_path)}'", ass_path
+
+    entries = load_clip_entries(subtitle_path, start_time, duration)
+    if not entries:
+        return None, None
+
+    srt_path = write_srt(entries, base + "_subs.srt")
+    return f"subtitles='{escape_filter_path(srt_path)}':force_style='{SUBTITLE_FORCE_STYLE}'", srt_path
+
+
+def render_vertical_ffmpeg(input_path, output_path, start_time, end_time, subtitle_path=None, animate_style=None):
+    """
+    Render the final vertical Short in one FFmpeg process:
+    seek -> trim -> scale -> crop/pad to 1080x1920 -> subtitles -> encode.
+
+    Args:
+        input_path: Source video
+        output_path: Final Short path
+        start_time: Clip start in the source (seconds)
+        end_time: Clip end in the source (seconds)
+        subtitle_path: Optional SRT/VTT for the whole source video
+        animate_style: Subtitle animator style preset for word-by-word captions
+
+    Returns:
+        True on success, False if FFmpeg failed or is missing
+    """
+    duration = end_time - start_time
+    vf = build_vertical_filter()
+
+    sub_temp = None
+    if subtitle_path and os.path.exists(subtitle_path):
+        sub_filter, sub_temp = prepare_clip_subtitles(subtitle_path, output_path, start_time, end_time, animate_style)
+        if sub_filter:
+            vf += "," + sub_filter
+
+    # Input seeking (-ss before -i) so only the clip window is decoded
+    cmd = [
+        "ffmpeg", "-y",
+        "-ss", str(start_time),
+        "-t", str(duration),
+        "-i", input_path,
+        "-vf", vf,
+        "-c:v", "libx264",
+        "-preset", "ultrafast",
+        "-c:a", "aac",
+        "-movflags", "+faststart",
+        output_path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"FFmpeg render failed: {result.stderr[-500:]}")
+            return False
+        return True
+    except FileNotFoundError:
+        print("Warning: FFmpeg not found.")
+        return False
+    finally:
+        if sub_temp and os.path.exists(sub_temp):
+            try:
+                os.remove(sub_temp)
+            except:
+                pass
+
+
+def crop_to_vertical(input_path, output_path, start_time, end_time, subtitle_path=None, animate_style=None, single_pass=True):
     """
     Crops a video to 9:16 vertical format with advanced Shorts compositing.
+
+    Args:
+        animate_style: Burn word-by-word animated captions with this style preset
+        single_pass: Render with one FFmpeg filtergraph (falls back to MoviePy on failure)
     """
     print(f"Processing video: {input_path} ({start_time}s - {end_time}s)")
-    
+
+    if single_pass:
+        if render_vertical_ffmpeg(input_path, output_path, start_time, end_time, subtitle_path, animate_style):
+            print(f"Saved to {output_path}")
+            return
+        print("Single-pass render failed, falling back to MoviePy compositing...")
+
+    if not (animate_style and subtitle_path and os.path.exists(subtitle_path)):
+        _crop_to_vertical_moviepy(input_path, output_path, start_time, end_time, subtitle_path)
+        return
+
+    # Animated captions replace the plain SRT burn
+    _crop_to_vertical_moviepy(input_path, output_path, start_time, end_time)
+    animated_output = output_path.replace('.mp4', '_animated.mp4')
+    burn_animated_subtitles(
+        output_path, subtitle_path, animated_output,
+        style=animate_style, animate=True,
+        offset=start_time, duration=end_time - start_time
+    )
+    if os.path.exists(animated_output):
+        os.replace(animated_output, output_path)
+
+
+def _crop_to_vertical_moviepy(input_path, output_path, start_time, end_time, subtitle_path=None):
+    """Legacy MoviePy compositing path (per-frame Python, multiple encodes)."""
+    from moviepy.editor import VideoFileClip, CompositeVideoClip, ColorClip
+
     # 1. Load and trim
     clip = VideoFileClip(input_path).subclip(start_time, end_time)
-    
+
     # 2. Shorts Compositing (Zoom + Center on Black Canvas)
     scaled_width = int(SHORTS_W * ZOOM_FACTOR)
     clip_resized = clip.resize(width=scaled_width)
-    
+
     # Create black background
     bg = ColorClip(size=(SHORTS_W, SHORTS_H), color=(0, 0, 0), duration=clip_resized.duration)
-    
+
     # Center the zoomed video on the canvas
     composed = CompositeVideoClip([bg, clip_resized.set_position("center")])
-    
+
     # Keep original audio
     final_clip = composed.set_audio(clip.audio)
-    
+
     # 3. Export (without subtitles first)
     temp_output = output_path if not subtitle_path else output_path.replace(".mp4", "_temp.mp4")
-    
+
     final_clip.write_videofile(
-        temp_output, 
-        codec='libx264', 
-        audio_codec='aac', 
+        temp_output,
+        codec='libx264',
+        audio_codec='aac',
         preset='ultrafast',
         threads=4,
-        fps=30,
+        fps=SHORTS_FPS,
         logger=None
     )
-    
+
     # Cleanup MoviePy clips
     clip.close()
     final_clip.close()
-    
+
     # 4. Burn subtitles using FFmpeg (if provided)
     if subtitle_path and os.path.exists(subtitle_path):
         print("Burning subtitles with FFmpeg...")
-        burn_subtitles_ffmpeg(temp_output, output_path, subtitle_path, start_time)
+        burn_subtitles_ffmpeg(temp_output, output_path, subtitle_path, start_time, end_time - start_time)
         # Remove temp file
         try:
             os.remove(temp_output)
@@ -63,33 +210,40 @@ def crop_to_vertical(input_path, output_path, start_time, end_time, subtitle_pat
         # No subtitles, temp is final
         if temp_output != output_path:
             os.rename(temp_output, output_path)
-    
+
     print(f"Saved to {output_path}")
 
-def burn_subtitles_ffmpeg(input_video, output_video, srt_path, offset=0):
+def burn_subtitles_ffmpeg(input_video, output_video, srt_path, offset=0, duration=None):
     """
     Burns SRT subtitles onto video using FFmpeg.
-    
+
     Args:
         input_video: Input video path
-        output_video: Output video path  
+        output_video: Output video path
         srt_path: Path to SRT file
         offset: Time offset in seconds (subtitles will be shifted)
+        duration: Clip length; subtitles past the end are dropped
     """
+    # Re-time subtitles to the clip so the whole-video SRT isn't rendered
+    clip_srt = None
+    if offset or duration is not None:
+        entries = load_clip_entries(srt_path, offset, duration)
+        clip_srt = write_srt(entries, os.path.splitext(output_video)[0] + "_subs.srt")
+        srt_path = clip_srt
+
     # Escape path for FFmpeg (Windows needs special handling)
-    srt_escaped = srt_path.replace("\\", "/").replace(":", "\\:")
-    
+    srt_escaped = escape_filter_path(srt_path)
+
     # FFmpeg command with subtitles filter
-    # Style: large white text with black outline, positioned at bottom
     cmd = [
         "ffmpeg", "-y",
         "-i", input_video,
-        "-vf", f"subtitles='{srt_escaped}':force_style='FontSize=12,PrimaryColour=&HFFFFFF,OutlineColour=&H000000,Outline=1,MarginV=30'",
+        "-vf", f"subtitles='{srt_escaped}':force_style='{SUBTITLE_FORCE_STYLE}'",
         "-c:a", "copy",
         "-preset", "ultrafast",
         output_video
     ]
-    
+
     try:
         result = subprocess.run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
@@ -99,6 +253,9 @@ def burn_subtitles_ffmpeg(input_video, output_video, srt_path, offset=0):
     except FileNotFoundError:
         print("Warning: FFmpeg not found. Skipping subtitle burning.")
         os.rename(input_video, output_video)
+    finally:
+        if clip_srt and os.path.exists(clip_srt):
+            os.remove(clip_srt)
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,193 @@
+"""
+Cue Index Module
+One SRT/VTT parser for the whole clipper. A subtitle file is parsed once
+into parallel start/end arrays plus text, with YouTube rolling-caption
+duplicates removed, and every consumer (transcript text for the AI,
+clip re-timing for burning, ASS generation) reads from that index.
+"""
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import List, Optional
+
+# Number of parsed files kept in memory (one job rarely needs more than one)
+CUE_CACHE_SIZE = 8
+
+_TIME_PATTERN = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})")
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parse_timestamp(text: str) -> Optional[float]:
+    """Parse an SRT (HH:MM:SS,mmm) or VTT (HH:MM:SS.mmm / MM:SS.mmm) timestamp"""
+    match = _TIME_PATTERN.search(text)
+    if not match:
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis.ljust(3, '0')) / 1000
+
+
+class CueIndex:
+    """
+    Timed cues sorted by start time.
+
+    starts/ends are float arrays (seconds); texts[i] belongs to cue i.
+    max_ends[i] is the largest end among cues 0..i, which keeps window
+    lookups logarithmic even when cues overlap.
+    """
+
+    def __init__(self, starts: array, ends: array, texts: List[str]):
+        self.starts = starts
+        self.ends = ends
+        self.texts = texts
+
+        self.max_ends = array('d')
+        running = float('-inf')
+        for end in ends:
+            running = max(running, end)
+            self.max_ends.append(running)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def text(self) -> str:
+        """Plain transcript text (what the AI analyzers receive)"""
+        return " ".join(self.texts)
+
+    def overlapping(self, start: float, end: float) -> List[int]:
+        """Indices of cues that overlap [start, end), in O(log n + k)"""
+        hi = bisect_left(self.starts, end)
+        lo = bisect_right(self.max_ends, start, 0, hi)
+        return [i for i in range(lo, hi) if self.ends[i] > start]
+
+    def entries(self) -> List[dict]:
+        """All cues as subtitle entry dicts (index, start, end, text)"""
+        return [
+            {"index": i + 1, "start": self.starts[i], "end": self.ends[i], "text": self.texts[i]}
+            for i in range(len(self.starts))
+        ]
+
+    def clip_entries(self, offset: float = 0, duration: float = None) -> List[dict]:
+        """
+        Entries re-timed to a clip starting at offset (source timeline).
+
+        Only the cues inside the window are visited; ends are clamped to the
+        clip length and starts to 0.
+        """
+        if duration is None:
+            indices = self.overlapping(offset, float('inf'))
+        else:
+            indices = self.overlapping(offset, offset + duration)
+
+        entries = []
+        for i in indices:
+            end = self.ends[i] - offset
+            if duration is not None:
+                end = min(end, duration)
+            entries.append({
+                "index": len(entries) + 1,
+                "start": max(0.0, self.starts[i] - offset),
+                "end": end,
+                "text": self.texts[i]
+            })
+        return entries
+
+
+def parse_cues(content: str, dedup: bool = True) -> CueIndex:
+    """
+    Parse SRT or VTT text into a CueIndex.
+
+    Args:
+        content: Subtitle file contents
+        dedup: Drop lines repeated from the previous cue. YouTube auto-captions
+               roll the previous line into each new cue and add 10 ms "echo"
+               cues, so without this every sentence appears two or three times.
+
+    Returns:
+        CueIndex
+    """
+    cues = []
+    lines = content.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if '-->' not in line:
+            continue
+
+        left, right = line.split('-->', 1)
+        start = parse_timestamp(left)
+        end = parse_timestamp(right)
+        if start is None or end is None:
+            continue
+
+        text_lines = []
+        while i < len(lines) and lines[i].strip():
+            cleaned = _TAG_PATTERN.sub('', lines[i]).strip()
+            if cleaned:
+                text_lines.append(cleaned)
+            i += 1
+        cues.append((start, end, text_lines))
+
+    cues.sort(key=lambda cue: cue[0])
+
+    starts = array('d')
+    ends = array('d')
+    texts = []
+    previous_lines = set()
+
+    for start, end, text_lines in cues:
+        new_lines = text_lines
+        if dedup:
+            new_lines = [l for l in text_lines if l not in previous_lines]
+            if text_lines:
+                previous_lines = set(text_lines)
+
+        if not new_lines:
+            # Pure repeat: it only extends how long the last cue is on screen
+            if dedup and text_lines and ends and end > ends[-1]:
+                ends[-1] = end
+            continue
+
+        starts.append(start)
+        ends.append(end)
+        texts.append(" ".join(new_lines))
+
+    return CueIndex(starts, ends, texts)
+
+
+def load_cues(path: str, dedup: bool = True) -> CueIndex:
+    """
+    Parse a subtitle file, reusing the previous parse while the file is unchanged.
+
+    Args:
+        path: SRT or VTT file
+        dedup: Remove rolling-caption repeats (see parse_cues)
+
+    Returns:
+        CueIndex (empty if the file is missing)
+    """
+    if not path or not os.path.exists(path):
+        return CueIndex(array('d'), array('d'), [])
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, dedup)
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        index = parse_cues(f.read(), dedup)
+
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > CUE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
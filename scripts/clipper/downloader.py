@@ -1,14 +1,35 @@
 import os
 from pytubefix import YouTube
 
+from media_cache import (
+    video_id_from_url, lookup_stream, fetch_stream, lookup_captions,
+    store_captions, load_manifest, update_manifest, materialize
+)
+
+# Media cache selection name for get_highest_resolution()
+CACHE_SELECTION = "highest"
+
 def _silent_progress(stream, chunk, bytes_remaining):
     """Silent progress callback to avoid Windows encoding issues."""
     pass
 
-def download_video(url, output_dir="output"):
+def download_video(url, output_dir="output", use_cache=True):
+    """
+    Download a YouTube video (highest progressive stream) plus English subtitles.
+
+    Streams and captions are kept in the shared media cache keyed by video id
+    and itag; a repeat request for the same video is served without touching
+    the network.
+    """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    if use_cache:
+        cached = _from_cache(video_id_from_url(url), output_dir)
+        if cached:
+            print(f"Using cached download for {cached['id']}.")
+            return cached
+
     print(f"Downloading {url} using Pytubefix...")
     
     try:
@@ -19,7 +40,11 @@ def download_video(url, output_dir="output"):
         
         # Download Video (Highest Res) – use video_id to avoid Unicode filename issues on Windows
         ys = yt.streams.get_highest_resolution()
-        ys.download(output_path=output_dir, filename=f"{video_id}.mp4")
+        if use_cache:
+            materialize(fetch_stream(video_id, ys, selection=CACHE_SELECTION), video_path)
+            update_manifest(video_id, length=yt.length)
+        else:
+            ys.download(output_path=output_dir, filename=f"{video_id}.mp4")
         
         print("Video downloaded.")
         
@@ -38,8 +63,12 @@ def download_video(url, output_dir="output"):
                 subtitle_path = os.path.join(output_dir, f"{video_id}.srt")
                 with open(subtitle_path, "w", encoding="utf-8") as f:
                     f.write(srt_content)
+                if use_cache:
+                    store_captions(video_id, srt_content)
                 print("Subtitles downloaded.")
             else:
+                if use_cache:
+                    store_captions(video_id, None)
                 print("No English subtitles found.")
         except Exception as sub_err:
             print(f"Subtitle retrieval failed: {sub_err}")
@@ -56,6 +85,28 @@ def download_video(url, output_dir="output"):
         print(f"Error downloading video: {e}")
         return None
 
+
+def _from_cache(video_id, output_dir):
+    """Build the download_video result from the media cache, or None on a miss"""
+    cached_video = lookup_stream(video_id, CACHE_SELECTION)
+    # None means captions were never checked - go to the network for both
+    cached_subs = lookup_captions(video_id)
+    if not cached_video or cached_subs is None:
+        return None
+
+    video_path = materialize(cached_video, os.path.join(output_dir, f"{video_id}.mp4"))
+    subtitle_path = None
+    if cached_subs:
+        subtitle_path = materialize(cached_subs, os.path.join(output_dir, f"{video_id}.srt"))
+
+    return {
+        "video_path": video_path,
+        "title": video_id,
+        "id": video_id,
+        "subtitle_path": subtitle_path,
+        "duration": load_manifest(video_id).get("length")
+    }
+
 if __name__ == "__main__":
     # Test
     res = download_video("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
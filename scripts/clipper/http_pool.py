@@ -0,0 +1,96 @@
+"""
+HTTP Pool Module
+Shared keep-alive requests session and hedged (racing) provider calls
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Start the next provider if the current one hasn't answered after this many seconds
+HEDGE_DELAY = float(os.environ.get("CLIPPER_AI_HEDGE_DELAY", 8.0))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide requests session.
+
+    Reuses TCP/TLS connections to the provider APIs instead of a new
+    handshake per call. Safe to share between the batch worker threads.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def hedged_call(
+    calls: List[Tuple[str, Callable[[], dict]]],
+    is_valid: Callable[[Optional[dict]], bool],
+    delay: float = HEDGE_DELAY
+) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Race providers with staggered starts; the first valid answer wins.
+
+    The first call starts immediately. The next one is started when the
+    running calls have taken longer than delay, or as soon as one fails,
+    so a single slow provider no longer holds up the fallback.
+
+    Args:
+        calls: (name, zero-argument function) in priority order; functions raise on failure
+        is_valid: Accepts a result as final
+        delay: Seconds to wait before hedging with the next provider
+
+    Returns:
+        (name, result) of the winner, or (None, None) if every call failed
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, len(calls)))
+    pending = {}
+    queue = list(calls)
+
+    def launch_next():
+        name, func = queue.pop(0)
+        print(f"[AI] Starting {name.upper()}...")
+        pending[pool.submit(func)] = name
+
+    try:
+        launch_next()
+        while pending:
+            done, _ = wait(pending, timeout=delay if queue else None, return_when=FIRST_COMPLETED)
+
+            if not done:
+                print(f"[AI] No answer after {delay:g}s, hedging with the next provider")
+                launch_next()
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[AI] {name.upper()} failed: {e}")
+                    continue
+                if is_valid(result):
+                    return name, result
+                print(f"[AI] {name.upper()} returned an invalid response")
+
+            # A failed call doesn't wait out the delay before the next one starts
+            if queue:
+                launch_next()
+
+        return None, None
+    finally:
+        # Losers keep running in the background; their results are dropped
+        pool.shutdown(wait=False, cancel_futures=True)
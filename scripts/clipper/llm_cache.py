@@ -0,0 +1,76 @@
+"""
+LLM Response Cache
+Persists parsed transcript-analysis results so re-processing a video
+(e.g. with another subtitle style) doesn't repeat the LLM call.
+
+Entries are keyed by task, transcript hash, provider, model and prompt
+version, expire after LLM_CACHE_TTL seconds and are evicted least recently
+used first once the directory grows past LLM_CACHE_MAX_BYTES.
+Set CLIPPER_NO_LLM_CACHE=1 (or pass use_cache=False) to bypass it.
+"""
+import os
+import json
+import time
+import hashlib
+from typing import Optional
+
+from cache_utils import cache_dir, atomic_write_bytes, touch_entry, evict_lru
+
+LLM_CACHE_TTL = float(os.environ.get("CLIPPER_LLM_CACHE_TTL", 30 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("CLIPPER_LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+
+def cache_enabled(use_cache: bool = True) -> bool:
+    """False if the caller or the CLIPPER_NO_LLM_CACHE environment variable opts out"""
+    if not use_cache:
+        return False
+    return os.environ.get("CLIPPER_NO_LLM_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def cache_key(task: str, transcript: str, provider: str, model: str, prompt_version, *extra) -> str:
+    """
+    Build the cache key for one analysis request.
+
+    Args:
+        task: Name of the calling analysis (keeps different prompts apart)
+        transcript: Full transcript text sent to the model
+        provider: Provider name (groq, gemini, ...)
+        model: Model identifier
+        prompt_version: Bumped by the caller whenever its prompt changes
+        *extra: Any other prompt inputs (e.g. video duration)
+    """
+    transcript_hash = hashlib.sha256(transcript.encode('utf-8')).hexdigest()
+    parts = [task, transcript_hash, provider.lower(), model, str(prompt_version)] + [str(x) for x in extra]
+    return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+
+
+def get_cached(key: str) -> Optional[dict]:
+    """Return the cached result for key, or None on a miss / expired entry"""
+    path = os.path.join(cache_dir("llm"), f"{key}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - entry.get("created", 0) > LLM_CACHE_TTL:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    touch_entry(path)
+    return entry.get("result")
+
+
+def store_result(key: str, result: dict, provider: str = "", model: str = ""):
+    """Save a parsed result and keep the cache under LLM_CACHE_MAX_BYTES"""
+    entry = {"created": time.time(), "provider": provider, "model": model, "result": result}
+    try:
+        directory = cache_dir("llm")
+        atomic_write_bytes(os.path.join(directory, f"{key}.json"), json.dumps(entry).encode('utf-8'))
+        evict_lru(directory, LLM_CACHE_MAX_BYTES, ".json")
+    except Exception as e:
+        print(f"[AI] Could not cache result: {e}")
+
@@ -8,56 +8,12 @@ from heatmap import get_best_clip_segment
 from cropper import crop_to_vertical
 from montage import create_montage_short
 from scene_splitter import split_at_scenes
-from subtitle_animator import burn_animated_subtitles
-
-def read_vtt(vtt_path):
-    """Simple VTT text extractor"""
-    if not vtt_path or not os.path.exists(vtt_path):
-        return ""
-    
-    lines = []
-    with open(vtt_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if '-->' in line or line.strip() == '' or line.strip().lower() == 'webvtt':
-                continue
-            lines.append(line.strip())
-            
-    # Remove duplicates
-    seen = set()
-    clean_lines = []
-    for l in lines:
-        if l not in seen:
-            clean_lines.append(l)
-            seen.add(l)
-    return " ".join(clean_lines)
-
-def read_srt(srt_path):
-    """Simple SRT text extractor"""
-    if not srt_path or not os.path.exists(srt_path):
-        return ""
-    
-    lines = []
-    with open(srt_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            # Skip timestamps and indices
-            if '-->' in line or line.strip().isdigit() or line.strip() == '':
-                continue
-            lines.append(line.strip())
-            
-    # Remove duplicates
-    seen = set()
-    clean_lines = []
-    for l in lines:
-        if l not in seen:
-            clean_lines.append(l)
-            seen.add(l)
-    return " ".join(clean_lines)
+from cues import load_cues
 
 def read_subtitles(path):
+    """Transcript text from an SRT/VTT file (timestamps and rolling-caption repeats removed)"""
     if not path: return ""
-    if path.endswith('.srt'):
-        return read_srt(path)
-    return read_vtt(path)
+    return load_cues(path).text()
 
 def main():
     parser = argparse.ArgumentParser(description="AI YouTube Clipper")
@@ -68,6 +24,9 @@ def main():
     parser.add_argument("--ai", choices=["auto", "gemini", "grok"], default="auto", help="AI provider for analysis")
     parser.add_argument("--style", choices=["tiktok", "minimal", "bold", "neon"], default="tiktok", help="Subtitle animation style")
     parser.add_argument("--animate-subs", action="store_true", help="Enable word-by-word animated subtitles")
+    parser.add_argument("--legacy-render", action="store_true", help="Use the MoviePy compositor instead of the single-pass FFmpeg render")
+    parser.add_argument("--hedge", action="store_true", help="Race the next AI provider when the current one is slow to answer")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the AI provider instead of reusing a cached analysis")
     args = parser.parse_args()
 
     # 1. Download or Local Check
@@ -140,7 +99,7 @@ def main():
                 print(f"Subtitles loaded: {len(transcript_text)} chars")
             
             if transcript_text:
-                clip_meta = analyze_transcript_multi(transcript_text, duration, provider=args.ai)
+                clip_meta = analyze_transcript_multi(transcript_text, duration, provider=args.ai, use_cache=not args.no_cache, hedge=args.hedge)
             else:
                 print("No subtitles. Using AI Video Analysis...")
                 clip_meta = analyze_video_multimodal(video_path, provider=args.ai)
@@ -151,7 +110,7 @@ def main():
             transcript_text = read_subtitles(subtitle_path)
         
         if transcript_text:
-            clip_meta = analyze_transcript_multi(transcript_text, duration, provider=args.ai)
+            clip_meta = analyze_transcript_multi(transcript_text, duration, provider=args.ai, use_cache=not args.no_cache, hedge=args.hedge)
         else:
             clip_meta = analyze_video_multimodal(video_path, provider=args.ai)
     
@@ -193,27 +152,16 @@ def main():
             else:
                 print("Burning subtitles...")
         
+        # Crop, zoom and (animated) subtitles are rendered in one FFmpeg pass
         crop_to_vertical(
             video_path, 
             final_output, 
             clip_meta.get('start'), 
             clip_meta.get('end'),
-            subtitle_path=subtitle_path
+            subtitle_path=subtitle_path,
+            animate_style=args.style if args.animate_subs else None,
+            single_pass=not args.legacy_render
         )
-        
-        # Apply animated subtitles if requested
-        if args.animate_subs and subtitle_path and os.path.exists(subtitle_path):
-            animated_output = final_output.replace('.mp4', '_animated.mp4')
-            burn_animated_subtitles(
-                final_output, 
-                subtitle_path, 
-                animated_output,
-                style=args.style,
-                animate=True
-            )
-            # Replace original with animated version
-            if os.path.exists(animated_output):
-                os.replace(animated_output, final_output)
     
     print("--- Done ---")
     print(f"Output: {final_output}")
@@ -0,0 +1,323 @@
+"""
+Source Media Cache
+Keeps downloaded YouTube streams and captions on disk, keyed by video id
+and stream itag, so repeat jobs on the same source skip the network.
+
+Layout under <cache root>/media/<video_id>/:
+    manifest.json   selection -> itag, stream sizes, title/length, captions
+    <itag>.mp4      complete stream (only ever appears via os.replace)
+    <itag>.mp4.part in-progress download, fetched/resumed in bounded Range requests
+    download.lock   held (O_CREAT|O_EXCL) by the process downloading into .part
+    captions.<lang>.<ext>
+"""
+import os
+import re
+import json
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from cache_utils import cache_dir, atomic_write_bytes
+
+# Download chunk size for the resumable fetch
+CHUNK_SIZE = 1 << 20
+
+# Bytes per ranged request (as pytubefix): googlevideo throttles open-ended GETs to playback speed
+RANGE_SIZE = 9 * 1024 * 1024
+
+# A download lock untouched this long (seconds) belongs to a dead process; waiters poll at this interval
+LOCK_STALE_SECONDS = 600
+LOCK_POLL_SECONDS = 0.5
+
+# Linux FICLONE ioctl: copy-on-write clone on btrfs/XFS/etc.
+_FICLONE = 0x40049409
+
+_VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})")
+
+# One lock per process is enough: manifests are tiny and written rarely
+_manifest_lock = threading.Lock()
+
+
+def video_id_from_url(url: str) -> Optional[str]:
+    """Extract the 11-character video id from a YouTube URL without any network access"""
+    match = _VIDEO_ID_PATTERN.search(url or "")
+    if match:
+        return match.group(1)
+    if re.fullmatch(r"[A-Za-z0-9_-]{11}", url or ""):
+        return url
+    return None
+
+
+def _video_dir(video_id: str) -> str:
+    path = os.path.join(cache_dir("media"), video_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def load_manifest(video_id: str) -> dict:
+    """Return the manifest for a video id (empty dict if nothing is cached)"""
+    path = os.path.join(cache_dir("media"), video_id, "manifest.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_manifest(video_id: str, **fields) -> dict:
+    """Merge fields into the manifest (dict values are merged one level deep)"""
+    with _manifest_lock:
+        manifest = load_manifest(video_id)
+        for key, value in fields.items():
+            if isinstance(value, dict):
+                manifest.setdefault(key, {}).update(value)
+            else:
+                manifest[key] = value
+        path = os.path.join(_video_dir(video_id), "manifest.json")
+        atomic_write_bytes(path, json.dumps(manifest, indent=2).encode('utf-8'))
+        return manifest
+
+
+def stream_path(video_id: str, itag) -> str:
+    return os.path.join(_video_dir(video_id), f"{itag}.mp4")
+
+
+def lookup_stream(video_id: str, selection: str) -> Optional[str]:
+    """
+    Fast "already have it" check - no network, just the manifest and a stat().
+
+    Args:
+        video_id: YouTube video id
+        selection: Name of the stream choice the caller makes (e.g. "highest")
+
+    Returns:
+        Path of the complete cached stream, or None
+    """
+    if not video_id:
+        return None
+
+    manifest = load_manifest(video_id)
+    itag = manifest.get("selections", {}).get(selection)
+    if itag is None:
+        return None
+
+    path = stream_path(video_id, itag)
+    expected = manifest.get("streams", {}).get(str(itag), {}).get("size")
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    if expected and size != expected:
+        return None
+    return path
+
+
+@contextmanager
+def _download_lock(video_id: str):
+    """
+    Hold the per-video download lock (an O_CREAT|O_EXCL lock file).
+
+    Other processes wait for it; a lock whose mtime is older than
+    LOCK_STALE_SECONDS is taken over. Yields the lock path, which the holder
+    touches while it makes progress.
+    """
+    lock_path = os.path.join(_video_dir(video_id), "download.lock")
+    waiting = False
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if not waiting:
+                print("[CACHE] Waiting for another download of this video...")
+                waiting = True
+            time.sleep(LOCK_POLL_SECONDS)
+
+    try:
+        os.write(fd, str(os.getpid()).encode('ascii'))
+        os.close(fd)
+        yield lock_path
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _download_ranges(url: str, part_path: str, offset: int, total: Optional[int], lock_path: str):
+    """
+    Append url to part_path from offset in successive bounded Range requests.
+
+    With an unknown total, stops at the first short (or 416) response. A
+    server that ignores Range sends the whole body, which replaces the file.
+    """
+    from http_pool import get_session
+
+    http = get_session()
+    while total is None or offset < total:
+        stop = offset + RANGE_SIZE - 1
+        if total:
+            stop = min(stop, total - 1)
+        requested = stop - offset + 1
+
+        with http.get(url, headers={"Range": f"bytes={offset}-{stop}"}, stream=True, timeout=30) as response:
+            if response.status_code == 416 and total is None:
+                break
+            response.raise_for_status()
+            whole = response.status_code != 206
+            received = 0
+            with open(part_path, 'wb' if whole or not offset else 'ab') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    received += len(chunk)
+                    os.utime(lock_path)
+
+        if whole:
+            return
+        if received == 0:
+            raise IOError(f"Empty range response at {offset} bytes")
+        offset += received
+        # Unknown size: a short range is the end of the stream
+        if total is None and received < requested:
+            break
+
+
+def fetch_stream(video_id: str, stream, selection: str = None) -> str:
+    """
+    Download a pytubefix stream into the cache, resuming a previous partial file.
+
+    The .part file is only touched under the per-video download lock, so
+    concurrent fetches of the same video never append to it together.
+
+    Args:
+        video_id: YouTube video id
+        stream: pytubefix Stream (needs .itag, .url, .filesize)
+        selection: Record this stream as the answer for that selection
+
+    Returns:
+        Path of the complete cached stream
+    """
+    path = stream_path(video_id, stream.itag)
+    try:
+        total = stream.filesize
+    except Exception:
+        total = None
+
+    def complete():
+        return os.path.exists(path) and (not total or os.path.getsize(path) == total)
+
+    if not complete():
+        with _download_lock(video_id) as lock_path:
+            # Another process may have finished it while we waited
+            if not complete():
+                part_path = path + ".part"
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if total and offset > total:
+                    offset = 0
+
+                if offset and offset == total:
+                    print("[CACHE] Partial download already complete")
+                else:
+                    if offset:
+                        print(f"[CACHE] Resuming download at {offset / (1024 * 1024):.1f} MB")
+
+                    _download_ranges(stream.url, part_path, offset, total, lock_path)
+
+                if total and os.path.getsize(part_path) != total:
+                    raise IOError(f"Incomplete download: {os.path.getsize(part_path)} of {total} bytes")
+                os.replace(part_path, path)
+
+    fields = {"streams": {str(stream.itag): {"size": os.path.getsize(path)}}}
+    if selection:
+        fields["selections"] = {selection: stream.itag}
+    update_manifest(video_id, **fields)
+    return path
+
+
+def lookup_captions(video_id: str, lang: str = "en", ext: str = "srt"):
+    """
+    Cached captions for a video.
+
+    Returns:
+        Path to the caption file, "" if we already know there are none,
+        or None if captions were never fetched.
+    """
+    if not video_id:
+        return None
+
+    entry = load_manifest(video_id).get("captions", {}).get(f"{lang}.{ext}")
+    if entry is None:
+        return None
+    if entry == "":
+        return ""
+
+    path = os.path.join(_video_dir(video_id), entry)
+    return path if os.path.exists(path) else None
+
+
+def store_captions(video_id: str, text: Optional[str], lang: str = "en", ext: str = "srt") -> Optional[str]:
+    """Cache caption text (None records that the video has no captions in this language)"""
+    key = f"{lang}.{ext}"
+    if text is None:
+        update_manifest(video_id, captions={key: ""})
+        return None
+
+    filename = f"captions.{key}"
+    path = os.path.join(_video_dir(video_id), filename)
+    atomic_write_bytes(path, text.encode('utf-8'))
+    update_manifest(video_id, captions={key: filename})
+    return path
+
+
+def materialize(cached_path: str, dest_path: str) -> str:
+    """
+    Place a cached file at dest_path without duplicating the data when possible.
+
+    Uses a copy-on-write reflink where the filesystem supports it and falls
+    back to a plain copy. Never a hard link: dest_path is an independent
+    file, so callers can delete it or rewrite it in place (open(..., 'wb'),
+    ffmpeg -y) without touching the cache entry.
+    """
+    if os.path.abspath(cached_path) == os.path.abspath(dest_path):
+        return dest_path
+
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    if os.path.exists(dest_path):
+        try:
+            if os.path.samefile(cached_path, dest_path):
+                return dest_path
+        except OSError:
+            pass
+        os.remove(dest_path)
+
+    if not _reflink(cached_path, dest_path):
+        shutil.copy2(cached_path, dest_path)
+    return dest_path
+
+
+def _reflink(src: str, dest: str) -> bool:
+    """Clone src to dest with FICLONE (True on success, dest removed on failure)"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+    except OSError:
+        try:
+            os.remove(dest)
+        except OSError:
+            pass
+        return False
+    shutil.copystat(src, dest)
+    return True
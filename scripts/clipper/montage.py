@@ -1,101 +1,217 @@
 """
 Montage Clipper - Creates compilation-style Shorts
 Takes multiple 2-3 second clips from different parts of video and stitches them together
+
+The default engine builds a single FFmpeg filtergraph (input seeking,
+per-segment trim/atrim, scale/pad, concat), so memory stays bounded
+regardless of the source length. The MoviePy engine is kept as a fallback.
 """
 import os
 import random
-from moviepy.editor import VideoFileClip, concatenate_videoclips, CompositeVideoClip, ColorClip
+import subprocess
+from typing import List
+
+from cropper import build_vertical_filter, SHORTS_W, SHORTS_H, ZOOM_FACTOR
+from scene_splitter import get_video_duration, has_audio_stream
 
-# Shorts dimensions  
-SHORTS_W = 1080
-SHORTS_H = 1920
-ZOOM_FACTOR = 1.35
 
-def create_montage_short(video_path, output_path, duration=30, clip_length=3, subtitle_path=None):
+def select_montage_timestamps(video_duration: float, duration: float = 30, clip_length: float = 3) -> List[float]:
     """
-    Creates a montage-style Short from a video.
-    
+    Pick clip start times spread across the "golden zone" of the video.
+
     Args:
-        video_path: Source video file
-        output_path: Output file path
-        duration: Target Short duration (default 30 seconds)
-        clip_length: Length of each mini-clip (default 3 seconds)
-        subtitle_path: Optional SRT file for captions
-    
+        video_duration: Source length in seconds
+        duration: Target Short duration
+        clip_length: Length of each mini-clip
+
     Returns:
-        Path to output file
+        List of start timestamps (seconds)
     """
-    print(f"Creating montage Short from {video_path}...")
-    print(f"Target: {duration}s total, using {clip_length}s clips")
-    
-    # Load video
-    video = VideoFileClip(video_path)
-    video_duration = video.duration
-    
     # Calculate how many clips we need
     num_clips = int(duration / clip_length)
-    print(f"Will extract {num_clips} clips of {clip_length}s each")
-    
+
     # Define "golden zones" to pick clips from (avoiding intro/outro)
     # Zone: 10% to 90% of video
     zone_start = video_duration * 0.10
     zone_end = video_duration * 0.90
     available_range = zone_end - zone_start
-    
+
     if available_range < duration:
         # Video too short, use whole thing
         zone_start = 0
         zone_end = video_duration
         available_range = video_duration
-    
+
     # Generate random timestamps for clips (spread across the video)
     # Divide video into sections and pick one random point from each section
     section_size = available_range / num_clips
     timestamps = []
-    
+
     for i in range(num_clips):
         section_start = zone_start + (i * section_size)
         section_end = section_start + section_size - clip_length
-        
+
         if section_end > section_start:
             ts = random.uniform(section_start, section_end)
         else:
             ts = section_start
-        
+
         timestamps.append(ts)
-    
+
+    return timestamps
+
+
+def build_montage_command(
+    video_path: str,
+    output_path: str,
+    timestamps: List[float],
+    clip_length: float,
+    duration: float = None,
+    include_audio: bool = True
+) -> List[str]:
+    """
+    Build one FFmpeg invocation that cuts, formats and concatenates all clips.
+
+    Each clip is opened with input seeking (-ss/-t before -i), so only the
+    selected windows of the source are ever decoded.
+    """
+    cmd = ['ffmpeg', '-y']
+    for ts in timestamps:
+        cmd += ['-ss', f"{ts:.3f}", '-t', f"{clip_length:.3f}", '-i', video_path]
+
+    vertical = build_vertical_filter()
+    filters = []
+    concat_inputs = ""
+
+    for i in range(len(timestamps)):
+        filters.append(f"[{i}:v]trim=duration={clip_length:.3f},setpts=PTS-STARTPTS,{vertical}[v{i}]")
+        concat_inputs += f"[v{i}]"
+        if include_audio:
+            filters.append(
+                f"[{i}:a]atrim=duration={clip_length:.3f},asetpts=PTS-STARTPTS,"
+                f"aresample=44100,aformat=channel_layouts=stereo[a{i}]"
+            )
+            concat_inputs += f"[a{i}]"
+
+    audio_flag = 1 if include_audio else 0
+    outputs = "[v][a]" if include_audio else "[v]"
+    filters.append(f"{concat_inputs}concat=n={len(timestamps)}:v=1:a={audio_flag}{outputs}")
+
+    cmd += ['-filter_complex', ";".join(filters), '-map', '[v]']
+    if include_audio:
+        cmd += ['-map', '[a]', '-c:a', 'aac']
+
+    # Ensure exact duration
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+
+    cmd += [
+        '-c:v', 'libx264',
+        '-preset', 'ultrafast',
+        '-movflags', '+faststart',
+        output_path
+    ]
+    return cmd
+
+
+def render_montage_ffmpeg(video_path, output_path, timestamps, clip_length, duration=None) -> bool:
+    """Render the montage with a single FFmpeg process. Returns True on success."""
+    cmd = build_montage_command(
+        video_path, output_path, timestamps, clip_length,
+        duration=duration, include_audio=has_audio_stream(video_path)
+    )
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"FFmpeg montage failed: {result.stderr[-500:]}")
+            return False
+        return True
+    except FileNotFoundError:
+        print("Warning: FFmpeg not found.")
+        return False
+
+
+def create_montage_short(video_path, output_path, duration=30, clip_length=3, subtitle_path=None, engine="ffmpeg"):
+    """
+    Creates a montage-style Short from a video.
+
+    Args:
+        video_path: Source video file
+        output_path: Output file path
+        duration: Target Short duration (default 30 seconds)
+        clip_length: Length of each mini-clip (default 3 seconds)
+        subtitle_path: Optional SRT file for captions
+        engine: "ffmpeg" (single filtergraph) or "moviepy" (legacy compositor)
+
+    Returns:
+        Path to output file
+    """
+    print(f"Creating montage Short from {video_path}...")
+    print(f"Target: {duration}s total, using {clip_length}s clips")
+
+    if engine == "ffmpeg":
+        video_duration = get_video_duration(video_path)
+        if video_duration > 0:
+            timestamps = select_montage_timestamps(video_duration, duration, clip_length)
+            # Don't run past the end of the source
+            timestamps = [min(ts, max(0, video_duration - clip_length)) for ts in timestamps]
+            print(f"Will extract {len(timestamps)} clips of {clip_length}s each")
+            print(f"Selected timestamps: {[f'{t:.1f}s' for t in timestamps]}")
+
+            print("Rendering montage with FFmpeg...")
+            if render_montage_ffmpeg(video_path, output_path, timestamps, clip_length, duration):
+                print(f"Montage saved to {output_path}")
+                return output_path
+
+        print("FFmpeg montage failed, falling back to MoviePy...")
+
+    return _create_montage_moviepy(video_path, output_path, duration, clip_length)
+
+
+def _create_montage_moviepy(video_path, output_path, duration=30, clip_length=3):
+    """Legacy MoviePy montage (per-frame compositing in Python)."""
+    from moviepy.editor import VideoFileClip, concatenate_videoclips, CompositeVideoClip, ColorClip
+
+    # Load video
+    video = VideoFileClip(video_path)
+    video_duration = video.duration
+
+    timestamps = select_montage_timestamps(video_duration, duration, clip_length)
+    num_clips = len(timestamps)
+    print(f"Will extract {num_clips} clips of {clip_length}s each")
     print(f"Selected timestamps: {[f'{t:.1f}s' for t in timestamps]}")
-    
+
     # Extract clips and apply Shorts formatting
     clips = []
     for i, ts in enumerate(timestamps):
         print(f"Processing clip {i+1}/{num_clips}...")
-        
+
         # Extract clip
         end_time = min(ts + clip_length, video_duration)
         clip = video.subclip(ts, end_time)
-        
+
         # Apply Shorts compositing (zoom + center on black canvas)
         scaled_width = int(SHORTS_W * ZOOM_FACTOR)
         clip_resized = clip.resize(width=scaled_width)
-        
+
         # Create black background
         bg = ColorClip(size=(SHORTS_W, SHORTS_H), color=(0, 0, 0), duration=clip_resized.duration)
-        
+
         # Center the zoomed clip
         composed = CompositeVideoClip([bg, clip_resized.set_position("center")])
         composed = composed.set_audio(clip.audio)
-        
+
         clips.append(composed)
-    
+
     # Concatenate all clips
     print("Stitching clips together...")
     final = concatenate_videoclips(clips, method="compose")
-    
+
     # Ensure exact duration
     if final.duration > duration:
         final = final.subclip(0, duration)
-    
+
     # Export
     print("Exporting montage...")
     final.write_videofile(
@@ -107,13 +223,13 @@ def create_montage_short(video_path, output_path, duration=30, clip_length=3, su
         fps=30,
         logger=None
     )
-    
+
     # Cleanup
     video.close()
     final.close()
     for clip in clips:
         clip.close()
-    
+
     print(f"Montage saved to {output_path}")
     return output_path
 
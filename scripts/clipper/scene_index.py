@@ -0,0 +1,279 @@
+"""
+Scene Index Module
+Decodes a video once, stores the per-frame scene score on disk and answers
+scene-change queries for any threshold from the stored scores.
+"""
+import os
+import json
+import subprocess
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from cache_utils import cache_dir, file_fingerprint, atomic_write_bytes
+
+# Bump when the score extraction changes so old indexes are rebuilt
+SCENE_INDEX_VERSION = 1
+
+# Parallel mode decodes at this width - plenty for detecting hard cuts
+DEFAULT_SCALE_WIDTH = 320
+
+# Each chunk starts decoding this much earlier so the first kept frame
+# has a real predecessor to be compared against
+CHUNK_PREROLL = 1.0
+
+# Per-chunk decode timeout (seconds)
+CHUNK_TIMEOUT = 300
+
+
+class SceneIndex:
+    """
+    Per-frame scene scores for one video.
+
+    times and scores are parallel float arrays (seconds, 0.0-1.0 score).
+    """
+
+    def __init__(self, times: array, scores: array):
+        self.times = times
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.times)
+
+    def timestamps(self, threshold: float = 0.3) -> List[float]:
+        """Timestamps whose scene score is above threshold (same as select='gt(scene,threshold)')"""
+        return [t for t, score in zip(self.times, self.scores) if score > threshold]
+
+    def to_bytes(self, meta: dict) -> bytes:
+        """Serialize as a JSON header line followed by the raw score arrays"""
+        header = dict(meta, version=SCENE_INDEX_VERSION, frames=len(self.times))
+        return json.dumps(header).encode('utf-8') + b"\n" + self.times.tobytes() + self.scores.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional["SceneIndex"]:
+        header_end = data.index(b"\n")
+        header = json.loads(data[:header_end].decode('utf-8'))
+        if header.get('version') != SCENE_INDEX_VERSION:
+            return None
+
+        frames = header['frames']
+        body = data[header_end + 1:]
+        times = array('d')
+        scores = array('d')
+        times.frombytes(body[:frames * times.itemsize])
+        scores.frombytes(body[frames * times.itemsize:])
+        return cls(times, scores)
+
+
+def build_scene_scores(
+    video_path: str,
+    timeout: float = None,
+    start: float = 0.0,
+    duration: float = None,
+    scale_width: int = None,
+    fps: float = None,
+    threads: int = None
+) -> Optional[SceneIndex]:
+    """
+    Decode the video (or one window of it) and collect the scene score of every frame.
+
+    Args:
+        video_path: Source video
+        timeout: Max seconds to wait for FFmpeg
+        start: Window start (seconds); returned times stay on the source timeline
+        duration: Window length (seconds), None for the rest of the file
+        scale_width: Downscale to this width before scoring
+        fps: Resample to this frame rate before scoring
+        threads: Decoder threads for this FFmpeg process
+
+    Returns:
+        SceneIndex, or None if FFmpeg failed
+    """
+    filters = []
+    if fps:
+        filters.append(f"fps={fps}")
+    if scale_width:
+        filters.append(f"scale={scale_width}:-2")
+    filters.append("select='gte(scene,0)',metadata=print:key=lavfi.scene_score:file=-")
+
+    cmd = ['ffmpeg', '-hide_banner', '-nostats']
+    if threads:
+        cmd += ['-threads', str(threads)]
+    if start:
+        cmd += ['-ss', f"{start:.3f}"]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    cmd += [
+        '-i', video_path,
+        '-an',
+        '-vf', ",".join(filters),
+        '-f', 'null', '-'
+    ]
+
+    times = array('d')
+    scores = array('d')
+
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except FileNotFoundError:
+        print("[SCENE] FFmpeg not found")
+        return None
+
+    # Kill FFmpeg if it overruns; the truncated output is then discarded
+    watchdog = threading.Timer(timeout, proc.kill) if timeout else None
+    if watchdog:
+        watchdog.start()
+
+    # metadata=print emits "frame:N pts:P pts_time:T" followed by "lavfi.scene_score=S"
+    current_time = None
+    try:
+        for line in proc.stdout:
+            if line.startswith('frame:'):
+                pos = line.find('pts_time:')
+                current_time = float(line[pos + 9:].split()[0]) if pos != -1 else None
+            elif line.startswith('lavfi.scene_score=') and current_time is not None:
+                times.append(start + current_time)
+                scores.append(float(line.split('=', 1)[1]))
+                current_time = None
+        proc.wait()
+    finally:
+        if watchdog:
+            watchdog.cancel()
+
+    if proc.returncode != 0 or not times:
+        return None
+
+    return SceneIndex(times, scores)
+
+
+def build_scene_scores_parallel(
+    video_path: str,
+    duration: float,
+    workers: int = None,
+    scale_width: int = DEFAULT_SCALE_WIDTH,
+    fps: float = None
+) -> Optional[SceneIndex]:
+    """
+    Split the timeline into chunks and score each one in its own FFmpeg process.
+
+    Each chunk is decoded with CHUNK_PREROLL seconds of lead-in; frames before
+    the chunk start are dropped so every kept score compares against the true
+    previous frame and the seams line up with a single-pass decode.
+
+    Args:
+        video_path: Source video
+        duration: Source length in seconds
+        workers: Number of chunks / concurrent FFmpeg processes (default: CPU count)
+        scale_width: Downscale width for scoring
+        fps: Optional reduced frame rate for scoring
+
+    Returns:
+        SceneIndex covering the whole video, or None if any chunk failed
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunk_size = duration / workers
+    # Split the cores between the decoders instead of oversubscribing
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    def score_chunk(i):
+        chunk_start = i * chunk_size
+        chunk_end = duration if i == workers - 1 else (i + 1) * chunk_size
+        seek = max(0.0, chunk_start - CHUNK_PREROLL)
+
+        # Last chunk runs to EOF so no trailing frames are lost
+        window = None if i == workers - 1 else chunk_end - seek
+        chunk = build_scene_scores(
+            video_path, timeout=CHUNK_TIMEOUT, start=seek, duration=window,
+            scale_width=scale_width, fps=fps, threads=threads
+        )
+        if chunk is None:
+            return None
+
+        times = array('d')
+        scores = array('d')
+        for t, score in zip(chunk.times, chunk.scores):
+            if (i > 0 and t < chunk_start) or (i < workers - 1 and t >= chunk_end):
+                continue
+            times.append(t)
+            scores.append(score)
+        return SceneIndex(times, scores)
+
+    print(f"[SCENE] Scoring {workers} chunks in parallel at {scale_width or 'full'}px width...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunks = list(pool.map(score_chunk, range(workers)))
+
+    if any(chunk is None for chunk in chunks):
+        return None
+
+    times = array('d')
+    scores = array('d')
+    for chunk in chunks:
+        times.extend(chunk.times)
+        scores.extend(chunk.scores)
+    return SceneIndex(times, scores)
+
+
+def _index_path(video_path: str, scale_width: int = None, fps: float = None) -> str:
+    # Scores depend on the analysis resolution/rate, so they're part of the key
+    variant = f"{scale_width or 'full'}_{fps or 'native'}"
+    return os.path.join(cache_dir("scenes"), f"{file_fingerprint(video_path)}_{variant}.idx")
+
+
+def load_scene_index(video_path: str, scale_width: int = None, fps: float = None) -> Optional[SceneIndex]:
+    """Return the cached index for this file, or None if it hasn't been built"""
+    try:
+        path = _index_path(video_path, scale_width, fps)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return SceneIndex.from_bytes(f.read())
+    except Exception as e:
+        print(f"[SCENE] Could not read scene index: {e}")
+        return None
+
+
+def get_scene_index(
+    video_path: str,
+    use_cache: bool = True,
+    timeout: float = None,
+    workers: int = 1,
+    duration: float = None,
+    scale_width: int = None,
+    fps: float = None
+) -> Optional[SceneIndex]:
+    """
+    Load the scene index for a video, building and storing it on a cache miss.
+
+    Args:
+        video_path: Source video path
+        use_cache: Read/write the on-disk index (False always re-decodes)
+        timeout: Max seconds for a single-process decode pass
+        workers: >1 splits the decode into that many parallel chunks (needs duration)
+        duration: Source length in seconds
+        scale_width: Downscale width for scoring (None = full resolution)
+        fps: Reduced frame rate for scoring (None = native)
+
+    Returns:
+        SceneIndex, or None if the scores could not be extracted
+    """
+    if use_cache:
+        index = load_scene_index(video_path, scale_width, fps)
+        if index is not None:
+            print(f"[SCENE] Using cached scene index ({len(index)} frames)")
+            return index
+
+    if workers > 1 and duration:
+        index = build_scene_scores_parallel(video_path, duration, workers, scale_width, fps)
+    else:
+        print("[SCENE] Building scene index (one full decode)...")
+        index = build_scene_scores(video_path, timeout=timeout, scale_width=scale_width, fps=fps)
+
+    if index is not None and use_cache:
+        try:
+            meta = {"source": os.path.basename(video_path), "scale_width": scale_width, "fps": fps}
+            atomic_write_bytes(_index_path(video_path, scale_width, fps), index.to_bytes(meta))
+        except Exception as e:
+            print(f"[SCENE] Could not save scene index: {e}")
+
+    return index
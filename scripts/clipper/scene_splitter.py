@@ -3,24 +3,71 @@ Scene Detection & Splitting Module
 Uses FFmpeg to detect scene changes and split video at natural break points
 """
 import os
+import csv
+import glob
 import subprocess
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from typing import List, Tuple
 
-def detect_scenes(video_path: str, threshold: float = 0.3) -> List[float]:
+from scene_index import get_scene_index, load_scene_index, DEFAULT_SCALE_WIDTH, CHUNK_TIMEOUT
+
+# Videos at least this long use chunked, downscaled parallel detection
+PARALLEL_MIN_DURATION = 600
+
+# Stream-copy export is disk bound; more concurrent copies than this just thrash the disk
+MAX_EXPORT_WORKERS = 4
+
+# A segment-muxer piece belongs to a segment if its real (keyframe) start is this close (seconds)
+MUXER_START_TOLERANCE = 1.0
+
+def detect_scenes(
+    video_path: str,
+    threshold: float = 0.3,
+    use_cache: bool = True,
+    workers: int = None,
+    fps: float = None
+) -> List[float]:
     """
     Detect scene changes in a video using FFmpeg.
     
+    Per-frame scene scores are stored in an on-disk index the first time a
+    video is seen, so later calls with any threshold skip the decode.
+    Long videos are split into chunks decoded in parallel at low resolution.
+    
     Args:
         video_path: Path to video file
         threshold: Scene detection sensitivity (0.0-1.0, lower = more sensitive)
+        use_cache: Use the persistent scene index
+        workers: Parallel chunk count (None = all cores for long videos, 1 = single pass)
+        fps: Optional reduced frame rate for parallel detection
     
     Returns:
         List of timestamps (in seconds) where scene changes occur
     """
     print(f"[SCENE] Detecting scenes in {os.path.basename(video_path)}...")
     
+    duration = get_video_duration(video_path)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if duration >= PARALLEL_MIN_DURATION else 1
+    
+    # Index key: the parallel build decodes downscaled (and optionally at reduced fps)
+    scale_width, index_fps = (DEFAULT_SCALE_WIDTH, fps) if workers > 1 else (None, None)
+    if workers > 1:
+        index = get_scene_index(
+            video_path, use_cache=use_cache, workers=workers,
+            duration=duration, scale_width=scale_width, fps=index_fps
+        )
+    else:
+        # Same cap as a single decode chunk, so a hung decode can't block forever
+        index = get_scene_index(video_path, use_cache=use_cache, timeout=CHUNK_TIMEOUT)
+    if index is not None:
+        timestamps = index.timestamps(threshold)
+        print(f"[SCENE] Found {len(timestamps)} scene changes")
+        return timestamps
+    
     # Escape path for lavfi filter
     escaped_path = video_path.replace(chr(92), '/').replace(':', r'\:')
     
@@ -39,7 +86,7 @@ def detect_scenes(video_path: str, threshold: float = 0.3) -> List[float]:
         
         if result.returncode != 0:
             # Try alternative method
-            return detect_scenes_alternative(video_path, threshold)
+            return detect_scenes_alternative(video_path, threshold, scale_width, index_fps)
         
         data = json.loads(result.stdout)
         timestamps = []
@@ -54,16 +101,25 @@ def detect_scenes(video_path: str, threshold: float = 0.3) -> List[float]:
         
     except Exception as e:
         print(f"[SCENE] Detection error: {e}")
-        return detect_scenes_alternative(video_path, threshold)
+        return detect_scenes_alternative(video_path, threshold, scale_width, index_fps)
 
 
-def detect_scenes_alternative(video_path: str, threshold: float = 0.3) -> List[float]:
+def detect_scenes_alternative(video_path: str, threshold: float = 0.3,
+                              scale_width: int = None, fps: float = None) -> List[float]:
     """
     Alternative scene detection using ffmpeg filter output.
     More compatible across different systems.
+    
+    scale_width/fps select the scene index to reuse (as passed to get_scene_index).
     """
     print("[SCENE] Using alternative detection method...")
     
+    index = load_scene_index(video_path, scale_width=scale_width, fps=fps)
+    if index is not None:
+        timestamps = index.timestamps(threshold)
+        print(f"[SCENE] Found {len(timestamps)} scene changes (cached)")
+        return timestamps
+    
     cmd = [
         'ffmpeg',
         '-i', video_path,
@@ -110,30 +166,30 @@ def get_video_duration(video_path: str) -> float:
         return 0
 
 
-def split_at_scenes(video_path: str, output_dir: str, min_duration: float = 5.0, max_duration: float = 60.0) -> List[str]:
-    """
-    Split video into segments at natural scene boundaries.
-    
-    Args:
-        video_path: Source video path
-        output_dir: Directory to save segments
-        min_duration: Minimum segment length (seconds)
-        max_duration: Maximum segment length (seconds)
+def has_audio_stream(video_path: str) -> bool:
+    """Check whether the file contains at least one audio stream"""
+    cmd = [
+        'ffprobe',
+        '-v', 'quiet',
+        '-select_streams', 'a',
+        '-show_entries', 'stream=index',
+        '-of', 'json',
+        video_path
+    ]
     
-    Returns:
-        List of output file paths
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        data = json.loads(result.stdout)
+        return len(data.get('streams', [])) > 0
+    except:
+        return False
+
+
+def plan_segments(scene_times: List[float], total_duration: float, min_duration: float = 5.0, max_duration: float = 60.0) -> List[Tuple[float, float]]:
+    """
+    Turn scene-change timestamps into (start, end) segments,
+    merging short scenes and splitting long ones.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Get video duration
-    total_duration = get_video_duration(video_path)
-    if total_duration == 0:
-        print("[SCENE] Could not get video duration")
-        return []
-    
-    # Detect scenes
-    scene_times = detect_scenes(video_path)
-    
     # Add start and end points
     scene_times = [0] + scene_times + [total_duration]
     scene_times = sorted(list(set(scene_times)))  # Remove duplicates
@@ -142,7 +198,7 @@ def split_at_scenes(video_path: str, output_dir: str, min_duration: float = 5.0,
     segments = []
     current_start = 0
     
-    for i, time in enumerate(scene_times[1:], 1):
+    for time in scene_times[1:]:
         duration = time - current_start
         
         if duration >= min_duration:
@@ -158,33 +214,222 @@ def split_at_scenes(video_path: str, output_dir: str, min_duration: float = 5.0,
                         segments.append((current_start, end))
                     current_start = end
     
+    return segments
+
+
+def _export_segment(video_path: str, start: float, end: float, output_path: str) -> dict:
+    """Stream-copy one segment with input seeking and time it"""
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-ss', str(start),
+        '-i', video_path,
+        '-t', str(end - start),
+        '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero',
+        output_path
+    ]
+    
+    began = perf_counter()
+    error = None
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            error = f"ffmpeg exited with {result.returncode}: {result.stderr.strip()[-300:]}"
+    except Exception as e:
+        error = str(e)
+    
+    # A failed run (-y leaves a truncated file) or a leftover must not look like a segment
+    if error is not None and os.path.exists(output_path):
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+    
+    return {
+        "path": output_path,
+        "start": start,
+        "end": end,
+        "elapsed": perf_counter() - began,
+        "ok": error is None,
+        "error": error
+    }
+
+
+def export_segments_pool(video_path: str, segments: List[Tuple[float, float]], output_paths: List[str], workers: int = None) -> List[dict]:
+    """
+    Export segments with a bounded pool of concurrent FFmpeg stream copies.
+    
+    Returns:
+        One result dict per segment (path, start, end, elapsed, ok, error), in segment order
+    """
+    workers = workers or min(os.cpu_count() or 1, MAX_EXPORT_WORKERS)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_export_segment, video_path, start, end, output_path)
+            for (start, end), output_path in zip(segments, output_paths)
+        ]
+        return [future.result() for future in futures]
+
+
+def _read_segment_list(list_path: str, output_dir: str) -> List[Tuple[str, float, float]]:
+    """(piece path, real start, real end) rows from an FFmpeg CSV segment list"""
+    pieces = []
+    with open(list_path, "r", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) >= 3:
+                pieces.append((os.path.join(output_dir, os.path.basename(row[0])), float(row[1]), float(row[2])))
+    return pieces
+
+
+def export_segments_muxer(video_path: str, segments: List[Tuple[float, float]], output_paths: List[str], total_duration: float) -> List[dict]:
+    """
+    Export all segments with a single FFmpeg segment-muxer pass.
+    
+    The source is read once and cut at every segment boundary. Cuts land on
+    the next keyframe, as with any stream copy, so two boundaries inside one
+    GOP produce a single piece: pieces are matched to segments by the real
+    start times FFmpeg reports in its segment list (within
+    MUXER_START_TOLERANCE), never by index. Unmatched pieces (dropped short
+    tails, merged boundaries) are deleted.
+    
+    Returns:
+        One result dict per segment; elapsed is None since the pieces share one process
+    """
+    boundaries = sorted({round(t, 3) for seg in segments for t in seg if 0 < t < total_duration})
+    
+    output_dir = os.path.dirname(output_paths[0]) if output_paths else "."
+    pattern = os.path.join(output_dir, "_piece%04d.mp4")
+    list_path = os.path.join(output_dir, "_pieces.csv")
+    
+    # Leftovers from an earlier or failed run must never be renamed into an output
+    for stale in glob.glob(os.path.join(output_dir, "_piece*")):
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+    
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-i', video_path,
+        '-map', '0',
+        '-c', 'copy',
+        '-f', 'segment',
+        '-reset_timestamps', '1',
+        '-segment_list', list_path,
+        '-segment_list_type', 'csv',
+    ]
+    if boundaries:
+        cmd += ['-segment_times', ",".join(f"{t:.3f}" for t in boundaries)]
+    cmd.append(pattern)
+    
+    began = perf_counter()
+    error = None
+    pieces = []
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        if result.returncode != 0:
+            error = f"ffmpeg exited with {result.returncode}: {result.stderr.strip()[-300:]}"
+        else:
+            pieces = _read_segment_list(list_path, output_dir)
+    except Exception as e:
+        error = str(e)
+    elapsed = perf_counter() - began
+    
+    # Each piece goes to the segment whose planned start is closest to its real start
+    matches = {}
+    for k, (_, piece_start, _) in enumerate(pieces):
+        candidates = [
+            (abs(piece_start - start), i) for i, (start, _) in enumerate(segments)
+            if i not in matches and abs(piece_start - start) <= MUXER_START_TOLERANCE
+        ]
+        if candidates:
+            matches[min(candidates)[1]] = k
+    
+    results = []
+    for i, ((start, end), output_path) in enumerate(zip(segments, output_paths)):
+        if i not in matches:
+            results.append({"path": output_path, "start": start, "end": end, "elapsed": None, "ok": False,
+                            "error": error or "no piece starts near this segment (boundaries share a keyframe)"})
+            continue
+        os.replace(pieces[matches[i]][0], output_path)
+        results.append({"path": output_path, "start": start, "end": end, "elapsed": None, "ok": True, "error": None})
+    
+    # Unmatched pieces (dropped short tails, merged boundaries) and the list
+    for leftover in glob.glob(os.path.join(output_dir, "_piece*")) + [list_path]:
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    
+    print(f"[SCENE] Segment muxer pass took {elapsed:.1f}s")
+    return results
+
+
+def split_at_scenes(
+    video_path: str,
+    output_dir: str,
+    min_duration: float = 5.0,
+    max_duration: float = 60.0,
+    method: str = "pool",
+    workers: int = None
+) -> List[str]:
+    """
+    Split video into segments at natural scene boundaries.
+    
+    Args:
+        video_path: Source video path
+        output_dir: Directory to save segments
+        min_duration: Minimum segment length (seconds)
+        max_duration: Maximum segment length (seconds)
+        method: "pool" (concurrent stream copies) or "segment" (one segment-muxer pass)
+        workers: Pool size for "pool" (default: cores, capped at MAX_EXPORT_WORKERS)
+    
+    Returns:
+        List of output file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Get video duration
+    total_duration = get_video_duration(video_path)
+    if total_duration == 0:
+        print("[SCENE] Could not get video duration")
+        return []
+    
+    # Detect scenes
+    scene_times = detect_scenes(video_path)
+    segments = plan_segments(scene_times, total_duration, min_duration, max_duration)
+    
     print(f"[SCENE] Splitting into {len(segments)} segments...")
     
     # Extract segments
-    output_files = []
     base_name = os.path.splitext(os.path.basename(video_path))[0]
+    output_paths = [
+        os.path.join(output_dir, f"{base_name}_scene{i+1:02d}.mp4")
+        for i in range(len(segments))
+    ]
     
-    for i, (start, end) in enumerate(segments):
-        output_path = os.path.join(output_dir, f"{base_name}_scene{i+1:02d}.mp4")
-        
-        cmd = [
-            'ffmpeg',
-            '-y',
-            '-i', video_path,
-            '-ss', str(start),
-            '-t', str(end - start),
-            '-c', 'copy',
-            '-avoid_negative_ts', 'make_zero',
-            output_path
-        ]
-        
-        try:
-            subprocess.run(cmd, capture_output=True, timeout=120)
-            if os.path.exists(output_path):
-                print(f"[SCENE] Created: {os.path.basename(output_path)} ({end-start:.1f}s)")
-                output_files.append(output_path)
-        except Exception as e:
-            print(f"[SCENE] Error creating segment {i+1}: {e}")
+    began = perf_counter()
+    if method == "segment":
+        results = export_segments_muxer(video_path, segments, output_paths, total_duration)
+    else:
+        results = export_segments_pool(video_path, segments, output_paths, workers)
+    wall_time = perf_counter() - began
+    
+    output_files = []
+    for i, result in enumerate(results):
+        name = os.path.basename(result["path"])
+        length = result["end"] - result["start"]
+        if result["ok"]:
+            timing = f", {result['elapsed']:.2f}s" if result["elapsed"] is not None else ""
+            print(f"[SCENE] Created: {name} ({length:.1f}s{timing})")
+            output_files.append(result["path"])
+        else:
+            print(f"[SCENE] Error creating segment {name}: {result['error']}")
+    
+    if results:
+        print(f"[SCENE] Exported {len(output_files)}/{len(results)} segments in {wall_time:.1f}s "
+              f"({len(output_files) / max(wall_time, 1e-6):.1f} segments/s, method={method})")
     
     return output_files
 
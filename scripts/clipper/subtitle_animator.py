@@ -2,11 +2,11 @@
 Animated Subtitles Module
 Creates TikTok-style word-by-word animated captions with highlighting effects
 """
-import os
-import re
 import subprocess
 from typing import List, Tuple
 
+from cues import load_cues
+
 # Subtitle styling presets
 STYLES = {
     "tiktok": {
@@ -63,50 +63,72 @@ def parse_srt(srt_path: str) -> List[dict]:
     Returns:
         List of dicts with start, end (seconds), and text
     """
-    if not os.path.exists(srt_path):
-        return []
-    
-    with open(srt_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    entries = []
-    pattern = r'(\d+)\n(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})\n(.+?)(?=\n\n|\Z)'
-    
-    for match in re.finditer(pattern, content, re.DOTALL):
-        idx, start_str, end_str, text = match.groups()
-        
-        entries.append({
-            "index": int(idx),
-            "start": srt_time_to_seconds(start_str),
-            "end": srt_time_to_seconds(end_str),
-            "text": text.strip().replace('\n', ' ')
-        })
-    
-    return entries
+    return load_cues(srt_path).entries()
 
 
 def parse_vtt(vtt_path: str) -> List[dict]:
     """Parse VTT file into list of subtitle entries."""
-    if not os.path.exists(vtt_path):
-        return []
+    return load_cues(vtt_path).entries()
+
+
+def load_subtitle_entries(subtitle_path: str) -> List[dict]:
+    """Parse an SRT or VTT file (shared cue index, parsed once per file)."""
+    return load_cues(subtitle_path).entries()
+
+
+def load_clip_entries(subtitle_path: str, offset: float = 0, duration: float = None) -> List[dict]:
+    """
+    Subtitle entries for one clip window, re-timed to the clip.
     
-    with open(vtt_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
+    Uses the cached cue index, so only the cues inside the window are visited.
+    """
+    return load_cues(subtitle_path).clip_entries(offset, duration)
+
+
+def shift_entries(entries: List[dict], offset: float = 0, duration: float = None) -> List[dict]:
+    """
+    Re-time subtitle entries so they start relative to a clip.
     
-    entries = []
-    pattern = r'(\d{2}:\d{2}:\d{2}\.\d{3}|\d{2}:\d{2}\.\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}\.\d{3}|\d{2}:\d{2}\.\d{3})\n(.+?)(?=\n\n|\Z)'
+    Args:
+        entries: Parsed subtitle entries (source video timeline)
+        offset: Clip start time in the source video (seconds)
+        duration: Clip length; entries outside [0, duration] are dropped
+    
+    Returns:
+        New list of entries on the clip timeline
+    """
+    shifted = []
     
-    for i, match in enumerate(re.finditer(pattern, content, re.DOTALL)):
-        start_str, end_str, text = match.groups()
+    for entry in entries:
+        start = entry['start'] - offset
+        end = entry['end'] - offset
+        
+        if end <= 0:
+            continue
+        if duration is not None:
+            if start >= duration:
+                continue
+            end = min(end, duration)
         
-        entries.append({
-            "index": i + 1,
-            "start": vtt_time_to_seconds(start_str),
-            "end": vtt_time_to_seconds(end_str),
-            "text": text.strip().replace('\n', ' ')
+        shifted.append({
+            "index": len(shifted) + 1,
+            "start": max(0.0, start),
+            "end": end,
+            "text": entry['text']
         })
     
-    return entries
+    return shifted
+
+
+def write_srt(entries: List[dict], output_path: str) -> str:
+    """Write subtitle entries to an SRT file."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for i, entry in enumerate(entries, 1):
+            f.write(f"{i}\n")
+            f.write(f"{seconds_to_srt_time(entry['start'])} --> {seconds_to_srt_time(entry['end'])}\n")
+            f.write(f"{entry['text']}\n\n")
+    
+    return output_path
 
 
 def srt_time_to_seconds(time_str: str) -> float:
@@ -166,7 +188,9 @@ def create_ass_subtitle(
     subtitle_path: str, 
     output_path: str, 
     style: str = "tiktok",
-    animate: bool = True
+    animate: bool = True,
+    offset: float = 0,
+    duration: float = None
 ) -> str:
     """
     Create an ASS subtitle file with optional word-by-word animation.
@@ -176,15 +200,14 @@ def create_ass_subtitle(
         output_path: Output ASS file path
         style: Style preset name
         animate: If True, create word-by-word animation
+        offset: Clip start time; subtitles are shifted so this becomes 0
+        duration: Clip length; subtitles after the clip are dropped
     
     Returns:
         Path to created ASS file
     """
-    # Parse input subtitles
-    if subtitle_path.endswith('.srt'):
-        entries = parse_srt(subtitle_path)
-    else:
-        entries = parse_vtt(subtitle_path)
+    # Parse input subtitles (re-timed to the clip window)
+    entries = load_clip_entries(subtitle_path, offset, duration)
     
     if not entries:
         print("[SUBS] No subtitles found")
@@ -297,12 +320,23 @@ def seconds_to_ass_time(seconds: float) -> str:
     return f"{hours}:{minutes:02d}:{secs:05.2f}"
 
 
+def seconds_to_srt_time(seconds: float) -> str:
+    """Convert seconds to SRT timestamp format (HH:MM:SS,mmm)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
 def burn_animated_subtitles(
     video_path: str, 
     subtitle_path: str, 
     output_path: str,
     style: str = "tiktok",
-    animate: bool = True
+    animate: bool = True,
+    offset: float = 0,
+    duration: float = None
 ) -> str:
     """
     Burn animated subtitles onto video using FFmpeg.
@@ -313,13 +347,15 @@ def burn_animated_subtitles(
         output_path: Output video path
         style: Style preset
         animate: Enable word-by-word animation
+        offset: Start of the clip in the subtitle timeline (seconds)
+        duration: Clip length (seconds)
     
     Returns:
         Path to output video
     """
     # Create ASS file
     ass_path = subtitle_path.rsplit('.', 1)[0] + '.ass'
-    create_ass_subtitle(subtitle_path, ass_path, style, animate)
+    create_ass_subtitle(subtitle_path, ass_path, style, animate, offset, duration)
     
     # Escape path for FFmpeg filter
     ass_path_escaped = ass_path.replace('\\', '/').replace(':', r'\:')
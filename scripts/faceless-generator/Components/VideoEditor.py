@@ -1,9 +1,22 @@
 import os
+import sys
 import subprocess
 import random
 import math
+from pathlib import Path
 from .Configuration import VideoConfig
 
+# Persistent scene index is shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent / "clipper"))
+try:
+    from scene_index import get_scene_index
+except ImportError:
+    get_scene_index = None
+
+# Single-process cut extraction lives next to main.py
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from cut_extractor import extract_cuts, VERTICAL_CUT_FILTER
+
 class VideoEditor:
     def __init__(self, config: VideoConfig):
         self.config = config
@@ -28,6 +41,11 @@ class VideoEditor:
     def _get_scene_changes(self, video_path: str, threshold: float = 0.4) -> list:
         """Detect scene changes using ffmpeg."""
         print("Detecting smart cut points...")
+        if get_scene_index:
+            index = get_scene_index(video_path)
+            if index is not None:
+                return index.timestamps(threshold)
+
         cmd = [
             'ffmpeg', '-i', video_path,
             '-filter_complex', f"select='gt(scene,{threshold})',metadata=print:file=-",
@@ -59,7 +77,8 @@ class VideoEditor:
         except:
              scene_changes = [0.0, video_duration]
 
-        cuts = []
+        starts = []
+        zoom_filters = []
         for i in range(num_cuts):
              # Find a good start time
              target_start = (video_duration * time_offset) + (i * (video_duration/num_cuts))
@@ -70,9 +89,7 @@ class VideoEditor:
              # Avoid end of video
              if start_time + clip_duration > video_duration:
                  start_time = max(0, video_duration - clip_duration)
-             
-             output_path = self.config.temp_dir / f"cut_{session_id}_{i:03d}.mp4"
-             output_path_str = str(output_path)
+             starts.append(start_time)
              
              # Ken Burns Effect (Zoom/Pan)
              # Randomly zoom in or pan
@@ -80,37 +97,17 @@ class VideoEditor:
                  "zoompan=z='min(zoom+0.0015,1.5)':d=125:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s=1080x1920", # Zoom In Center
                  "zoompan=z='min(zoom+0.0015,1.5)':d=125:x='iw/2-(iw/zoom/2)':y='0':s=1080x1920", # Zoom Top
              ])
-             
-             cmd = [
-                'ffmpeg', '-y',
-                '-ss', str(start_time),
-                '-i', video_path,
-                '-t', str(clip_duration),
-                '-vf', f"scale=1920:1080,crop=1080:1920:(iw-1080)/2:0,{zoom_effect}",
-                '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
-                '-c:a', 'aac', '-b:a', '128k',
-                output_path_str
-             ]
-             
-             # Fallback to simple crop if Ken Burns fails (e.g. resolution issues)
-             try:
-                 subprocess.run(cmd, capture_output=True, check=True)
-             except:
-                 cmd = [
-                    'ffmpeg', '-y',
-                    '-ss', str(start_time),
-                    '-i', video_path,
-                    '-t', str(clip_duration),
-                    '-vf', 'scale=1400:-2,crop=1080:ih:(iw-1080)/2:0,pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black',
-                    '-c:v', 'libx264', '-preset', 'ultrafast',
-                    '-c:a', 'aac',
-                    output_path_str
-                 ]
-                 subprocess.run(cmd, capture_output=True, check=True)
-                 
-             cuts.append(output_path_str)
-             
-        return cuts
+             zoom_filters.append(f"scale=1920:1080,crop=1080:1920:(iw-1080)/2:0,{zoom_effect}")
+        
+        output_paths = [str(self.config.temp_dir / f"cut_{session_id}_{i:03d}.mp4") for i in range(num_cuts)]
+        durations = [clip_duration] * num_cuts
+        
+        # All cuts in one FFmpeg process
+        # Fallback to simple crop if Ken Burns fails (e.g. resolution issues)
+        try:
+            return extract_cuts(video_path, starts, durations, output_paths, video_filters=zoom_filters)
+        except subprocess.CalledProcessError:
+            return extract_cuts(video_path, starts, durations, output_paths, video_filters=[VERTICAL_CUT_FILTER] * num_cuts)
 
     def concatenate_clips(self, clips: list, output_path: str, target_duration: float = None):
         concat_file = self.config.temp_dir / f"concat_clips_{random.randint(0,9999)}.txt"
@@ -0,0 +1,161 @@
+"""
+Audio Assembly
+Builds the narration track from per-sentence TTS clips in memory: clips
+are decoded to float32 PCM and concatenated, silences in the joined
+track are shortened with a vectorized energy threshold, gain is applied
+with NumPy, and the result is encoded once. Sentence timestamps come from sample
+counts, so they are exact without probing any file.
+"""
+import wave
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+# Working rate for assembly (Edge/Google/XTTS all produce 24 kHz speech)
+ASSEMBLY_SAMPLE_RATE = 24000
+
+# Silence detection: 10 ms frames quieter than -50 dB RMS; every silence is cut to 0.1 s
+SILENCE_FRAME_SECONDS = 0.01
+SILENCE_THRESHOLD_DB = -50.0
+SILENCE_KEEP_SECONDS = 0.1
+
+# Parallel clip decodes (each is one short FFmpeg process)
+DECODE_WORKERS = 4
+
+
+def _read_wav(path: str, sample_rate: int):
+    """16-bit mono WAV at sample_rate read without FFmpeg (None if the format differs)"""
+    try:
+        with wave.open(path, "rb") as f:
+            if f.getnchannels() != 1 or f.getsampwidth() != 2 or f.getframerate() != sample_rate:
+                return None
+            data = f.readframes(f.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def decode_pcm(path: str, sample_rate: int = ASSEMBLY_SAMPLE_RATE) -> np.ndarray:
+    """Decode an audio file to mono float32 PCM at sample_rate (raises on failure)"""
+    if path.lower().endswith(".wav"):
+        samples = _read_wav(path, sample_rate)
+        if samples is not None:
+            return samples
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "f32le", "-"
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise Exception(f"Audio decode failed for {path}: {result.stderr.decode(errors='ignore')[-300:]}")
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+
+def silence_keep_mask(samples: np.ndarray, sample_rate: int = ASSEMBLY_SAMPLE_RATE,
+                      threshold_db: float = SILENCE_THRESHOLD_DB, keep_seconds: float = SILENCE_KEEP_SECONDS) -> np.ndarray:
+    """
+    Per-sample mask of what survives silence compression.
+
+    Works on 10 ms frames: frame RMS below threshold_db counts as silence,
+    and only the first keep_seconds of each silent run (leading, inner and
+    trailing) are kept.
+    """
+    frame = max(1, int(sample_rate * SILENCE_FRAME_SECONDS))
+    if len(samples) < frame:
+        return np.ones(len(samples), dtype=bool)
+
+    pad = (-len(samples)) % frame
+    frames = np.pad(samples, (0, pad)).reshape(-1, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    silent = rms < 10 ** (threshold_db / 20)
+
+    # Position of each frame inside its silent run (leading run counts from 0)
+    index = np.arange(len(silent))
+    last_loud = np.maximum.accumulate(np.where(silent, -1, index))
+    keep = ~silent | (index - last_loud - 1 < int(round(keep_seconds / SILENCE_FRAME_SECONDS)))
+    return np.repeat(keep, frame)[:len(samples)]
+
+
+def compress_silence(samples: np.ndarray, sample_rate: int = ASSEMBLY_SAMPLE_RATE,
+                     threshold_db: float = SILENCE_THRESHOLD_DB, keep_seconds: float = SILENCE_KEEP_SECONDS) -> np.ndarray:
+    """Shorten every silent run (leading, inner and trailing) to keep_seconds"""
+    return samples[silence_keep_mask(samples, sample_rate, threshold_db, keep_seconds)]
+
+
+def _atempo_chain(tempo: float) -> str:
+    """atempo filters for any tempo (a single atempo only accepts 0.5-2.0)"""
+    filters = []
+    while tempo > 2.0:
+        filters.append("atempo=2.0")
+        tempo /= 2.0
+    while tempo < 0.5:
+        filters.append("atempo=0.5")
+        tempo /= 0.5
+    filters.append(f"atempo={tempo:.6f}")
+    return ",".join(filters)
+
+
+def encode_pcm(samples: np.ndarray, output_path: str, sample_rate: int = ASSEMBLY_SAMPLE_RATE,
+               tempo: float = 1.0, bitrate: str = "192k") -> str:
+    """Encode float32 PCM to MP3 in one FFmpeg process (with an optional tempo change)"""
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "-"
+    ]
+    if abs(tempo - 1.0) > 1e-3:
+        cmd += ["-af", _atempo_chain(tempo)]
+    cmd += ["-c:a", "libmp3lame", "-b:a", bitrate, output_path]
+
+    result = subprocess.run(cmd, input=np.ascontiguousarray(samples, dtype=np.float32).tobytes(), capture_output=True)
+    if result.returncode != 0:
+        raise Exception(f"Narration encode failed: {result.stderr.decode(errors='ignore')[-300:]}")
+    return output_path
+
+
+def assemble_narration(clip_paths: List[str], output_path: str, trim_silence: bool = True,
+                       volume: float = 1.0, tempo: float = 1.0,
+                       sample_rate: int = ASSEMBLY_SAMPLE_RATE) -> Tuple[str, List[Tuple[float, float]]]:
+    """
+    Join sentence clips into one narration track without gaps.
+
+    Args:
+        clip_paths: Sentence clips in narration order
+        output_path: Encoded narration (MP3)
+        trim_silence: Shorten every silence in the joined track (sentence gaps included)
+        volume: Linear gain (samples are clipped to full scale)
+        tempo: Playback speed applied in the final encode (1.0 = unchanged)
+        sample_rate: Working sample rate
+
+    Returns:
+        (output_path, [(start, end), ...]) with one span per clip on the final timeline
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(DECODE_WORKERS, len(clip_paths)))) as pool:
+        buffers = list(pool.map(lambda path: decode_pcm(path, sample_rate), clip_paths))
+
+    lengths = np.array([len(samples) for samples in buffers], dtype=np.int64)
+    audio = np.concatenate(buffers) if buffers else np.zeros(0, dtype=np.float32)
+    # Clip boundaries as sample offsets into the joined buffer
+    boundaries = np.cumsum(lengths)
+
+    if trim_silence:
+        # Once over the joined track, so a sentence gap (trailing + leading silence) keeps
+        # keep_seconds in total; boundaries move by the samples dropped before them
+        keep = silence_keep_mask(audio, sample_rate)
+        kept_before = np.concatenate(([0], np.cumsum(keep, dtype=np.int64)))
+        audio = audio[keep]
+        boundaries = kept_before[boundaries]
+
+    if volume != 1.0:
+        audio = np.clip(audio * volume, -1.0, 1.0)
+
+    encode_pcm(audio, output_path, sample_rate, tempo)
+
+    # Exact spans from sample counts (the tempo change scales the whole timeline)
+    ends = boundaries / sample_rate / tempo
+    starts = np.concatenate(([0.0], ends[:-1])) if len(ends) else ends
+    return output_path, list(zip(starts.tolist(), ends.tolist()))
@@ -0,0 +1,96 @@
+"""
+Cut Extractor
+Extracts every quick cut of a variation in one FFmpeg process. Each cut
+is its own input-seeked, duration-limited input (-ss/-t before -i, so
+FFmpeg only decodes the frames it needs), gets its own scale/crop/pad
+branch in one filtergraph, and is written either as separate files or
+joined straight into one video with the concat filter.
+"""
+import subprocess
+from typing import List, Optional
+
+# 9:16 framing used for the quick cuts: zoom to 1400 wide, crop 1080, pad to 1080x1920
+VERTICAL_CUT_FILTER = 'scale=1400:-2,crop=1080:ih:(iw-1080)/2:0,pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black'
+
+# Silent audio for sources without an audio track (keeps every cut/concat stream-compatible)
+SILENT_AUDIO = "aevalsrc=0|0:c=stereo:s=44100"
+
+
+def has_audio(video_path: str) -> bool:
+    """True if the file has at least one audio stream"""
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'a',
+        '-show_entries', 'stream=index', '-of', 'csv=p=0', video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return bool(result.stdout.strip())
+
+
+def build_cut_graph(durations: List[float], video_filters: List[str], audio: bool, concat: bool) -> str:
+    """
+    filter_complex with one branch per cut input.
+
+    Branch k reads input k and produces [vk]/[ak]; with concat=True the
+    branches are joined into [vout]/[aout].
+    """
+    parts = []
+    for k, (duration, video_filter) in enumerate(zip(durations, video_filters)):
+        # trim mirrors an output -t for filters that change the frame count (e.g. zoompan)
+        parts.append(f"[{k}:v]{video_filter},trim=duration={duration:.3f},setsar=1,setpts=PTS-STARTPTS[v{k}]")
+        if audio:
+            parts.append(
+                f"[{k}:a]aresample=44100,aformat=channel_layouts=stereo,"
+                f"atrim=duration={duration:.3f},asetpts=PTS-STARTPTS[a{k}]"
+            )
+        else:
+            parts.append(f"{SILENT_AUDIO}:d={duration:.3f}[a{k}]")
+
+    if concat:
+        streams = "".join(f"[v{k}][a{k}]" for k in range(len(durations)))
+        parts.append(f"{streams}concat=n={len(durations)}:v=1:a=1[vout][aout]")
+    return ";".join(parts)
+
+
+def extract_cuts(video_path: str, starts: List[float], durations: List[float],
+                 output_paths: Optional[List[str]] = None, concat_path: Optional[str] = None,
+                 video_filters: Optional[List[str]] = None, preset: str = 'ultrafast',
+                 crf: str = '23', audio_bitrate: str = '128k') -> List[str]:
+    """
+    Extract all cuts with a single FFmpeg invocation.
+
+    Args:
+        video_path: Source video
+        starts: Start time of each cut (seconds)
+        durations: Length of each cut (seconds)
+        output_paths: One file per cut (ignored when concat_path is set)
+        concat_path: Write the cuts joined in order to this single file instead
+        video_filters: Per-cut video filter (default VERTICAL_CUT_FILTER for all)
+        preset: x264 preset
+        crf: x264 quality
+        audio_bitrate: AAC bitrate
+
+    Returns:
+        The written paths ([concat_path] when concatenating)
+    """
+    video_filters = video_filters or [VERTICAL_CUT_FILTER] * len(starts)
+    concat = concat_path is not None
+    audio = has_audio(video_path)
+
+    cmd = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error']
+    for start, duration in zip(starts, durations):
+        cmd += ['-ss', f"{start:.3f}", '-t', f"{duration:.3f}", '-i', video_path]
+    cmd += ['-filter_complex', build_cut_graph(durations, video_filters, audio, concat)]
+
+    encode = ['-c:v', 'libx264', '-preset', preset, '-crf', crf, '-c:a', 'aac', '-b:a', audio_bitrate]
+    if concat:
+        cmd += ['-map', '[vout]', '-map', '[aout]'] + encode + [concat_path]
+        outputs = [concat_path]
+    else:
+        for k, output_path in enumerate(output_paths):
+            cmd += ['-map', f'[v{k}]', '-map', f'[a{k}]'] + encode + [output_path]
+        outputs = list(output_paths)
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+    return outputs
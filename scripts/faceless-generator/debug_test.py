@@ -20,8 +20,7 @@ try:
     from main import (
         generate_tts_with_timestamps,
         create_video_cuts,
-        get_audio_duration,
-        session_id
+        VariationContext
     )
     print("✓ All imports successful")
 except Exception as e:
@@ -0,0 +1,210 @@
+"""
+Local TTS
+Resident Coqui XTTS voice cloning. The model is loaded once per process
+and reused by every call; speaker conditioning (GPT latents + speaker
+embedding) is computed once per reference recording and cached on disk,
+so each sentence only pays for inference.
+"""
+import os
+import sys
+import json
+import wave
+import hashlib
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+import tts_cache
+
+# Cache location/helpers are shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "clipper"))
+try:
+    from cache_utils import cache_dir, file_fingerprint
+except ImportError:
+    cache_dir = None
+    file_fingerprint = None
+
+XTTS_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+XTTS_SAMPLE_RATE = 24000
+
+# CPU by default (avoids CUDA dependency issues); XTTS_GPU=1 to opt in
+XTTS_GPU = os.getenv("XTTS_GPU", "0") == "1"
+
+# Cloned clips are cached under "<reference fingerprint>:<tag>"; the tag marks clips
+# synthesized with the model-config settings below (bump if those settings change)
+XTTS_CLIP_TAG = "config-v1"
+
+# Loaded models and conditioning, one per process
+_models = {}
+_latents = {}
+_lock = threading.Lock()
+
+
+def get_xtts(gpu: bool = XTTS_GPU):
+    """Return the resident XTTS wrapper, loading it on first use only"""
+    model = _models.get(gpu)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(gpu)
+        if model is None:
+            print("Initializing Coqui XTTS (This may take a while first time)...")
+            from TTS.api import TTS
+            model = TTS(XTTS_MODEL, gpu=gpu)
+            _models[gpu] = model
+            print("✓ Coqui XTTS Initialized")
+    return model
+
+
+def conditioning_settings(model) -> dict:
+    """get_conditioning_latents() arguments from the model config (as Xtts.synthesize passes them)"""
+    config = model.config
+    return {
+        "gpt_cond_len": config.gpt_cond_len,
+        "gpt_cond_chunk_len": config.gpt_cond_chunk_len,
+        "max_ref_length": config.max_ref_len,
+        "sound_norm_refs": config.sound_norm_refs,
+    }
+
+
+def inference_settings(model) -> dict:
+    """inference() sampling arguments from the model config (as Xtts.synthesize passes them)"""
+    config = model.config
+    return {
+        "temperature": config.temperature,
+        "length_penalty": config.length_penalty,
+        "repetition_penalty": config.repetition_penalty,
+        "top_k": config.top_k,
+        "top_p": config.top_p,
+    }
+
+
+def speaker_latents(tts, reference_path: str):
+    """
+    (gpt_cond_latent, speaker_embedding) for a reference recording.
+
+    Kept in memory for the process and on disk under the cache root, keyed
+    by the reference file's content fingerprint and the conditioning
+    settings they were computed with.
+    """
+    import torch
+
+    model = tts.synthesizer.tts_model
+    settings = conditioning_settings(model)
+    fingerprint = file_fingerprint(reference_path) if file_fingerprint else os.path.abspath(reference_path)
+    settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    key = f"{fingerprint}_{settings_hash}"
+    if key in _latents:
+        return _latents[key]
+
+    path = os.path.join(cache_dir("xtts_speakers"), f"{key}.pt") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            data = torch.load(path, map_location="cpu")
+            latents = (data["gpt_cond_latent"], data["speaker_embedding"])
+            _latents[key] = latents
+            print("✓ Using cached speaker conditioning")
+            return latents
+        except Exception as e:
+            print(f"Speaker cache read failed: {e}")
+
+    print("Computing speaker conditioning from reference audio...")
+    gpt_cond_latent, speaker_embedding = model.get_conditioning_latents(audio_path=[reference_path], **settings)
+    latents = (gpt_cond_latent.cpu(), speaker_embedding.cpu())
+    _latents[key] = latents
+
+    if path:
+        try:
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            torch.save({"gpt_cond_latent": latents[0], "speaker_embedding": latents[1]}, temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Speaker cache write failed: {e}")
+    return latents
+
+
+def write_wav(path: str, samples, sample_rate: int = XTTS_SAMPLE_RATE):
+    """Write float samples in [-1, 1] as 16-bit mono PCM"""
+    pcm = (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def synthesize_xtts(sentences: List[str], output_paths: List[str], reference_path: str,
+                    language: str = "en", use_cache: bool = True) -> list:
+    """
+    Clone the reference voice for each sentence.
+
+    Cached clips (tts_cache, keyed by the reference fingerprint) are reused;
+    the model and speaker conditioning are only loaded if something is
+    left to synthesize. XTTS infers one sentence per call, with the
+    sampling settings from the model config. Durations come from the
+    sample counts.
+
+    Args:
+        sentences: Sentences to speak
+        output_paths: One .wav path per sentence
+        reference_path: Voice sample to clone
+        language: XTTS language code (en, hi, es, fr, ...)
+        use_cache: Reuse/store clips in the TTS clip cache
+
+    Returns:
+        One entry per sentence, in order: (path, duration) or the Exception raised
+    """
+    results = [None] * len(sentences)
+    caching = tts_cache.cache_enabled(use_cache) and file_fingerprint is not None
+    voice = f"{file_fingerprint(reference_path)}:{XTTS_CLIP_TAG}" if caching else None
+
+    pending = []
+    for i, sentence in enumerate(sentences):
+        key = tts_cache.clip_key(sentence, "coqui", voice, language=language) if caching else None
+        cached = tts_cache.lookup_clip(key) if key else None
+        if cached:
+            results[i] = (tts_cache.fetch_clip(cached[0], output_paths[i]), cached[1])
+        else:
+            pending.append((i, key))
+
+    if caching and len(pending) < len(sentences):
+        print(f"✓ TTS cache: {len(sentences) - len(pending)}/{len(sentences)} cloned sentences reused")
+    if not pending:
+        return results
+
+    try:
+        import torch
+        tts = get_xtts()
+        gpt_cond_latent, speaker_embedding = speaker_latents(tts, reference_path)
+    except Exception as e:
+        print(f"⚠️ Coqui Init Failed: {e}. Will fallback to Standard TTS.")
+        for i, _ in pending:
+            results[i] = e
+        return results
+
+    model = tts.synthesizer.tts_model
+    device = next(model.parameters()).device
+    gpt_cond_latent = gpt_cond_latent.to(device)
+    speaker_embedding = speaker_embedding.to(device)
+    settings = inference_settings(model)
+
+    with torch.inference_mode():
+        for n, (i, key) in enumerate(pending, 1):
+            print(f"  Cloning sentence {n} of {len(pending)}...")
+            try:
+                out = model.inference(sentences[i], language, gpt_cond_latent, speaker_embedding, **settings)
+                wav = out["wav"]
+                if hasattr(wav, "cpu"):
+                    wav = wav.cpu().numpy()
+                write_wav(output_paths[i], wav)
+                duration = len(wav) / XTTS_SAMPLE_RATE
+                if key:
+                    tts_cache.store_clip(key, output_paths[i], duration, "coqui", reference_path)
+                results[i] = (output_paths[i], duration)
+            except Exception as e:
+                print(f"⚠️ Coqui Gen Failed: {e}")
+                results[i] = e
+    return results
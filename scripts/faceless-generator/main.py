@@ -16,13 +16,21 @@ import subprocess
 from pathlib import Path
 import shutil
 import uuid
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import whisper  # For word-level subtitles
 
 # Add parent directory for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "shorts-generator"))
 
-from Components.YoutubeDownloader import download_youtube_video
+from Components.YoutubeDownloader import download_youtube_video, media_cache
 from Components.Transcription import transcribeAudio
+from Components.Edit import load_audio_pcm
+from tts_engine import edge_job, google_job, synthesize_cached
+from local_tts import synthesize_xtts
+from audio_assembly import assemble_narration
+from cut_extractor import extract_cuts
 
 # Find and load .env
 from dotenv import load_dotenv
@@ -37,21 +45,64 @@ for parent in [current_dir] + list(current_dir.parents):
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-session_id = str(uuid.uuid4())[:8]
-print(f"Session ID: {session_id}")
+# Variations rendered at once in separate processes (0 = auto: one per 2 cores, at most one per variation)
+VARIATION_WORKERS = int(os.getenv("FACELESS_VARIATION_WORKERS", 0))
 
 
-def extract_audio(video_path: str, output_path: str) -> str:
-    """Extract audio from video using FFmpeg."""
-    print("Extracting audio...")
-    cmd = [
-        'ffmpeg', '-y', '-i', video_path,
-        '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
-        output_path
-    ]
-    subprocess.run(cmd, capture_output=True, check=True)
-    print(f"✓ Audio extracted")
-    return output_path
+class VariationContext:
+    """
+    Everything one variation owns: a session id (part of every temp/output
+    name), a private temp directory and a seeded RNG. Nothing here is
+    shared, so variations can render side by side in separate processes.
+    """
+
+    def __init__(self, variation: int = 1, total: int = 1, temp_root: Path = None, seed: int = None):
+        self.variation = variation
+        self.total = total
+        self.session_id = str(uuid.uuid4())[:8]
+        self.temp_dir = Path(temp_root or Path(__file__).parent / "temp") / self.session_id
+        self.seed = seed if seed is not None else variation * 1000 + int(time.time())
+        self.random = random.Random(self.seed)
+        # Where progress goes: None prints it, otherwise anything with put() (VariationProgress / a queue proxy)
+        self.progress_queue = None
+
+    def progress(self, percent: int, message: str):
+        """Report this variation's progress (30-100%)"""
+        if self.progress_queue is None:
+            print(f"PROGRESS: {percent}% - {message}")
+        else:
+            self.progress_queue.put((self.variation, percent, message))
+
+    def temp_path(self, name: str) -> str:
+        """Path inside this variation's temp directory (created on first use)"""
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        return str(self.temp_dir / name)
+
+    def cleanup(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class VariationProgress:
+    """
+    Folds the progress of every variation into one PROGRESS stream.
+
+    The frontend reads each PROGRESS line as the whole job's progress, so
+    only the parent prints them: the overall figure is the mean of the
+    variations' latest percentages and never moves backwards.
+    """
+
+    def __init__(self, total: int, start: int = 30):
+        self.latest = {variation: start for variation in range(1, total + 1)}
+        self.shown = start
+
+    def put(self, item):
+        variation, percent, message = item
+        self.latest[variation] = max(self.latest[variation], percent)
+        overall = sum(self.latest.values()) // len(self.latest)
+        if overall >= self.shown:
+            self.shown = overall
+            label = f"Variation {variation}: " if len(self.latest) > 1 else ""
+            print(f"PROGRESS: {overall}% - {label}{message}")
 
 
 def get_video_duration(video_path: str) -> float:
@@ -64,9 +115,10 @@ def get_video_duration(video_path: str) -> float:
     return float(result.stdout.strip())
 
 
-def download_youtube_subtitles(url: str) -> str:
+def download_youtube_subtitles(url: str, session_id: str = None) -> str:
     """Download YouTube subtitles/captions directly."""
     print("Downloading YouTube subtitles...")
+    session_id = session_id or str(uuid.uuid4())[:8]
     
     # Clean up any old subtitle files first
     import glob
@@ -76,23 +128,44 @@ def download_youtube_subtitles(url: str) -> str:
         except:
             pass
     
+    # Captions are kept in the shared media cache next to the video
+    video_id = media_cache.video_id_from_url(url) if media_cache else None
+    cached_subs = media_cache.lookup_captions(video_id, "en", "vtt") if video_id else None
+    
     try:
-        # Try to get auto-generated or manual subtitles
-        cmd = [
-            'yt-dlp',
-            '--skip-download',
-            '--write-auto-sub',
-            '--write-sub',
-            '--sub-lang', 'en',
-            '--sub-format', 'vtt',
-            '--output', f'temp_subs_{session_id}',
-            url
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Find the subtitle file
-        subtitle_files = glob.glob(f'temp_subs_{session_id}*.vtt')
+        if cached_subs:
+            print("✓ Using cached subtitles")
+            subtitle_files = [media_cache.materialize(cached_subs, f'temp_subs_{session_id}.en.vtt')]
+        elif cached_subs == "":
+            # Known to have no English subtitles
+            subtitle_files = []
+        else:
+            # Try to get auto-generated or manual subtitles
+            cmd = [
+                'yt-dlp',
+                '--skip-download',
+                '--write-auto-sub',
+                '--write-sub',
+                '--sub-lang', 'en',
+                '--sub-format', 'vtt',
+                '--output', f'temp_subs_{session_id}',
+                url
+            ]
+            
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            
+            # Find the subtitle file
+            subtitle_files = glob.glob(f'temp_subs_{session_id}*.vtt')
+            
+            if video_id and result.returncode == 0:
+                try:
+                    if subtitle_files:
+                        with open(subtitle_files[0], 'r', encoding='utf-8') as f:
+                            media_cache.store_captions(video_id, f.read(), "en", "vtt")
+                    else:
+                        media_cache.store_captions(video_id, None, "en", "vtt")
+                except Exception as e:
+                    print(f"Could not cache subtitles: {e}")
         
         if subtitle_files:
             subtitle_file = subtitle_files[0]
@@ -498,238 +571,115 @@ Return JSON only:
     }
 
 
-def generate_tts_with_timestamps(sentences: list, output_path: str, voice: str = "hi-IN-SwaraNeural", use_coqui: bool = False, reference_path: str = None, language: str = "english", target_duration: float = 30.0) -> tuple:
+def generate_tts_with_timestamps(sentences: list, output_path: str, voice: str = "hi-IN-SwaraNeural", use_coqui: bool = False, reference_path: str = None, language: str = "english", target_duration: float = 30.0, ctx: VariationContext = None) -> tuple:
     """Generate TTS sentence-by-sentence and track exact timestamps.
     STRICTLY enforces target_duration by adjusting tempo.
+    Sentence clips are written to ctx's temp directory.
     Returns: (final_audio_path, list of (sentence, start_time, end_time, duration))
     """
+    ctx = ctx or VariationContext()
     print(f"Generating TTS with real timestamps... (Voice: {voice}, Target: {target_duration}s)")
     
-    sentence_audio_files = []
     sentence_timestamps = []
-    current_time = 0.0
     
-    # Init Coqui XTTS (Lazy Load)
-    coqui_model = None
-    if use_coqui and reference_path and os.path.exists(reference_path):
-        try:
-            print("Initializing Coqui XTTS (This may take a while first time)...")
-            from TTS.api import TTS
-            # Use CPU to avoid complex dependency issues, unless user has CUDA setup
-            coqui_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=False)
-            print("✓ Coqui XTTS Initialized")
-        except Exception as e:
-            print(f"⚠️ Coqui Init Failed: {e}. Will fallback to Standard TTS.")
+    # Voice cloning: resident XTTS model, speaker conditioning cached per reference file
+    use_clone = use_coqui and reference_path and os.path.exists(reference_path)
     
-    for i, sentence in enumerate(sentences):
-        if not sentence.strip():
-            continue
-            
-        print(f"  [{i+1}/{len(sentences)}] Generating: {sentence[:50]}...")
-        
-        if coqui_model:
-            temp_file = f"temp_tts_sentence_{session_id}_{i}.wav"
-            try:
-                # Map language name to code
-                lang_code = "en"
-                if language.lower() == "hindi": lang_code = "hi"
-                elif language.lower() == "spanish": lang_code = "es"
-                elif language.lower() == "french": lang_code = "fr"
-                
-                # XTTS Generation
-                coqui_model.tts_to_file(text=sentence, speaker_wav=reference_path, language=lang_code, file_path=temp_file)
-                
-                # Check success and skip fallback
-                if os.path.exists(temp_file):
-                    duration = get_audio_duration(temp_file)
-                    sentence_timestamps.append({
-                        'sentence': sentence,
-                        'start': current_time,
-                        'end': current_time + duration,
-                        'duration': duration,
-                        'index': i
-                    })
-                    sentence_audio_files.append(temp_file)
-                    current_time += duration
-                    continue # SUCCESS - Skip standard TTS
-            except Exception as e:
-                print(f"⚠️ Coqui Gen Failed: {e}")
-                # Fallback to standard TTS logic below
-                
-        # Check for Google Voice
+    # Map language name to code
+    lang_code = "en"
+    if language.lower() == "hindi": lang_code = "hi"
+    elif language.lower() == "spanish": lang_code = "es"
+    elif language.lower() == "french": lang_code = "fr"
+    
+    def standard_job(i):
+        sentence = sentences[i]
+        temp_file = ctx.temp_path(f"tts_sentence_{i}.mp3")
         if voice.startswith("google:"):
-            print(f"Attempting Google TTS...")
-            try:
-                google_voice_name = voice.split(":", 1)[1]
-                api_key = os.getenv("GOOGLE_TTS_API_KEY") 
-                if not api_key:
-                    api_key = os.getenv("GEMINI_API_KEY")
-                
-                if not api_key:
-                    raise Exception("Missing GOOGLE_TTS_API_KEY in .env")
-                
-                temp_file = f"temp_tts_sentence_{session_id}_{i}.mp3"
-                url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={api_key}"
-                data = {
-                    "input": {"text": sentence},
-                    "voice": {"languageCode": "en-US", "name": google_voice_name},
-                    "audioConfig": {
-                        "audioEncoding": "MP3",
-                        "speakingRate": 1.4,  # Faster to fit 30s naturally
-                        "pitch": 1.0,  # Slight pitch for character (not too high)
-                        "volumeGainDb": 4.0  # Louder voice
-                    }
-                }
-                
-                response = requests.post(url, json=data)
-                if response.status_code == 200:
-                    import base64
-                    audio_content = response.json().get("audioContent")
-                    if audio_content:
-                        with open(temp_file, "wb") as f:
-                            f.write(base64.b64decode(audio_content))
-                    else:
-                        raise Exception("No audio content")
-                else:
-                    raise Exception(f"Google TTS failed: {response.status_code}")
-                    
-            except Exception as e:
-                print(f"⚠️ Google TTS failed: {e}, falling back to Edge TTS")
-                voice = "en-US-GuyNeural" if "Male" in voice else "en-US-JennyNeural"
-                temp_file = f"temp_tts_sentence_{session_id}_{i}.mp3"
-                
-                cmd = [
-                    'edge-tts',
-                    '--voice', voice,
-                    '--rate', '+10%',  # Slightly faster for more energy
-                    '--pitch', '+5Hz',  # Higher pitch for more character
-                    '--volume', '+20%',  # Louder voice
-                    '--text', sentence,
-                    '--write-media', temp_file
-                ]
-                try:
-                    subprocess.run(cmd, capture_output=True, check=True, timeout=60)
-                except subprocess.TimeoutExpired:
-                    print(f"⚠️ Edge TTS timed out, retrying...")
-                    subprocess.run(cmd, capture_output=True, check=True, timeout=60)
-        else:
-            # Edge TTS with louder, more characterized voice
-            temp_file = f"temp_tts_sentence_{session_id}_{i}.mp3"
-            cmd = [
-                'edge-tts',
-                '--voice', voice,
-                '--rate', '+20%',  # Faster to fit 30s naturally
-                '--pitch', '+3Hz',  # Slight pitch for character (not too high)
-                '--volume', '+25%',  # Louder voice
-                '--text', sentence,
-                '--write-media', temp_file
-            ]
-            try:
-                subprocess.run(cmd, capture_output=True, check=True, timeout=60)
-            except subprocess.TimeoutExpired:
-                print(f"⚠️ Edge TTS timed out, retrying...")
-                subprocess.run(cmd, capture_output=True, check=True, timeout=60)
-        
-        # Get exact duration using ffprobe
-        duration = get_audio_duration(temp_file)
-        
-        # Record timestamp
-        start_time = current_time
-        end_time = current_time + duration
+            # Google voice, with a characterful Edge voice if Google fails
+            edge_voice = "en-US-GuyNeural" if "Male" in voice else "en-US-JennyNeural"
+            fallback = edge_job(sentence, temp_file, edge_voice, rate='+10%', pitch='+5Hz', volume='+20%')
+            return google_job(
+                sentence, temp_file, voice.split(":", 1)[1],
+                speaking_rate=1.4,  # Faster to fit 30s naturally
+                pitch=1.0,  # Slight pitch for character (not too high)
+                volume_gain_db=4.0,  # Louder voice
+                fallback=fallback
+            )
+        # Edge TTS with louder, more characterized voice
+        return edge_job(sentence, temp_file, voice, rate='+20%', pitch='+3Hz', volume='+25%')
+    
+    indices = [i for i, sentence in enumerate(sentences) if sentence.strip()]
+    clips = {}
+    jobs = []
+    
+    if use_clone:
+        print(f"Cloning voice for {len(indices)} sentences (Coqui XTTS)...")
+        results = synthesize_xtts(
+            [sentences[i] for i in indices],
+            [ctx.temp_path(f"tts_sentence_{i}.wav") for i in indices],
+            reference_path, lang_code
+        )
+        for i, result in zip(indices, results):
+            if isinstance(result, Exception):
+                # Fallback to standard TTS for this sentence
+                jobs.append((i, standard_job(i)))
+            else:
+                clips[i] = result
+    else:
+        jobs = [(i, standard_job(i)) for i in indices]
+    
+    if jobs:
+        print(f"Synthesizing {len(jobs)} sentences concurrently...")
+        # Cached clips come back with their measured duration (no TTS call, no ffprobe)
+        results = synthesize_cached([job for _, job in jobs])
+        for (i, job), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                raise Exception(f"TTS failed for sentence {i+1}: {result}")
+            clips[i] = result
+    
+    # Decode, trim silences, join and boost in memory; one encode for the narration
+    # NO TEMPO STRETCHING - it makes voice sound weird! (tempo stays 1.0)
+    order = sorted(clips)
+    sentence_audio_files = [clips[i][0] for i in order]
+    print(f"Concatenating {len(sentence_audio_files)} audio segments...")
+    try:
+        output_path, spans = assemble_narration(
+            sentence_audio_files, output_path,
+            trim_silence=True,
+            volume=1.8  # Boost volume 80% for clarity
+        )
+    finally:
+        for audio_file in sentence_audio_files:
+            if os.path.exists(audio_file):
+                os.remove(audio_file)
+    
+    # Timestamps in sentence order, exact from the assembled sample counts
+    for i, (start_time, end_time) in zip(order, spans):
         sentence_timestamps.append({
-            'sentence': sentence,
+            'sentence': sentences[i],
             'start': start_time,
             'end': end_time,
-            'duration': duration,
+            'duration': end_time - start_time,
             'index': i
         })
-        
-        sentence_audio_files.append(temp_file)
-        current_time = end_time
-    
-    # Concatenate all audio files WITHOUT gaps
-    print(f"Concatenating {len(sentence_audio_files)} audio segments...")
-    concat_list = f"concat_audio_{session_id}.txt"
-    with open(concat_list, 'w') as f:
-        for audio_file in sentence_audio_files:
-            f.write(f"file '{audio_file}'\n")
-    
-    # First concatenate without gaps
-    temp_concat = f"temp_concat_{session_id}.mp3"
-    try:
-        # Try with silence removal
-        cmd = [
-            'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-            '-i', concat_list,
-            '-af', 'silenceremove=start_periods=1:start_silence=0.1:start_threshold=-50dB:stop_periods=-1:stop_silence=0.1:stop_threshold=-50dB',
-            '-c:a', 'libmp3lame', '-b:a', '192k',
-            temp_concat
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Silence removal failed: {result.stderr}")
-    except Exception as e:
-        print(f"⚠️ Silence removal failed ({e}), concatenating without it...")
-        # Fallback: simple concatenation
-        cmd = [
-            'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-            '-i', concat_list,
-            '-c:a', 'libmp3lame', '-b:a', '192k',
-            temp_concat
-        ]
-        subprocess.run(cmd, capture_output=True, check=True)
-    
-    # Get actual duration after concatenation
-    actual_duration = get_audio_duration(temp_concat)
-    print(f"Audio duration: {actual_duration:.2f}s (target: {target_duration}s)")
     
-    # NO TEMPO STRETCHING - it makes voice sound weird!
-    # Just boost volume and use natural duration
-    try:
-        cmd = [
-            'ffmpeg', '-y', '-i', temp_concat,
-            '-af', 'volume=1.8',  # Boost volume 80% for clarity
-            '-c:a', 'libmp3lame', '-b:a', '192k',
-            output_path
-        ]
-        subprocess.run(cmd, capture_output=True, check=True)
-        os.remove(temp_concat)
-    except Exception as e:
-        print(f"⚠️ Volume boost failed ({e}), using original audio...")
-        # Last resort: just copy
-        shutil.copy(temp_concat, output_path)
-        os.remove(temp_concat)
+    final_duration = spans[-1][1] if spans else 0.0
     
     # Show duration difference
-    if abs(actual_duration - target_duration) > 2.0:
-        print(f"⚠️ Audio is {actual_duration:.1f}s (target was {target_duration}s)")
+    if abs(final_duration - target_duration) > 2.0:
+        print(f"⚠️ Audio is {final_duration:.1f}s (target was {target_duration}s)")
         print(f"   Tip: Adjust script length to get closer to target")
     else:
-        print(f"✓ Audio duration is close to target ({actual_duration:.1f}s vs {target_duration}s)")
+        print(f"✓ Audio duration is close to target ({final_duration:.1f}s vs {target_duration}s)")
     
-    # Verify final duration
-    final_duration = get_audio_duration(output_path)
     print(f"✓ TTS generated: {final_duration:.2f}s (target: {target_duration}s) with {len(sentence_timestamps)} segments")
     
-    # Cleanup
-    os.remove(concat_list)
-    for audio_file in sentence_audio_files:
-        if os.path.exists(audio_file):
-            os.remove(audio_file)
-    
-    # Update timestamps to reflect actual final duration
-    if sentence_timestamps:
-        time_scale = final_duration / current_time if current_time > 0 else 1.0
-        for ts in sentence_timestamps:
-            ts['start'] *= time_scale
-            ts['end'] *= time_scale
-            ts['duration'] *= time_scale
-    
     return output_path, sentence_timestamps
 
 
-def generate_tts(text: str, output_path: str, voice: str = "hi-IN-SwaraNeural") -> str:
+def generate_tts(text: str, output_path: str, voice: str = "hi-IN-SwaraNeural", ctx: VariationContext = None) -> str:
     """Generate TTS with fast rate and remove silence gaps."""
+    ctx = ctx or VariationContext()
     print(f"Generating TTS audio... (Voice: {voice})")
     
     # Check for Google Voice
@@ -784,18 +734,12 @@ def generate_tts(text: str, output_path: str, voice: str = "hi-IN-SwaraNeural")
     # Fallback / Default to Edge TTS
     print(f"Using Edge TTS ({voice})...")
     # Generate TTS first to a temp file
-    temp_tts = f"temp_tts_{session_id}.mp3"
+    temp_tts = ctx.temp_path("tts_raw.mp3")
     
-    cmd = [
-        'edge-tts',
-        '--voice', voice,
-        '--rate', '-5%',  # Slightly slower for longer audio
-        '--pitch', '+0Hz',  # Normal pitch
-        '--text', text,
-        '--write-media', temp_tts
-    ]
-    
-    subprocess.run(cmd, capture_output=True, check=True)
+    # Slightly slower rate for longer audio, normal pitch
+    result = synthesize_cached([edge_job(text, temp_tts, voice, rate='-5%', pitch='+0Hz')])[0]
+    if isinstance(result, Exception):
+        raise result
     
     # Light silence removal - cut dead air but keep natural flow
     print("Trimming dead air...")
@@ -814,28 +758,23 @@ def generate_tts(text: str, output_path: str, voice: str = "hi-IN-SwaraNeural")
     return output_path
 
 
-def get_audio_duration(audio_path: str) -> float:
-    """Get audio duration."""
-    cmd = [
-        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1', audio_path
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return float(result.stdout.strip())
-
-
-def create_video_cuts(video_path: str, duration: float, num_cuts: int, output_dir: str, variation: int = 1, total_variations: int = 1) -> list:
+def create_video_cuts(video_path: str, duration: float, num_cuts: int, output_dir: str, variation: int = 1, total_variations: int = 1, concat_output: str = None, ctx: VariationContext = None) -> list:
     """Cut video into short clips (2-3 seconds each) for visual variety.
+    All cuts are extracted by one FFmpeg process (see cut_extractor).
     
     Args:
         variation: Which variation (1, 2, or 3)
         total_variations: Total number of variations being generated
+        concat_output: If set, write the cuts already joined to this file
+                       and return [concat_output]
+        ctx: Variation context (session id for cut names, RNG for the jitter)
         
         Logic:
         - 1 variation: Use entire video (0% - 100%)
         - 2 variations: Video 1 = 0-50%, Video 2 = 50-100%
         - 3 variations: Video 1 = 0-33%, Video 2 = 33-66%, Video 3 = 66-100%
     """
+    ctx = ctx or VariationContext(variation, total_variations)
     video_duration = get_video_duration(video_path)
     clip_duration = duration / num_cuts
     
@@ -857,7 +796,7 @@ def create_video_cuts(video_path: str, duration: float, num_cuts: int, output_di
     
     print(f"Creating {num_cuts} video cuts (using {2 + segment_start_fraction*96:.0f}% - {2 + segment_end_fraction*96:.0f}% of video)...")
     
-    cuts = []
+    starts = []
     
     # IMPROVED: Distribute cuts evenly from start to end (Linspace style)
     # This ensures the last clip is actually near the end of the video segment
@@ -874,29 +813,19 @@ def create_video_cuts(video_path: str, duration: float, num_cuts: int, output_di
             base_time = range_start + (range_size / 2) # Center single cut
             
         # Add small random jitter but keep it ordered (±10% of step)
-        jitter = random.uniform(-step * 0.1, step * 0.1) if step > 0 else 0
+        jitter = ctx.random.uniform(-step * 0.1, step * 0.1) if step > 0 else 0
         
         start_time = base_time + jitter
         start_time = max(usable_start, min(start_time, usable_end - clip_duration))
         
-        output_path = os.path.join(output_dir, f"cut_{session_id}_{i:03d}.mp4")
-        
-        cmd = [
-            'ffmpeg', '-y',
-            '-ss', str(start_time),
-            '-i', video_path,
-            '-t', str(clip_duration),
-            # More zoom: scale to 1400 width then crop to 1080 for tighter framing
-            '-vf', 'scale=1400:-2,crop=1080:ih:(iw-1080)/2:0,pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black',
-            '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
-            '-c:a', 'aac', '-b:a', '128k', # Keep audio
-            output_path
-        ]
-        
-        subprocess.run(cmd, capture_output=True, check=True)
-        cuts.append(output_path)
+        starts.append(start_time)
+    
+    # One FFmpeg process for every cut: one seeked input + scale/crop/pad branch per cut
+    # (More zoom: scale to 1400 width then crop to 1080 for tighter framing; audio is kept)
+    output_paths = [os.path.join(output_dir, f"cut_{ctx.session_id}_{i:03d}.mp4") for i in range(num_cuts)]
+    cuts = extract_cuts(video_path, starts, [clip_duration] * num_cuts, output_paths, concat_path=concat_output)
     
-    print(f"✓ Created {len(cuts)} video cuts (2%-98% range, using almost all frames)")
+    print(f"✓ Created {num_cuts} video cuts (2%-98% range, using almost all frames)")
     return cuts
 
 
@@ -1117,57 +1046,17 @@ def format_time(seconds: float) -> str:
     return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
 
 
-def concatenate_clips(clips: list, output_path: str, target_duration: float = None):
-    """Concatenate video clips and loop to match target duration."""
-    print("Concatenating video clips...")
-    
-    # Create concat file
-    concat_file = f"concat_{session_id}.txt"
-    with open(concat_file, 'w') as f:
-        for clip in clips:
-            f.write(f"file '{clip}'\n")
-    
-    # First concatenate all clips
-    temp_concat = f"temp_concat_{session_id}.mp4"
-    cmd = [
-        'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-        '-i', concat_file,
-        '-c', 'copy',
-        temp_concat
-    ]
-    subprocess.run(cmd, capture_output=True, check=True)
-    
-    # If target duration specified, loop the concatenated video
-    if target_duration:
-        cmd = [
-            'ffmpeg', '-y',
-            '-stream_loop', '-1',  # Loop infinitely
-            '-i', temp_concat,
-            '-t', str(target_duration),  # Cut to exact duration
-            '-c:v', 'libx264', '-preset', 'fast',
-            '-c:a', 'aac', # Re-encode audio to ensure consistency
-            output_path
-        ]
-        subprocess.run(cmd, capture_output=True, check=True)
-        os.remove(temp_concat)
-    else:
-        # Just rename if no looping needed
-        os.rename(temp_concat, output_path)
-    
-    os.remove(concat_file)
-    print(f"✓ Clips concatenated{' and looped to match duration' if target_duration else ''}")
-    return output_path
-
-
 def assemble_final_video(
     video_path: str,
     tts_path: str,
     subtitle_path: str,
     music_path: str,
-    output_path: str
+    output_path: str,
+    ctx: VariationContext = None
 ):
     """Final assembly: video + TTS + original audio (from video) + music + subtitles + watermark."""
     print("Assembling final video with watermark...")
+    ctx = ctx or VariationContext()
     
     # WHITE subtitle style with black outline for better visibility
     # PrimaryColour is in BGR format: &HBBGGRR  (White = &HFFFFFF)
@@ -1177,9 +1066,8 @@ def assemble_final_video(
         "BackColour=&H40000000,Outline=3,Shadow=2,MarginV=60,Alignment=2,Bold=1"
     )
     
-    # Copy subtitle to temp location with simple name
-    import shutil
-    temp_sub = f"subs_{session_id}_temp.srt"
+    # Copy subtitle to a simple relative name (drive-letter colons break the subtitles filter)
+    temp_sub = f"subs_{ctx.session_id}_temp.srt"
     shutil.copy(subtitle_path, temp_sub)
     
     filter_parts = []
@@ -1248,6 +1136,247 @@ def assemble_final_video(
     return output_path
 
 
+def render_variation(ctx: VariationContext, job: dict) -> str:
+    """
+    Render one variation: commentary, TTS, cuts, subtitles, assembly, metadata.
+
+    Runs inline or in a pool worker. job holds the inputs shared by all
+    variations (downloaded video, transcript, title and CLI options) and
+    is only read; everything written goes under ctx's session id/temp dir.
+
+    Returns:
+        Path of the final video
+    """
+    variation = ctx.variation
+    total = ctx.total
+    video_path = job["video_path"]
+    original_title = job["original_title"]
+    full_text = job["full_text"]
+    voice = job["voice"]
+    music_mood = job["music_mood"]
+    target_language = job["target_language"]
+    target_duration = job["target_duration"]
+    use_coqui = job["use_coqui"]
+    reference_path = job["reference_path"]
+    output_dir = Path(job["output_dir"])
+    
+    print(f"\n{'='*60}")
+    print(f"🎬 GENERATING VARIATION {variation}/{total}")
+    print(f"{'='*60}\n")
+    
+    # Step 3: Generate AI commentary (not direct subtitles!) (30-45%)
+    ctx.progress(30, f"Generating AI commentary for Variation {variation}...")
+    print(f"Step 3/6: Creating third-person explanation #{variation} ({target_language})...")
+    
+    # Split subtitles into 3 time-based segments for context
+    sentences_all = full_text.split('. ')
+    total_sentences = len(sentences_all)
+    segment_size = total_sentences // total
+    
+    if variation == 1:
+        start_idx = 0
+        end_idx = segment_size
+        segment_name = "START (first 1/3)"
+    elif variation == 2:
+        start_idx = segment_size
+        end_idx = segment_size * 2
+        segment_name = "MIDDLE (second 1/3)"
+    else:
+        start_idx = segment_size * 2
+        end_idx = total_sentences
+        segment_name = "END (last 1/3)"
+    
+    # Get subtitle segment as CONTEXT (not final script)
+    context_sentences = sentences_all[start_idx:end_idx]
+    
+    # IMPROVED: Sample context from the ENTIRE segment (start, middle, end)
+    # Instead of just taking the first 30 sentences (which misses the end of long videos)
+    MAX_CONTEXT_SENTENCES = 40
+    if len(context_sentences) > MAX_CONTEXT_SENTENCES:
+        # Uniformly sample evenly spaced sentences
+        step = len(context_sentences) // MAX_CONTEXT_SENTENCES
+        if step < 1: step = 1
+        sampled_sentences = context_sentences[::step][:MAX_CONTEXT_SENTENCES]
+        context_text = '. '.join(sampled_sentences)
+        print(f"Sampling {len(sampled_sentences)} sentences from entire video/segment for context")
+    else:
+        context_text = '. '.join(context_sentences)
+        
+    print(f"Using {segment_name} as context for AI commentary")
+    
+    # Generate third-person explanatory narration using Groq
+    print(f"Generating explanatory commentary with Groq AI...")
+    try:
+        response = requests.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "llama-3.3-70b-versatile",
+                "messages": [{
+                    "role": "user",
+                    "content": f"""Based on this video transcript excerpt (which samples the full video), create a SHORT third-person narration that EXPLAINS what's happening.
+
+CONTEXT FROM VIDEO:
+{context_text}
+
+SOURCE CHANNEL: {original_title}
+
+RULES (VERY IMPORTANT):
+❌ Do NOT repeat dialogue
+❌ Do NOT quote what people said
+✅ EXPLAIN the moment/situation
+✅ Use third-person perspective
+✅ Be informative and neutral
+✅ 6-8 sentences for FULL 30 seconds
+✅ 25-30 seconds when spoken (100-120 words TARGET)
+✅ Start with: "This is from {original_title.split('|')[0].strip()}"
+✅ Be detailed and descriptive to fill time naturally
+
+EXAMPLE STYLE:
+"This is from Speed. This moment caught everyone off guard. Speed didn't realize how fast the situation escalated, and that reaction is exactly why this clip went viral."
+
+Now write the narration. Return ONLY the narration text, nothing else:"""
+                }],
+                "temperature": 0.7,
+                "max_tokens": 300
+            },
+            timeout=15
+        ).json()
+        
+        narration = response['choices'][0]['message']['content'].strip()
+        
+        # Clean up any quotes or dialogue markers
+        narration = re.sub(r'^["\']+|["\']+$', '', narration)
+        narration = re.sub(r'Here is.*?:', '', narration, flags=re.IGNORECASE).strip()
+        
+        sentences = narration.split('. ')
+        sentences = [s.strip() for s in sentences if s.strip()]
+        
+        # Ensure we have enough content for 30 seconds
+        # Aim for 100-120 words (about 6-8 sentences)
+        word_count = len(narration.split())
+        if word_count < 80:
+            print(f"⚠️ Script too short ({word_count} words), regenerating with more detail...")
+            # Request longer version
+            # For now, just use what we have
+        elif len(sentences) > 10:
+            # Cap at 10 sentences max
+            sentences = sentences[:10]
+            narration = '. '.join(sentences)
+        
+        print(f"✓ Generated {len(sentences)} sentence commentary")
+        print(f"✓ Preview: {narration[:100]}...")
+        
+    except Exception as e:
+        print(f"⚠️ Groq commentary failed: {e}")
+        # Fallback: Simple context-based narration
+        narration = f"This is from {original_title.split('|')[0].strip()}. {'. '.join(context_sentences[:3])}"
+        sentences = narration.split('. ')[:4]
+    
+    ctx.progress(45, "Commentary generated")
+    
+
+    # Step 4: Generate TTS with timestamps (45-60%)
+    ctx.progress(45, f"Generating TTS with real timestamps...")
+    print(f"Step 4/6: Generating TTS sentence-by-sentence...")
+    print(f"Generated script: {len(narration.split())} words in {len(sentences)} sentences")
+    
+    tts_path = ctx.temp_path("tts.mp3")
+    tts_path, sentence_timestamps = generate_tts_with_timestamps(sentences, tts_path, voice, use_coqui, reference_path, target_language, target_duration, ctx=ctx)
+    
+    tts_duration = sentence_timestamps[-1]['end'] if sentence_timestamps else 0
+    print(f"TTS Audio Duration: {tts_duration:.1f}s (from real timestamps)")
+    ctx.progress(60, "TTS audio generated with perfect timing")
+    
+    if tts_duration < target_duration * 0.7:  # Less than 70% of target
+        print(f"⚠️ WARNING: TTS is {tts_duration:.1f}s, much shorter than target {target_duration}s!")
+        print(f"   Try increasing word count or check TTS settings.")
+    
+    # Step 5: Create video cuts (60-80%)
+    ctx.progress(60, "Creating video clips...")
+    print("Step 5/6: Creating quick video cuts...")
+    
+    # NOTE: Original audio is now preserved in the cuts themselves via 'create_video_cuts'
+    
+    # Clip jitter comes from ctx.random (seeded per variation) - no process-wide random.seed
+    
+    # Video segment logic based on number of variations:
+    # 1 variation: use 100% of video
+    # 2 variations: use 50% each (first half, second half)
+    # 3 variations: use 33% each (start, middle, end)
+    
+    num_cuts = max(len(sentences), int(tts_duration / 2.5))  # ~2.5 sec per cut
+    
+    # Cuts are extracted and joined in one FFmpeg pass; they add up to the TTS duration,
+    # so no separate concat / loop re-encode is needed
+    concat_video = ctx.temp_path("concat.mp4")
+    create_video_cuts(video_path, tts_duration, num_cuts, str(ctx.temp_dir), variation, total, concat_output=concat_video, ctx=ctx)
+    print(f"✓ Selected {num_cuts} unique clips for variation {variation}/{total}")
+    ctx.progress(70, "Video clips created")
+    ctx.progress(75, "Video concatenated")
+    
+    # Create timestamp-synced subtitles (Whisper Word-Level)
+    subtitle_path = ctx.temp_path("subs.srt")
+    print("Generating subtitles using Whisper...")
+    if not generate_word_level_subtitles(tts_path, subtitle_path):
+        print("Falling back to sentence-level subtitles...")
+        create_subtitles_from_timestamps(sentence_timestamps, subtitle_path)
+        
+    ctx.progress(80, "Timestamp-synced subtitles created")
+    
+    # Step 6: Final assembly (80-100%)
+    ctx.progress(80, "Final assembly starting...")
+    print("Step 6/6: Final assembly...")
+    music_dir = Path(__file__).parent.parent.parent / "public" / "music"
+    
+    # Try the selected music mood first
+    music_path = None
+    if music_mood and music_mood != "none":
+        # Try mp3 first, then m4a
+        for ext in [".mp3", ".m4a"]:
+            music_file = music_dir / f"{music_mood}{ext}"
+            if music_file.exists():
+                music_path = str(music_file)
+                print(f"✓ Using music: {music_mood}{ext}")
+                break
+    
+    if not music_path and music_mood != "none":
+        print(f"⚠️ Music '{music_mood}' not found, trying soft-piano...")
+        music_file = music_dir / "soft-piano.mp3"
+        music_path = str(music_file) if music_file.exists() else None
+    
+    final_output = output_dir / f"faceless_{ctx.session_id}_v{variation}.mp4"
+    assemble_final_video(concat_video, tts_path, subtitle_path, music_path, str(final_output), ctx=ctx)
+    ctx.progress(95, "Video assembled, cleaning up...")
+    
+    # Generate metadata (title, tags, description)
+    ctx.progress(96, "Generating video metadata...")
+    metadata = generate_video_metadata(f"{original_title} - Variation {variation}", narration, target_language)
+    
+    # Save metadata as JSON
+    metadata_path = output_dir / f"faceless_{ctx.session_id}_v{variation}_metadata.json"
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    
+    # Cleanup temp files for this variation (its whole temp directory)
+    print("\nCleaning up temp files...")
+    ctx.cleanup()
+    
+    ctx.progress(100, "Variation Complete!")
+    print(f"\n{'='*60}")
+    print(f"✅ VARIATION {variation} SUCCESS: {final_output}")
+    print(f"📺 TITLE: {metadata.get('title', 'N/A')}")
+    print(f"📝 DESCRIPTION: {metadata.get('description', 'N/A')[:100]}...")
+    print(f"🏷️ TAGS: {', '.join(metadata.get('tags', [])[:5])}")
+    print(f"📄 Metadata saved: {metadata_path}")
+    print(f"{'='*60}\n")
+    
+    return str(final_output)
+
+
 def main():
     if len(sys.argv) < 2:
         url = input("Enter YouTube URL: ")
@@ -1267,6 +1396,10 @@ def main():
     # Number of video variations to generate (1-3)
     NUM_VARIATIONS = max(1, min(3, video_count))
     
+    # Run-level id (each variation gets its own session id in its VariationContext)
+    run_id = str(uuid.uuid4())[:8]
+    print(f"Session ID: {run_id}")
+    
     print(f"\n{'='*60}")
     print(f"AI FACELESS VIDEO GENERATOR v2")
     print(f"Fast-paced, no gaps, quick cuts")
@@ -1304,253 +1437,64 @@ def main():
     print("Step 2/6: Transcribing...")
     
     # Try subtitle download first (faster and more accurate)
-    full_text = download_youtube_subtitles(url)
+    full_text = download_youtube_subtitles(url, run_id)
     
     # Fall back to audio transcription if no subtitles
     if not full_text:
         print("PROGRESS: 18% - Extracting audio for transcription...")
-        audio_path = str(temp_dir / f"audio_base.wav")
-        extract_audio(video_path, audio_path)
+        # Decoded straight into memory at 16 kHz - no temp WAV
+        audio = load_audio_pcm(video_path)
         print("PROGRESS: 20% - Audio extracted, transcribing...")
-        transcriptions = transcribeAudio(audio_path)
+        transcriptions = transcribeAudio(audio) if audio is not None else []
         full_text = " ".join([t[0] for t in transcriptions])
     
     print(f"✓ Transcribed: {len(full_text.split())} words")
     print(f"✓ Full content: {len(full_text)} characters")
     print("PROGRESS: 30% - Transcription complete")
     
-    # Generate NUM_VARIATIONS unique videos
-    all_outputs = []
-    for variation in range(1, NUM_VARIATIONS + 1):
-        print(f"\n{'='*60}")
-        print(f"🎬 GENERATING VARIATION {variation}/{NUM_VARIATIONS}")
-        print(f"{'='*60}\n")
-        
-        # Create unique session ID for each variation
-        global session_id
-        session_id = str(uuid.uuid4())[:8]
-        
-        # Step 3: Generate AI commentary (not direct subtitles!) (30-45%)
-        print(f"\nPROGRESS: 30% - Generating AI commentary for Variation {variation}...")
-        print(f"Step 3/6: Creating third-person explanation #{variation} ({target_language})...")
-        
-        # Split subtitles into 3 time-based segments for context
-        sentences_all = full_text.split('. ')
-        total_sentences = len(sentences_all)
-        segment_size = total_sentences // NUM_VARIATIONS
-        
-        if variation == 1:
-            start_idx = 0
-            end_idx = segment_size
-            segment_name = "START (first 1/3)"
-        elif variation == 2:
-            start_idx = segment_size
-            end_idx = segment_size * 2
-            segment_name = "MIDDLE (second 1/3)"
-        else:
-            start_idx = segment_size * 2
-            end_idx = total_sentences
-            segment_name = "END (last 1/3)"
-        
-        # Get subtitle segment as CONTEXT (not final script)
-        context_sentences = sentences_all[start_idx:end_idx]
-        
-        # IMPROVED: Sample context from the ENTIRE segment (start, middle, end)
-        # Instead of just taking the first 30 sentences (which misses the end of long videos)
-        MAX_CONTEXT_SENTENCES = 40
-        if len(context_sentences) > MAX_CONTEXT_SENTENCES:
-            # Uniformly sample evenly spaced sentences
-            step = len(context_sentences) // MAX_CONTEXT_SENTENCES
-            if step < 1: step = 1
-            sampled_sentences = context_sentences[::step][:MAX_CONTEXT_SENTENCES]
-            context_text = '. '.join(sampled_sentences)
-            print(f"Sampling {len(sampled_sentences)} sentences from entire video/segment for context")
-        else:
-            context_text = '. '.join(context_sentences)
-            
-        print(f"Using {segment_name} as context for AI commentary")
-        
-        # Generate third-person explanatory narration using Groq
-        print(f"Generating explanatory commentary with Groq AI...")
-        try:
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [{
-                        "role": "user",
-                        "content": f"""Based on this video transcript excerpt (which samples the full video), create a SHORT third-person narration that EXPLAINS what's happening.
-
-CONTEXT FROM VIDEO:
-{context_text}
-
-SOURCE CHANNEL: {original_title}
-
-RULES (VERY IMPORTANT):
-❌ Do NOT repeat dialogue
-❌ Do NOT quote what people said
-✅ EXPLAIN the moment/situation
-✅ Use third-person perspective
-✅ Be informative and neutral
-✅ 6-8 sentences for FULL 30 seconds
-✅ 25-30 seconds when spoken (100-120 words TARGET)
-✅ Start with: "This is from {original_title.split('|')[0].strip()}"
-✅ Be detailed and descriptive to fill time naturally
-
-EXAMPLE STYLE:
-"This is from Speed. This moment caught everyone off guard. Speed didn't realize how fast the situation escalated, and that reaction is exactly why this clip went viral."
-
-Now write the narration. Return ONLY the narration text, nothing else:"""
-                    }],
-                    "temperature": 0.7,
-                    "max_tokens": 300
-                },
-                timeout=15
-            ).json()
-            
-            narration = response['choices'][0]['message']['content'].strip()
-            
-            # Clean up any quotes or dialogue markers
-            narration = re.sub(r'^["\']+|["\']+$', '', narration)
-            narration = re.sub(r'Here is.*?:', '', narration, flags=re.IGNORECASE).strip()
-            
-            sentences = narration.split('. ')
-            sentences = [s.strip() for s in sentences if s.strip()]
-            
-            # Ensure we have enough content for 30 seconds
-            # Aim for 100-120 words (about 6-8 sentences)
-            word_count = len(narration.split())
-            if word_count < 80:
-                print(f"⚠️ Script too short ({word_count} words), regenerating with more detail...")
-                # Request longer version
-                # For now, just use what we have
-            elif len(sentences) > 10:
-                # Cap at 10 sentences max
-                sentences = sentences[:10]
-                narration = '. '.join(sentences)
-            
-            print(f"✓ Generated {len(sentences)} sentence commentary")
-            print(f"✓ Preview: {narration[:100]}...")
-            
-        except Exception as e:
-            print(f"⚠️ Groq commentary failed: {e}")
-            # Fallback: Simple context-based narration
-            narration = f"This is from {original_title.split('|')[0].strip()}. {'. '.join(context_sentences[:3])}"
-            sentences = narration.split('. ')[:4]
-        
-        print("PROGRESS: 45% - Commentary generated")
-        
-        # ... rest of the generation continues for each variation ...
-        # (Keep all the existing code from Step 4 onwards)
+    # Inputs shared read-only by every variation
+    job = {
+        "video_path": video_path,
+        "original_title": original_title,
+        "full_text": full_text,
+        "voice": voice,
+        "music_mood": music_mood,
+        "target_language": target_language,
+        "target_duration": target_duration,
+        "use_coqui": use_coqui,
+        "reference_path": reference_path,
+        "output_dir": str(output_dir)
+    }
+    contexts = [VariationContext(variation, NUM_VARIATIONS, temp_dir) for variation in range(1, NUM_VARIATIONS + 1)]
+    progress = VariationProgress(NUM_VARIATIONS)
     
-        # Step 4: Generate TTS with timestamps (45-60%)
-        print(f"\nPROGRESS: 45% - Generating TTS with real timestamps...")
-        print(f"Step 4/6: Generating TTS sentence-by-sentence...")
-        print(f"Generated script: {len(narration.split())} words in {len(sentences)} sentences")
-        
-        tts_path = str(temp_dir / f"tts_{session_id}.mp3")
-        tts_path, sentence_timestamps = generate_tts_with_timestamps(sentences, tts_path, voice, use_coqui, reference_path, target_language, target_duration)
-        
-        tts_duration = sentence_timestamps[-1]['end'] if sentence_timestamps else 0
-        print(f"TTS Audio Duration: {tts_duration:.1f}s (from real timestamps)")
-        print("PROGRESS: 60% - TTS audio generated with perfect timing")
-        
-        if tts_duration < target_duration * 0.7:  # Less than 70% of target
-            print(f"⚠️ WARNING: TTS is {tts_duration:.1f}s, much shorter than target {target_duration}s!")
-            print(f"   Try increasing word count or check TTS settings.")
-        
-        # Step 5: Create video cuts (60-80%)
-        print("\nPROGRESS: 60% - Creating video clips...")
-        print("Step 5/6: Creating quick video cuts...")
-        
-        # NOTE: Original audio is now preserved in the cuts themselves via 'create_video_cuts'
-        
-        # Set random seed based on variation to get different clips from different parts
-        random.seed(variation * 1000 + int(time.time()))
-        
-        # Video segment logic based on number of variations:
-        # 1 variation: use 100% of video
-        # 2 variations: use 50% each (first half, second half)
-        # 3 variations: use 33% each (start, middle, end)
-        
-        num_cuts = max(len(sentences), int(tts_duration / 2.5))  # ~2.5 sec per cut
-        cuts = create_video_cuts(video_path, tts_duration, num_cuts, str(temp_dir), variation, NUM_VARIATIONS)
-        print(f"✓ Selected {len(cuts)} unique clips for variation {variation}/{NUM_VARIATIONS}")
-        print("PROGRESS: 70% - Video clips created")
-        
-        # Concatenate cuts and loop to match TTS duration
-        concat_video = str(temp_dir / f"concat_{session_id}.mp4")
-        concatenate_clips(cuts, concat_video, tts_duration)
-        print("PROGRESS: 75% - Video concatenated and looped")
-        
-        # Create timestamp-synced subtitles (Whisper Word-Level)
-        subtitle_path = str(temp_dir / f"subs_{session_id}.srt")
-        print("Generating subtitles using Whisper...")
-        if not generate_word_level_subtitles(tts_path, subtitle_path):
-            print("Falling back to sentence-level subtitles...")
-            create_subtitles_from_timestamps(sentence_timestamps, subtitle_path)
-            
-        print("PROGRESS: 80% - Timestamp-synced subtitles created")
-        
-        # Step 6: Final assembly (80-100%)
-        print("\nPROGRESS: 80% - Final assembly starting...")
-        print("Step 6/6: Final assembly...")
-        music_dir = Path(__file__).parent.parent.parent / "public" / "music"
-        
-        # Try the selected music mood first
-        music_path = None
-        if music_mood and music_mood != "none":
-            # Try mp3 first, then m4a
-            for ext in [".mp3", ".m4a"]:
-                music_file = music_dir / f"{music_mood}{ext}"
-                if music_file.exists():
-                    music_path = str(music_file)
-                    print(f"✓ Using music: {music_mood}{ext}")
-                    break
-        
-        if not music_path and music_mood != "none":
-            print(f"⚠️ Music '{music_mood}' not found, trying soft-piano...")
-            music_file = music_dir / "soft-piano.mp3"
-            music_path = str(music_file) if music_file.exists() else None
-        
-        final_output = output_dir / f"faceless_{session_id}_v{variation}.mp4"
-        assemble_final_video(concat_video, tts_path, subtitle_path, music_path, str(final_output))
-        print("PROGRESS: 95% - Video assembled, cleaning up...")
-        
-        # Generate metadata (title, tags, description)
-        print("\nPROGRESS: 96% - Generating video metadata...")
-        metadata = generate_video_metadata(f"{original_title} - Variation {variation}", narration, target_language)
-        
-        # Save metadata as JSON
-        metadata_path = output_dir / f"faceless_{session_id}_v{variation}_metadata.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-        
-        # Cleanup temp files for this variation
-        print("\nCleaning up temp files...")
-        cleanup_files = [tts_path, subtitle_path, concat_video] + cuts
-        
-        for f in cleanup_files:
-            if f and os.path.exists(f):
+    # Voice cloning keeps one resident XTTS model, so those variations stay in this process
+    workers = VARIATION_WORKERS or min(NUM_VARIATIONS, max(1, (os.cpu_count() or 1) // 2))
+    if use_coqui:
+        workers = 1
+    workers = max(1, min(workers, NUM_VARIATIONS))
+    
+    # Generate NUM_VARIATIONS unique videos
+    if workers == 1:
+        for ctx in contexts:
+            ctx.progress_queue = progress
+        all_outputs = [render_variation(ctx, job) for ctx in contexts]
+    else:
+        print(f"Rendering {NUM_VARIATIONS} variations on {workers} worker processes...")
+        # spawn: the parent may hold loaded models and threads, which don't survive fork
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager, ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            # Workers send progress here; only this process prints PROGRESS lines
+            progress_queue = manager.Queue()
+            for ctx in contexts:
+                ctx.progress_queue = progress_queue
+            futures = [pool.submit(render_variation, ctx, job) for ctx in contexts]
+            while not all(future.done() for future in futures) or not progress_queue.empty():
                 try:
-                    os.remove(f)
-                except:
+                    progress.put(progress_queue.get(timeout=0.5))
+                except queue.Empty:
                     pass
-        
-        print("PROGRESS: 100% - Variation Complete!")
-        print(f"\n{'='*60}")
-        print(f"✅ VARIATION {variation} SUCCESS: {final_output}")
-        print(f"📺 TITLE: {metadata.get('title', 'N/A')}")
-        print(f"📝 DESCRIPTION: {metadata.get('description', 'N/A')[:100]}...")
-        print(f"🏷️ TAGS: {', '.join(metadata.get('tags', [])[:5])}")
-        print(f"📄 Metadata saved: {metadata_path}")
-        print(f"{'='*60}\n")
-        
-        all_outputs.append(str(final_output))
+            all_outputs = [future.result() for future in futures]
     
     # Final summary after all variations
     print(f"\n{'='*60}")
@@ -0,0 +1,96 @@
+"""
+TTS Clip Cache
+Synthesized sentence clips on disk, keyed by normalized text, engine,
+voice and prosody, stored together with their measured duration so a hit
+skips both the TTS call and the ffprobe.
+
+Layout under <cache root>/tts/:
+    <key>.mp3 / <key>.wav   encoded clip
+    <key>.json              duration + engine/voice (written last = entry complete)
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import unicodedata
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Cache location/helpers are shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "clipper"))
+try:
+    from cache_utils import cache_dir, atomic_write_bytes, touch_entry, evict_lru
+    from media_cache import materialize
+except ImportError:
+    cache_dir = None
+    atomic_write_bytes = None
+
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+# Bump when the key or entry layout changes
+TTS_CACHE_VERSION = 1
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_enabled(use_cache: bool = True) -> bool:
+    """False if the caller, TTS_CACHE=0, or a missing cache root opts out"""
+    return bool(use_cache) and cache_dir is not None and os.getenv("TTS_CACHE", "1") != "0"
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with collapsed whitespace; case and punctuation are kept (they change the prosody)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def clip_key(text: str, engine: str, voice: str, rate="", pitch="", volume="", language="") -> str:
+    """Key for one sentence clip; every argument that changes the audio is part of it"""
+    parts = {
+        "text": normalize_text(text), "engine": engine, "voice": voice,
+        "rate": str(rate), "pitch": str(pitch), "volume": str(volume), "language": language,
+        "version": TTS_CACHE_VERSION
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def lookup_clip(key: str) -> Optional[Tuple[str, float]]:
+    """Return (cached clip path, duration) or None on a miss"""
+    directory = cache_dir("tts")
+    meta_path = os.path.join(directory, f"{key}.json")
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    clip_path = os.path.join(directory, key + entry.get("ext", ".mp3"))
+    if not os.path.exists(clip_path):
+        return None
+
+    touch_entry(meta_path)
+    return clip_path, entry["duration"]
+
+
+def fetch_clip(cached_path: str, dest_path: str) -> str:
+    """
+    Place a cached clip at dest_path as an independent file (reflink or copy,
+    never a hard link), so rewriting dest_path can't corrupt the cache entry
+    """
+    return materialize(cached_path, dest_path)
+
+
+def store_clip(key: str, path: str, duration: float, engine: str = "", voice: str = ""):
+    """Copy a freshly synthesized clip into the cache and enforce the size budget"""
+    try:
+        directory = cache_dir("tts")
+        ext = os.path.splitext(path)[1] or ".mp3"
+        with open(path, "rb") as f:
+            atomic_write_bytes(os.path.join(directory, key + ext), f.read())
+        entry = {"duration": duration, "ext": ext, "engine": engine, "voice": voice, "created": time.time()}
+        atomic_write_bytes(os.path.join(directory, f"{key}.json"), json.dumps(entry).encode("utf-8"))
+        evict_lru(directory, TTS_CACHE_MAX_BYTES, ".json")
+    except Exception as e:
+        print(f"TTS cache write failed: {e}")
+
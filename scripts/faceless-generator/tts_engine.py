@@ -0,0 +1,265 @@
+"""
+TTS Engine
+Concurrent sentence synthesis for the faceless generator. Edge TTS runs
+in-process on one asyncio loop (no edge-tts CLI start-up per sentence),
+Google TTS goes through a shared keep-alive session, and both run with
+bounded parallelism. Results always come back in job order.
+
+A job is a dict built with edge_job() / google_job(); a job may carry a
+"fallback" job that is synthesized if the primary engine fails.
+"""
+import os
+import sys
+import base64
+import asyncio
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import requests
+
+# Keep-alive session is shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "clipper"))
+try:
+    from http_pool import get_session
+except ImportError:
+    get_session = None
+
+from tts_cache import cache_enabled, clip_key, lookup_clip, fetch_clip, store_clip
+
+# Sentences synthesized at once per engine
+EDGE_CONCURRENCY = int(os.getenv("TTS_EDGE_CONCURRENCY", 4))
+GOOGLE_CONCURRENCY = int(os.getenv("TTS_GOOGLE_CONCURRENCY", 4))
+
+# Seconds before one Edge sentence is considered stuck, and attempts per sentence
+EDGE_TIMEOUT = 60
+EDGE_ATTEMPTS = 2
+
+GOOGLE_TTS_URL = "https://texttospeech.googleapis.com/v1/text:synthesize"
+GOOGLE_TIMEOUT = 60
+
+
+def edge_job(text: str, path: str, voice: str, rate: str = "+0%", pitch: str = "+0Hz",
+             volume: str = "+0%", fallback: Optional[dict] = None) -> dict:
+    """Edge TTS job (rate/pitch/volume use the edge-tts syntax, e.g. "+20%", "+3Hz")"""
+    return {
+        "engine": "edge", "text": text, "path": path, "voice": voice,
+        "rate": rate, "pitch": pitch, "volume": volume, "fallback": fallback
+    }
+
+
+def google_job(text: str, path: str, voice: str, speaking_rate: float = 1.0, pitch: float = 0.0,
+               volume_gain_db: float = 0.0, language_code: str = "en-US",
+               api_key: Optional[str] = None, fallback: Optional[dict] = None) -> dict:
+    """Google Cloud TTS job (MP3 output); api_key defaults to GOOGLE_TTS_API_KEY / GEMINI_API_KEY"""
+    return {
+        "engine": "google", "text": text, "path": path, "voice": voice,
+        "speaking_rate": speaking_rate, "pitch": pitch, "volume_gain_db": volume_gain_db,
+        "language_code": language_code, "api_key": api_key, "fallback": fallback
+    }
+
+
+def google_api_key() -> Optional[str]:
+    return os.getenv("GOOGLE_TTS_API_KEY") or os.getenv("GEMINI_API_KEY")
+
+
+async def _edge_save(semaphore, job: dict) -> str:
+    import edge_tts
+
+    async with semaphore:
+        for attempt in range(EDGE_ATTEMPTS):
+            try:
+                communicate = edge_tts.Communicate(
+                    job["text"], job["voice"], rate=job["rate"], pitch=job["pitch"], volume=job["volume"]
+                )
+                await asyncio.wait_for(communicate.save(job["path"]), EDGE_TIMEOUT)
+                return job["path"]
+            except asyncio.TimeoutError:
+                if attempt == EDGE_ATTEMPTS - 1:
+                    raise Exception(f"Edge TTS timed out after {EDGE_ATTEMPTS} attempts")
+                print(f"⚠️ Edge TTS timed out, retrying...")
+
+
+async def _edge_batch(jobs: List[dict], concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    return await asyncio.gather(*(_edge_save(semaphore, job) for job in jobs), return_exceptions=True)
+
+
+def synthesize_edge(jobs: List[dict], concurrency: int = EDGE_CONCURRENCY) -> list:
+    """
+    Run Edge jobs concurrently on one event loop.
+
+    Returns:
+        One entry per job, in order: the output path or the Exception raised
+    """
+    if not jobs:
+        return []
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_edge_batch(jobs, concurrency))
+    # Already inside an event loop (e.g. called from async code): use a helper thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, _edge_batch(jobs, concurrency)).result()
+
+
+def _google_save(job: dict) -> str:
+    api_key = job["api_key"] or google_api_key()
+    if not api_key:
+        raise Exception("Missing GOOGLE_TTS_API_KEY in .env")
+
+    data = {
+        "input": {"text": job["text"]},
+        "voice": {"languageCode": job["language_code"], "name": job["voice"]},
+        "audioConfig": {
+            "audioEncoding": "MP3",
+            "speakingRate": job["speaking_rate"],
+            "pitch": job["pitch"],
+            "volumeGainDb": job["volume_gain_db"]
+        }
+    }
+
+    http = get_session() if get_session else requests
+    response = http.post(GOOGLE_TTS_URL, params={"key": api_key}, json=data, timeout=GOOGLE_TIMEOUT)
+    if response.status_code != 200:
+        raise Exception(f"Google TTS failed: {response.status_code}")
+
+    audio_content = response.json().get("audioContent")
+    if not audio_content:
+        raise Exception("No audio content")
+    with open(job["path"], "wb") as f:
+        f.write(base64.b64decode(audio_content))
+    return job["path"]
+
+
+def synthesize_google(jobs: List[dict], concurrency: int = GOOGLE_CONCURRENCY) -> list:
+    """
+    Run Google jobs on a bounded thread pool sharing one HTTP session.
+
+    Returns:
+        One entry per job, in order: the output path or the Exception raised
+    """
+    if not jobs:
+        return []
+
+    def run(job):
+        try:
+            return _google_save(job)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(jobs)))) as pool:
+        return list(pool.map(run, jobs))
+
+
+def _run_jobs(jobs: List[dict]) -> list:
+    """Dispatch jobs by engine; Edge and Google batches run side by side"""
+    results = [None] * len(jobs)
+    edge = [i for i, job in enumerate(jobs) if job["engine"] == "edge"]
+    google = [i for i, job in enumerate(jobs) if job["engine"] == "google"]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        edge_future = pool.submit(synthesize_edge, [jobs[i] for i in edge])
+        google_future = pool.submit(synthesize_google, [jobs[i] for i in google])
+        for indices, future in ((edge, edge_future), (google, google_future)):
+            for i, result in zip(indices, future.result()):
+                results[i] = result
+
+    for i, job in enumerate(jobs):
+        if job["engine"] not in ("edge", "google"):
+            results[i] = Exception(f"Unknown TTS engine: {job['engine']}")
+    return results
+
+
+def _synthesize(jobs: List[dict]) -> list:
+    """(result, job that produced it) per job; failures are retried with their fallback"""
+    results = [(result, job) for result, job in zip(_run_jobs(jobs), jobs)]
+
+    retry = [i for i, (result, _) in enumerate(results) if isinstance(result, Exception) and jobs[i].get("fallback")]
+    if retry:
+        for i in retry:
+            print(f"⚠️ {jobs[i]['engine']} TTS failed for '{jobs[i]['text'][:20]}...': {results[i][0]}, using fallback")
+        fallbacks = [jobs[i]["fallback"] for i in retry]
+        for i, result, fallback in zip(retry, _run_jobs(fallbacks), fallbacks):
+            results[i] = (result, fallback)
+    return results
+
+
+def synthesize_all(jobs: List[dict]) -> list:
+    """
+    Synthesize every job, retrying failures with their fallback job.
+
+    Args:
+        jobs: edge_job() / google_job() dicts
+
+    Returns:
+        One entry per job, in order: the path that was written (the
+        fallback's path if the fallback ran) or the final Exception
+    """
+    return [result for result, _ in _synthesize(jobs)]
+
+
+def job_key(job: dict) -> str:
+    """TTS cache key for a job (API keys and output paths are not part of it)"""
+    if job["engine"] == "google":
+        return clip_key(job["text"], "google", job["voice"], job["speaking_rate"], job["pitch"],
+                        job["volume_gain_db"], job["language_code"])
+    return clip_key(job["text"], job["engine"], job["voice"], job["rate"], job["pitch"], job["volume"])
+
+
+def probe_duration(path: str) -> float:
+    """Audio duration in seconds via ffprobe"""
+    cmd = [
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return float(result.stdout.strip())
+
+
+def synthesize_cached(jobs: List[dict], use_cache: bool = True) -> list:
+    """
+    synthesize_all with the persistent clip cache and measured durations.
+
+    Hits are linked into place without a TTS call or ffprobe; misses are
+    synthesized concurrently, probed, and stored under the key of the job
+    that actually produced them (primary or fallback).
+
+    Returns:
+        One entry per job, in order: (path, duration) or the final Exception
+    """
+    caching = cache_enabled(use_cache)
+    results = [None] * len(jobs)
+    misses = []
+
+    for i, job in enumerate(jobs):
+        cached = lookup_clip(job_key(job)) if caching else None
+        if cached:
+            results[i] = (fetch_clip(cached[0], job["path"]), cached[1])
+        else:
+            misses.append(i)
+
+    if caching and len(misses) < len(jobs):
+        print(f"✓ TTS cache: {len(jobs) - len(misses)}/{len(jobs)} sentences reused")
+    if not misses:
+        return results
+
+    synthesized = _synthesize([jobs[i] for i in misses])
+
+    def measure(item):
+        result, used = item
+        if isinstance(result, Exception):
+            return result
+        try:
+            duration = probe_duration(result)
+        except Exception as e:
+            return e
+        if caching:
+            store_clip(job_key(used), result, duration, used["engine"], used["voice"])
+        return result, duration
+
+    with ThreadPoolExecutor(max_workers=max(1, min(GOOGLE_CONCURRENCY, len(misses)))) as pool:
+        for i, result in zip(misses, pool.map(measure, synthesized)):
+            results[i] = result
+    return results
@@ -1,9 +1,45 @@
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from moviepy.editor import VideoFileClip
 import subprocess
+import numpy as np
+
+# Whisper's native input: 16 kHz mono float32
+PCM_SAMPLE_RATE = 16000
+
+
+def load_audio_pcm(video_path, sample_rate=PCM_SAMPLE_RATE):
+    """
+    Decode a file's audio track straight into memory as mono float32 PCM.
+
+    FFmpeg resamples to sample_rate and writes raw f32le to a pipe, so no
+    WAV is written and re-read; the result can be handed to transcribeAudio
+    (and its VAD) directly.
+
+    Returns:
+        numpy float32 array, or None if FFmpeg failed
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", video_path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "f32le", "-"
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True)
+    except FileNotFoundError:
+        print("FFmpeg not found")
+        return None
+
+    if result.returncode != 0 or not result.stdout:
+        print(f"Audio decode failed: {result.stderr.decode(errors='ignore')[-500:]}")
+        return None
+
+    samples = np.frombuffer(result.stdout, dtype=np.float32)
+    print(f"Decoded audio: {len(samples) / sample_rate:.1f}s at {sample_rate} Hz")
+    return samples
+
 
 def extractAudio(video_path, audio_path="audio.wav"):
     try:
+        from moviepy.editor import VideoFileClip
         video_clip = VideoFileClip(video_path)
         video_clip.audio.write_audiofile(audio_path)
         video_clip.close()
@@ -16,6 +52,7 @@ def extractAudio(video_path, audio_path="audio.wav"):
 
 def crop_video(input_file, output_file, start_time, end_time):
     import os
+    from moviepy.editor import VideoFileClip
     # Ensure paths are absolute and forward slashes for FFmpeg
     input_file = os.path.abspath(input_file)
     output_file = os.path.abspath(output_file)
@@ -8,8 +8,22 @@ import os
 import re
 import json
 import requests
+import sys
 import time
 from pathlib import Path
+from typing import List
+
+# LLM response cache is shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent / "clipper"))
+try:
+    import llm_cache
+except ImportError:
+    llm_cache = None
+try:
+    from http_pool import get_session, hedged_call
+except ImportError:
+    get_session = None
+    hedged_call = None
 
 # Find and load .env from project root (may be in parent directories)
 current_dir = Path(__file__).parent
@@ -26,6 +40,14 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")  # Groq.com (fast inference)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API")  # Original fallback
 
+# Models per provider (part of the response cache key)
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GEMINI_MODEL = "models/gemini-2.0-flash"
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Bump when SYSTEM_PROMPT / MULTI_SYSTEM_PROMPT change so cached highlights are not reused
+PROMPT_VERSION = 1
+
 # Debug: Print which APIs are available
 print(f"[AI Config] Groq: {'YES' if GROQ_API_KEY else 'NO'}, Gemini: {'YES' if GEMINI_API_KEY else 'NO'}")
 
@@ -40,6 +62,11 @@ class JSONResponse(BaseModel):
     end: float = Field(description="End time for the highlighted clip")
 
 
+class HighlightsResponse(BaseModel):
+    """Expected response structure for multiple highlights"""
+    highlights: List[JSONResponse] = Field(description="Highlights, best first")
+
+
 SYSTEM_PROMPT = """
 The input contains a timestamped transcription of a video.
 Select a 2-minute segment from the transcription that contains something interesting, useful, surprising, controversial, or thought-provoking.
@@ -55,9 +82,33 @@ Return ONLY a JSON object with this exact structure (no markdown, no explanation
 }
 """
 
+MULTI_SYSTEM_PROMPT = """
+The input contains a timestamped transcription of a video.
+Select the {count} best segments of 30 seconds to 2 minutes that each contain something interesting, useful, surprising, controversial, or thought-provoking.
+The segments must not overlap.
+Each selected text should contain only complete sentences and form a complete thought.
+Do not cut the sentences in the middle.
+Order the segments from best to worst.
+
+Return ONLY a JSON object with this exact structure (no markdown, no explanation):
+{{
+    "highlights": [
+        {{"start": <start_time_in_seconds>, "content": "<the transcribed text>", "end": <end_time_in_seconds>}}
+    ]
+}}
+"""
+
 
-def call_groq_api(transcription: str) -> dict:
-    """Call Groq.com API (fast LLM inference)"""
+def _system_prompt(count):
+    return SYSTEM_PROMPT if count == 1 else MULTI_SYSTEM_PROMPT.format(count=count)
+
+
+def _parse_response(text, count):
+    return parse_json_response(text) if count == 1 else parse_highlights_response(text)
+
+
+def call_groq_api(transcription: str, count: int = 1) -> dict:
+    """Call Groq.com API (fast LLM inference); count > 1 asks for several highlights"""
     if not GROQ_API_KEY:
         raise Exception("GROQ_API_KEY not set")
     
@@ -68,26 +119,28 @@ def call_groq_api(transcription: str) -> dict:
     }
     
     payload = {
-        "model": "llama-3.3-70b-versatile",  # Fast and capable
+        "model": GROQ_MODEL,  # Fast and capable
         "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": _system_prompt(count)},
             {"role": "user", "content": f"Transcription:\n{transcription[:15000]}"}
         ],
         "temperature": 0.7,
-        "max_tokens": 1000
+        "max_tokens": 1000 * count
     }
     
-    response = requests.post(url, headers=headers, json=payload, timeout=90)
+    # Keep-alive session shared across calls when available
+    http = get_session() if get_session else requests
+    response = http.post(url, headers=headers, json=payload, timeout=90)
     response.raise_for_status()
     
     result = response.json()
     text = result['choices'][0]['message']['content'].strip()
     
-    return parse_json_response(text)
+    return _parse_response(text, count)
 
 
-def call_gemini_api(transcription: str, max_retries: int = 3) -> dict:
-    """Call Google Gemini API with retry for rate limits"""
+def call_gemini_api(transcription: str, count: int = 1, max_retries: int = 3) -> dict:
+    """Call Google Gemini API with retry for rate limits; count > 1 asks for several highlights"""
     if not GEMINI_API_KEY:
         raise Exception("GEMINI_API_KEY not set")
     
@@ -95,13 +148,13 @@ def call_gemini_api(transcription: str, max_retries: int = 3) -> dict:
         import google.generativeai as genai
         genai.configure(api_key=GEMINI_API_KEY)
         
-        model = genai.GenerativeModel('models/gemini-2.0-flash')
-        prompt = f"{SYSTEM_PROMPT}\n\nTranscription:\n{transcription[:15000]}"
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        prompt = f"{_system_prompt(count)}\n\nTranscription:\n{transcription[:15000]}"
         
         for attempt in range(max_retries):
             try:
                 response = model.generate_content(prompt)
-                return parse_json_response(response.text)
+                return _parse_response(response.text, count)
             except Exception as e:
                 if "429" in str(e) or "quota" in str(e).lower():
                     wait_time = (attempt + 1) * 30  # 30s, 60s, 90s
@@ -116,8 +169,8 @@ def call_gemini_api(transcription: str, max_retries: int = 3) -> dict:
         raise Exception("google-generativeai package not installed")
 
 
-def call_openai_api(transcription: str) -> dict:
-    """Call OpenAI API (original fallback)"""
+def call_openai_api(transcription: str, count: int = 1) -> dict:
+    """Call OpenAI API (original fallback); count > 1 asks for several highlights"""
     if not OPENAI_API_KEY:
         raise Exception("OPENAI_API key not set")
     
@@ -125,16 +178,23 @@ def call_openai_api(transcription: str) -> dict:
     from langchain.prompts import ChatPromptTemplate
     
     llm = ChatOpenAI(
-        model="gpt-4o-mini",
+        model=OPENAI_MODEL,
         temperature=1.0,
         api_key=OPENAI_API_KEY
     )
     
     prompt = ChatPromptTemplate.from_messages([
-        ("system", SYSTEM_PROMPT),
+        ("system", _system_prompt(count)),
         ("user", transcription)
     ])
     
+    if count > 1:
+        chain = prompt | llm.with_structured_output(HighlightsResponse, method="function_calling")
+        response = chain.invoke({"Transcription": transcription})
+        return {"highlights": [
+            {"start": h.start, "content": h.content, "end": h.end} for h in response.highlights
+        ]}
+    
     chain = prompt | llm.with_structured_output(JSONResponse, method="function_calling")
     response = chain.invoke({"Transcription": transcription})
     
@@ -170,68 +230,237 @@ def parse_json_response(text: str) -> dict:
         raise Exception(f"Could not parse JSON from response: {text[:500]}")
 
 
-def GetHighlight(Transcription):
+def parse_highlights_response(text: str) -> dict:
+    """Extract {"highlights": [...]} from response text (a bare JSON list is accepted too)"""
+    text = re.sub(r'```json\s*', '', text)
+    text = re.sub(r'```\s*', '', text)
+    
+    for pattern in (r'\{.*\}', r'\[.*\]'):
+        json_match = re.search(pattern, text, re.DOTALL)
+        if not json_match:
+            continue
+        try:
+            data = json.loads(json_match.group())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, list):
+            return {"highlights": data}
+        if isinstance(data.get("highlights"), list):
+            return data
+    
+    raise Exception(f"Could not parse highlights from response: {text[:500]}")
+
+
+def _validate_highlight(name, result):
+    """Return (Start, End) from a provider response, or None if it is unusable"""
+    if not result or 'start' not in result or 'end' not in result:
+        print(f"[AI] {name} returned invalid response")
+        return None
+    
+    try:
+        Start = int(float(result['start']))
+        End = int(float(result['end']))
+    except (ValueError, TypeError) as e:
+        print(f"[AI] Error parsing times from {name}: {e}")
+        return None
+    
+    # Validate times
+    if Start < 0 or End < 0:
+        print(f"[AI] Negative time values from {name}")
+        return None
+    
+    if End <= Start:
+        print(f"[AI] Invalid time range from {name}")
+        return None
+    
+    return Start, End
+
+
+def _print_selection(name, result, Start, End):
+    print(f"\n{'='*60}")
+    print(f"SELECTED SEGMENT ({name}):")
+    print(f"Time: {Start}s - {End}s ({End-Start}s duration)")
+    if 'content' in result:
+        content_preview = result['content'][:200] if len(result['content']) > 200 else result['content']
+        print(f"Content: {content_preview}...")
+    print(f"{'='*60}\n")
+
+
+def _select_highlights(name, result, count):
     """
-    Get the best highlight segment from transcription.
-    Uses Groq (primary) -> Gemini (fallback) -> OpenAI (final fallback)
+    Valid, non-overlapping (Start, End) pairs from a multi-highlight response,
+    in the provider's ranking order, at most count of them.
     """
-    providers = []
+    if not result or not isinstance(result.get("highlights"), list):
+        print(f"[AI] {name} returned invalid response")
+        return []
     
-    # Priority: Groq > Gemini > OpenAI
+    selected = []
+    for item in result["highlights"]:
+        times = _validate_highlight(name, item) if isinstance(item, dict) else None
+        if not times:
+            continue
+        Start, End = times
+        if any(Start < other_end and other_start < End for other_start, other_end in selected):
+            print(f"[AI] Skipping overlapping segment {Start}s - {End}s from {name}")
+            continue
+        selected.append(times)
+        if len(selected) == count:
+            break
+    return selected
+
+
+def _available_providers():
+    """(name, api_func, model) in priority order: Groq > Gemini > OpenAI"""
+    providers = []
     if GROQ_API_KEY:
-        providers.append(("Groq", call_groq_api))
+        providers.append(("Groq", call_groq_api, GROQ_MODEL))
     if GEMINI_API_KEY:
-        providers.append(("Gemini", call_gemini_api))
+        providers.append(("Gemini", call_gemini_api, GEMINI_MODEL))
     if OPENAI_API_KEY:
-        providers.append(("OpenAI", call_openai_api))
+        providers.append(("OpenAI", call_openai_api, OPENAI_MODEL))
+    return providers
+
+
+def GetHighlight(Transcription, use_cache=True, hedge=False):
+    """
+    Get the best highlight segment from transcription.
+    Uses Groq (primary) -> Gemini (fallback) -> OpenAI (final fallback)
+    Validated responses are kept in the shared LLM response cache unless use_cache is False.
+    With hedge=True a slow provider is raced against the next one instead of waited out.
+    """
+    providers = _available_providers()
     
     if not providers:
         print("ERROR: No API keys available!")
         return None, None
     
-    for name, api_func in providers:
+    caching = llm_cache is not None and llm_cache.cache_enabled(use_cache)
+    
+    def key_for(name, model):
+        return llm_cache.cache_key("highlight", Transcription, name, model, PROMPT_VERSION)
+    
+    if caching:
+        for name, _, model in providers:
+            cached = llm_cache.get_cached(key_for(name, model))
+            times = _validate_highlight(name, cached) if cached else None
+            if times:
+                print(f"[AI] Using cached {name} highlight")
+                _print_selection(name, cached, *times)
+                return times
+    
+    if hedge and hedged_call and len(providers) > 1:
+        models = {name: model for name, _, model in providers}
+        calls = [(name, lambda api_func=api_func: api_func(Transcription)) for name, api_func, _ in providers]
+        name, result = hedged_call(calls, lambda r: _validate_highlight("Provider", r) is not None)
+        if result is None:
+            print("ERROR: All AI providers failed")
+            return None, None
+        
+        times = _validate_highlight(name, result)
+        if caching:
+            llm_cache.store_result(key_for(name, models[name]), result, name, models[name])
+        _print_selection(name, result, *times)
+        return times
+    
+    for name, api_func, model in providers:
         try:
             print(f"[AI] Calling {name} for highlight selection...")
             result = api_func(Transcription)
             
-            # Validate response
-            if not result or 'start' not in result or 'end' not in result:
-                print(f"[AI] {name} returned invalid response")
+            times = _validate_highlight(name, result)
+            if not times:
                 continue
             
-            try:
-                Start = int(float(result['start']))
-                End = int(float(result['end']))
-            except (ValueError, TypeError) as e:
-                print(f"[AI] Error parsing times from {name}: {e}")
-                continue
+            if caching:
+                llm_cache.store_result(key_for(name, model), result, name, model)
             
-            # Validate times
-            if Start < 0 or End < 0:
-                print(f"[AI] Negative time values from {name}")
-                continue
+            # Success!
+            _print_selection(name, result, *times)
+            return times
             
-            if End <= Start:
-                print(f"[AI] Invalid time range from {name}")
+        except Exception as e:
+            print(f"[AI] {name} error: {e}")
+            continue
+    
+    print("ERROR: All AI providers failed")
+    return None, None
+
+
+def GetHighlights(Transcription, count=5, use_cache=True, hedge=False):
+    """
+    Get up to count non-overlapping highlight segments with a single LLM call.
+    Same provider order, response cache and hedging as GetHighlight.
+    
+    Returns:
+        List of (Start, End), best first (empty if every provider failed)
+    """
+    if count <= 1:
+        Start, End = GetHighlight(Transcription, use_cache=use_cache, hedge=hedge)
+        return [(Start, End)] if Start is not None else []
+    
+    providers = _available_providers()
+    
+    if not providers:
+        print("ERROR: No API keys available!")
+        return []
+    
+    caching = llm_cache is not None and llm_cache.cache_enabled(use_cache)
+    
+    def key_for(name, model):
+        return llm_cache.cache_key("highlights", Transcription, name, model, PROMPT_VERSION, count)
+    
+    def report(name, selected):
+        print(f"\n{'='*60}")
+        print(f"SELECTED {len(selected)} SEGMENTS ({name}):")
+        for Start, End in selected:
+            print(f"  {Start}s - {End}s ({End-Start}s duration)")
+        print(f"{'='*60}\n")
+    
+    if caching:
+        for name, _, model in providers:
+            cached = llm_cache.get_cached(key_for(name, model))
+            selected = _select_highlights(name, cached, count) if cached else []
+            if selected:
+                print(f"[AI] Using cached {name} highlights")
+                report(name, selected)
+                return selected
+    
+    if hedge and hedged_call and len(providers) > 1:
+        models = {name: model for name, _, model in providers}
+        calls = [(name, lambda api_func=api_func: api_func(Transcription, count)) for name, api_func, _ in providers]
+        name, result = hedged_call(calls, lambda r: bool(_select_highlights("Provider", r, count)))
+        if result is None:
+            print("ERROR: All AI providers failed")
+            return []
+        
+        selected = _select_highlights(name, result, count)
+        if caching:
+            llm_cache.store_result(key_for(name, models[name]), result, name, models[name])
+        report(name, selected)
+        return selected
+    
+    for name, api_func, model in providers:
+        try:
+            print(f"[AI] Calling {name} for {count} highlights...")
+            result = api_func(Transcription, count)
+            
+            selected = _select_highlights(name, result, count)
+            if not selected:
                 continue
             
-            # Success!
-            print(f"\n{'='*60}")
-            print(f"SELECTED SEGMENT ({name}):")
-            print(f"Time: {Start}s - {End}s ({End-Start}s duration)")
-            if 'content' in result:
-                content_preview = result['content'][:200] if len(result['content']) > 200 else result['content']
-                print(f"Content: {content_preview}...")
-            print(f"{'='*60}\n")
+            if caching:
+                llm_cache.store_result(key_for(name, model), result, name, model)
             
-            return Start, End
+            report(name, selected)
+            return selected
             
         except Exception as e:
             print(f"[AI] {name} error: {e}")
             continue
     
     print("ERROR: All AI providers failed")
-    return None, None
+    return []
 
 
 if __name__ == "__main__":
@@ -1,30 +1,53 @@
 import cv2
 import numpy as np
-import webrtcvad
-import wave
-import contextlib
-from pydub import AudioSegment
-import os
+import subprocess
 
 # Update paths to the model files
 prototxt_path = "models/deploy.prototxt"
 model_path = "models/res10_300x300_ssd_iter_140000_fp16.caffemodel"
-temp_audio_path = "temp_audio.wav"
 
-# Load DNN model
-net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
+# SSD input size / mean used by the res10 face model
+NET_SIZE = (300, 300)
+NET_MEAN = (104.0, 177.0, 123.0)
+
+# Frames per forward pass
+BATCH_SIZE = 16
+
+# webrtcvad frame length
+VAD_FRAME_MS = 30
+VAD_SAMPLE_RATE = 16000
+
+_net = None
+_vad = None
+
+
+def get_face_net():
+    """Load the DNN face model once per process"""
+    global _net
+    if _net is None:
+        _net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
+    return _net
+
+
+def get_vad():
+    global _vad
+    if _vad is None:
+        import webrtcvad
+        _vad = webrtcvad.Vad(2)  # Aggressiveness mode from 0 to 3
+    return _vad
 
-# Initialize VAD
-vad = webrtcvad.Vad(2)  # Aggressiveness mode from 0 to 3
 
 def voice_activity_detection(audio_frame, sample_rate=16000):
-    return vad.is_speech(audio_frame, sample_rate)
+    return get_vad().is_speech(audio_frame, sample_rate)
+
 
 def extract_audio_from_video(video_path, audio_path):
+    from pydub import AudioSegment
     audio = AudioSegment.from_file(video_path)
     audio = audio.set_frame_rate(16000).set_channels(1)
     audio.export(audio_path, format="wav")
 
+
 def process_audio_frame(audio_data, sample_rate=16000, frame_duration_ms=30):
     n = int(sample_rate * frame_duration_ms / 1000) * 2  # 2 bytes per sample
     offset = 0
@@ -33,105 +56,183 @@ def process_audio_frame(audio_data, sample_rate=16000, frame_duration_ms=30):
         offset += n
         yield frame
 
-global Frames
-Frames = [] # [x,y,w,h]
 
-def detect_faces_and_speakers(input_video_path, output_video_path):
-    # Return Frams:
-    global Frames
-    # Extract audio from the video
-    extract_audio_from_video(input_video_path, temp_audio_path)
-
-    # Read the extracted audio
-    with contextlib.closing(wave.open(temp_audio_path, 'rb')) as wf:
-        sample_rate = wf.getframerate()
-        audio_data = wf.readframes(wf.getnframes())
+def speech_mask(video_path, frame_ms=VAD_FRAME_MS):
+    """
+    Run VAD over the whole audio track once.
+
+    FFmpeg streams 16 kHz mono s16le through a pipe and each 30 ms frame is
+    classified as it arrives, so the audio is never held in memory or
+    written to a temp WAV.
+
+    Returns:
+        Boolean array, one entry per frame_ms of audio (empty if there is no audio)
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", video_path,
+        "-vn", "-ac", "1", "-ar", str(VAD_SAMPLE_RATE),
+        "-f", "s16le", "-"
+    ]
+    frame_bytes = int(VAD_SAMPLE_RATE * frame_ms / 1000) * 2  # 2 bytes per sample
+
+    flags = []
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        print("FFmpeg not found - no speech mask")
+        return np.zeros(0, dtype=bool)
+
+    with proc.stdout:
+        while True:
+            frame = proc.stdout.read(frame_bytes)
+            if len(frame) < frame_bytes:
+                break
+            flags.append(voice_activity_detection(frame, VAD_SAMPLE_RATE))
+    proc.wait()
+
+    return np.array(flags, dtype=bool)
+
+
+def _largest_faces(detections, batch_len, sizes, confidence):
+    """
+    Pick the largest confident face per image from a batched SSD output.
+
+    Returns:
+        float32 array (batch_len, 4) of x, y, x1, y1 in pixels, NaN where no face
+    """
+    boxes = np.full((batch_len, 4), np.nan, dtype=np.float32)
+    dets = detections.reshape(-1, 7)
+    dets = dets[dets[:, 2] > confidence]
+    if len(dets) == 0:
+        return boxes
+
+    image_ids = dets[:, 0].astype(np.int64)
+    heights = dets[:, 6] - dets[:, 4]
+    # Largest face first, then keep the first row per image
+    order = np.lexsort((-heights, image_ids))
+    image_ids = image_ids[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = image_ids[1:] != image_ids[:-1]
+    chosen = dets[order][first]
+    chosen_ids = image_ids[first]
+
+    w, h = sizes
+    boxes[chosen_ids] = chosen[:, 3:7] * np.array([w, h, w, h], dtype=np.float32)
+    return boxes
+
+
+def analyze_speakers(input_video_path, stride=1, batch_size=BATCH_SIZE, confidence=0.3, debug_video_path=None):
+    """
+    Headless active-speaker analysis.
+
+    Frames are decoded forward once; every stride-th frame goes through the
+    face net in batches (blobFromImages), skipped frames are only grab()bed.
+    The audio is decoded and run through VAD once for the whole file.
+
+    Args:
+        input_video_path: Source video
+        stride: Analyse every n-th frame
+        batch_size: Frames per forward pass
+        confidence: Minimum face confidence
+        debug_video_path: If set, also write a video with boxes drawn (slow)
+
+    Returns:
+        dict with
+            frame_indices: int array (N,) of analysed frame numbers
+            boxes: float32 array (N, 4) x, y, x1, y1 of the main face (NaN = none)
+            speaking: bool array (N,) VAD speech at each analysed frame
+            fps: source frame rate
+    """
+    net = get_face_net()
+    mask = speech_mask(input_video_path)
 
     cap = cv2.VideoCapture(input_video_path)
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_video_path, fourcc, 30.0, (int(cap.get(3)), int(cap.get(4))))
-
-    frame_duration_ms = 30  # 30ms frames
-    audio_generator = process_audio_frame(audio_data, sample_rate, frame_duration_ms)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    out = None
+    if debug_video_path:
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(debug_video_path, fourcc, fps / stride, size)
+
+    frame_indices = []
+    box_batches = []
+    batch = []
+    debug_frames = []
+
+    def flush():
+        net.setInput(cv2.dnn.blobFromImages(batch, 1.0, NET_SIZE, NET_MEAN))
+        boxes = _largest_faces(net.forward(), len(batch), size, confidence)
+        box_batches.append(boxes)
+        if out is not None:
+            for frame, box in zip(debug_frames, boxes):
+                if not np.isnan(box[0]):
+                    x, y, x1, y1 = box.astype(int)
+                    cv2.rectangle(frame, (x, y), (x1, y1), (0, 255, 0), 2)
+                out.write(frame)
+        batch.clear()
+        debug_frames.clear()
+
+    index = 0
+    while True:
+        if index % stride:
+            if not cap.grab():
+                break
+            index += 1
+            continue
 
-    while cap.isOpened():
         ret, frame = cap.read()
         if not ret:
             break
+        frame_indices.append(index)
+        batch.append(cv2.resize(frame, NET_SIZE))
+        if out is not None:
+            debug_frames.append(frame)
+        if len(batch) >= batch_size:
+            flush()
+        index += 1
 
-        h, w = frame.shape[:2]
-        blob = cv2.dnn.blobFromImage(cv2.resize(frame, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
-        net.setInput(blob)
-        detections = net.forward()
+    if batch:
+        flush()
 
-        audio_frame = next(audio_generator, None)
-        if audio_frame is None:
-            break
-        is_speaking_audio = voice_activity_detection(audio_frame, sample_rate)
-        MaxDif = 0
-        Add = []
-        face_found = False
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-            if confidence > 0.3:  # Confidence threshold
-                box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                (x, y, x1, y1) = box.astype("int")
-                face_width = x1 - x
-                face_height = y1 - y
-
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x1, y1), (0, 255, 0), 2)
-
-                # Assuming lips are approximately at the bottom third of the face
-                lip_distance = abs((y + 2 * face_height // 3) - (y1))
-                Add.append([[x, y, x1, y1], lip_distance])
-
-                MaxDif = max(lip_distance, MaxDif)
-                face_found = True
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-            if confidence > 0.3:  # Confidence threshold
-                box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                (x, y, x1, y1) = box.astype("int")
-                face_width = x1 - x
-                face_height = y1 - y
-
-                # Draw bounding box
-                cv2.rectangle(frame, (x, y), (x1, y1), (0, 255, 0), 2)
-
-                # Assuming lips are approximately at the bottom third of the face
-                lip_distance = abs((y + 2 * face_height // 3) - (y1))
-                print(lip_distance)
-
-                # Combine visual and audio cues
-                if lip_distance >= MaxDif and is_speaking_audio:  # Adjust the threshold as needed
-                    cv2.putText(frame, "Active Speaker", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                if lip_distance >= MaxDif:
-                    break
-
-        if face_found:
-            Frames.append([x, y, x1, y1])
-        else:
-            # If no face detected, append previous frame's values or None
-            if len(Frames) > 0:
-                Frames.append(Frames[-1])
-            else:
-                Frames.append(None)
+    cap.release()
+    if out is not None:
+        out.release()
 
-        out.write(frame)
-        # cv2.imshow('Frame', frame)
-        # if cv2.waitKey(1) & 0xFF == ord('q'):
-        #     break
+    frame_indices = np.array(frame_indices, dtype=np.int64)
+    boxes = np.concatenate(box_batches) if box_batches else np.zeros((0, 4), dtype=np.float32)
 
-    cap.release()
-    out.release()
-    cv2.destroyAllWindows()
-    os.remove(temp_audio_path)
+    # Map each analysed frame's timestamp onto the 30 ms VAD grid
+    vad_index = (frame_indices / fps * 1000 / VAD_FRAME_MS).astype(np.int64)
+    speaking = np.zeros(len(frame_indices), dtype=bool)
+    valid = vad_index < len(mask)
+    speaking[valid] = mask[vad_index[valid]]
+
+    return {"frame_indices": frame_indices, "boxes": boxes, "speaking": speaking, "fps": fps}
+
+
+global Frames
+Frames = [] # [x,y,w,h]
+
+def detect_faces_and_speakers(input_video_path, output_video_path):
+    """Legacy wrapper: fills the module-level Frames list and writes the debug video."""
+    global Frames
+    result = analyze_speakers(input_video_path, debug_video_path=output_video_path)
+
+    # Frames with no face repeat the previous box (None before the first face)
+    Frames.clear()
+    for box in result["boxes"]:
+        if not np.isnan(box[0]):
+            Frames.append([int(v) for v in box])
+        else:
+            Frames.append(Frames[-1] if Frames else None)
+    return result
 
 
 
 if __name__ == "__main__":
-    detect_faces_and_speakers()
-    print(Frames)
-    print(len(Frames))
-    print(Frames[1:5])
+    import sys
+    result = analyze_speakers(sys.argv[1], stride=2)
+    print(f"{len(result['frame_indices'])} frames analysed, {int(result['speaking'].sum())} with speech")
+    print(result["boxes"][:5])
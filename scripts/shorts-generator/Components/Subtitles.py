@@ -5,7 +5,9 @@ Creates SRT file and burns subtitles directly with FFmpeg
 import os
 import re
 import subprocess
-from moviepy.editor import VideoFileClip
+
+# Yellow Arial with black outline near the bottom
+SUBTITLE_FORCE_STYLE = "FontName=Arial,FontSize=16,PrimaryColour=&H00FFFF&,OutlineColour=&H000000&,Outline=2,MarginV=30"
 
 
 def create_srt_file(transcriptions, output_path, video_start_time=0, video_duration=None):
@@ -14,7 +16,7 @@ def create_srt_file(transcriptions, output_path, video_start_time=0, video_durat
     """
     with open(output_path, 'w', encoding='utf-8') as f:
         idx = 1
-        for text, start, end in transcriptions:
+        for text, start, end, *_ in transcriptions:
             # Adjust times relative to video start
             adjusted_start = start - video_start_time
             adjusted_end = end - video_start_time
@@ -47,7 +49,26 @@ def format_srt_time(seconds):
     return f"{hours:02d}:{minutes:02d}:{int(secs):02d},{millis:03d}"
 
 
-def add_subtitles_to_video(input_video, output_video, transcriptions, video_start_time=0):
+def subtitle_filter(srt_path):
+    """FFmpeg subtitles filter for an SRT file (path escaped for Windows)"""
+    srt_escaped = srt_path.replace('\\', '/').replace(':', r'\:')
+    return f"subtitles='{srt_escaped}':force_style='{SUBTITLE_FORCE_STYLE}'"
+
+
+def get_media_duration(path):
+    """Container duration in seconds via ffprobe (None if unknown)"""
+    cmd = [
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        return float(result.stdout.strip())
+    except Exception:
+        return None
+
+
+def add_subtitles_to_video(input_video, output_video, transcriptions, video_start_time=0, video_duration=None):
     """
     Add subtitles to video using FFmpeg (no ImageMagick required).
     
@@ -56,11 +77,10 @@ def add_subtitles_to_video(input_video, output_video, transcriptions, video_star
         output_video: Path to output video file
         transcriptions: List of [text, start, end] from transcribeAudio
         video_start_time: Start time offset if video was cropped
+        video_duration: Clip length if known (otherwise probed with ffprobe)
     """
-    # Get video duration
-    video = VideoFileClip(input_video)
-    video_duration = video.duration
-    video.close()
+    if video_duration is None:
+        video_duration = get_media_duration(input_video)
     
     # Create SRT file
     srt_path = input_video.replace('.mp4', '_subs.srt')
@@ -79,15 +99,12 @@ def add_subtitles_to_video(input_video, output_video, transcriptions, video_star
     
     print(f"Burning subtitles with FFmpeg...")
     
-    # Escape path for FFmpeg filter (Windows compatibility)
-    srt_escaped = srt_path.replace('\\', '/').replace(':', r'\:')
-    
     # FFmpeg command to burn subtitles
     cmd = [
         'ffmpeg',
         '-y',  # Overwrite output
         '-i', input_video,
-        '-vf', f"subtitles='{srt_escaped}':force_style='FontName=Arial,FontSize=16,PrimaryColour=&H00FFFF&,OutlineColour=&H000000&,Outline=2,MarginV=30'",
+        '-vf', subtitle_filter(srt_path),
         '-c:v', 'libx264',
         '-preset', 'fast',
         '-crf', '23',
@@ -1,18 +1,247 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from faster_whisper import WhisperModel
-import torch
+from Components.TranscriptionCache import (
+    cache_enabled, transcription_key, load_transcription, store_transcription
+)
 
-def transcribeAudio(audio_path):
+# Defaults can be overridden per process (e.g. a long-lived worker on a bigger box)
+DEFAULT_MODEL = os.getenv("WHISPER_MODEL", "base.en")
+DEFAULT_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE")  # None = float16 on GPU, int8 on CPU
+
+# Sources at least this long (seconds) are split on silences and transcribed in parallel on CPU
+CHUNKED_MIN_DURATION = 600
+
+# Target chunk length (seconds); cuts are only made inside VAD silences
+CHUNK_SECONDS = 120
+
+# CPU threads per pool worker - a few threads per process scales better than one big decoder
+THREADS_PER_WORKER = 2
+
+SAMPLE_RATE = 16000
+
+# Decode options shared by the single-pass and chunked paths
+TRANSCRIBE_OPTIONS = {"beam_size": 5, "language": "en", "max_new_tokens": 128, "condition_on_previous_text": False}
+
+# Loaded models, keyed by (size, device, compute_type, cpu_threads) - one load per process
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_device():
+    """'cuda' if CTranslate2 can see a GPU, else 'cpu' (no torch import needed)"""
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def resolve_compute_type(device, compute_type=None):
+    """Compute type actually used on device: explicit, WHISPER_COMPUTE_TYPE, or float16 on GPU / int8 on CPU"""
+    return compute_type or DEFAULT_COMPUTE_TYPE or ("float16" if device == "cuda" else "int8")
+
+
+def get_model(model_size=None, device=None, compute_type=None, cpu_threads=0):
+    """
+    Return a loaded WhisperModel, loading it on first use only.
+
+    Args:
+        model_size: Whisper model name (default WHISPER_MODEL / base.en)
+        device: "cuda" or "cpu" (default: auto-detect)
+        compute_type: e.g. "int8", "float32", "float16" (default: int8 on CPU, float16 on GPU)
+        cpu_threads: CPU decoder threads (0 = CTranslate2 default)
+    """
+    model_size = model_size or DEFAULT_MODEL
+    device = device or get_device()
+    compute_type = resolve_compute_type(device, compute_type)
+    key = (model_size, device, compute_type, cpu_threads)
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    # Hold the lock while loading so concurrent callers don't load twice
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            print(f"Loading Whisper {model_size} ({device}, {compute_type})...")
+            model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+            _models[key] = model
+            print("Model loaded")
+    return model
+
+
+def warm_up(model_size=None, device=None, compute_type=None, background=True):
+    """
+    Load the model (and run one tiny decode) ahead of the first real job.
+
+    With background=True this returns the loader thread immediately so the
+    load overlaps with downloading / audio extraction.
+    """
+    def load():
+        try:
+            import numpy as np
+            model = get_model(model_size, device, compute_type)
+            # One second of silence initialises the decoder kernels
+            segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1, language="en")
+            list(segments)
+        except Exception as e:
+            print(f"Whisper warm-up failed: {e}")
+
+    if not background:
+        load()
+        return None
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def plan_chunks(speech, total_samples, target_samples):
+    """
+    Group VAD speech regions into chunks of roughly target_samples.
+
+    Cuts are placed in the middle of the silence between two speech regions,
+    so no word is split across chunks.
+
+    Returns:
+        List of (start_sample, end_sample)
+    """
+    chunks = []
+    chunk_start = 0
+    for current, following in zip(speech, speech[1:]):
+        cut = (current["end"] + following["start"]) // 2
+        if cut - chunk_start >= target_samples:
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    if chunk_start < total_samples:
+        chunks.append((chunk_start, total_samples))
+    return chunks
+
+
+_worker_model = None
+
+
+def _init_worker(model_size, compute_type, cpu_threads):
+    global _worker_model
+    _worker_model = get_model(model_size, "cpu", compute_type, cpu_threads)
+
+
+def _segment_rows(segments, offset=0.0, word_timestamps=False):
+    """faster-whisper segments -> [text, start, end] (+ [[word, start, end], ...]) on the source timeline"""
+    rows = []
+    for segment in segments:
+        row = [segment.text, segment.start + offset, segment.end + offset]
+        if word_timestamps:
+            row.append([[word.word, word.start + offset, word.end + offset] for word in (segment.words or [])])
+        rows.append(row)
+    return rows
+
+
+def _transcribe_chunk(audio, offset, word_timestamps=False):
+    """Pool task: transcribe one chunk and move its timestamps onto the source timeline"""
+    segments, _ = _worker_model.transcribe(audio=audio, word_timestamps=word_timestamps, **TRANSCRIBE_OPTIONS)
+    return _segment_rows(segments, offset, word_timestamps)
+
+
+def transcribe_chunked(audio, model_size=None, compute_type=None, workers=None, word_timestamps=False):
+    """
+    Split decoded 16 kHz audio on silences and transcribe the chunks in a process pool.
+
+    Args:
+        audio: float32 mono samples at 16 kHz
+        model_size: Whisper model name
+        compute_type: CTranslate2 compute type
+        workers: Pool size (default: cores / THREADS_PER_WORKER)
+        word_timestamps: Also return per-word timings
+
+    Returns:
+        List of [text, start, end] on the source timeline, in order
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    cores = os.cpu_count() or 1
+    workers = workers or max(1, cores // THREADS_PER_WORKER)
+    threads = max(1, cores // workers)
+
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+    chunks = plan_chunks(speech, len(audio), CHUNK_SECONDS * SAMPLE_RATE)
+    print(f"Transcribing {len(chunks)} chunks on {workers} workers ({threads} threads each)...")
+
+    # spawn: the parent may hold a loaded model and decoder threads, which don't survive fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_size or DEFAULT_MODEL, compute_type, threads)
+    ) as pool:
+        futures = [
+            pool.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, word_timestamps)
+            for start, end in chunks
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def transcribeAudio(audio_path, model_size=None, compute_type=None, workers=None, word_timestamps=False, use_cache=True):
+    """
+    Transcribe an audio file, or 16 kHz mono float32 samples (see Edit.load_audio_pcm).
+    Returns a list of [text, start, end]
+    (with a 4th element of [word, start, end] lists when word_timestamps=True).
+
+    Long sources on CPU are split on VAD silences and transcribed across a
+    process pool (workers=1 forces the single-pass decode). Results are
+    cached by a hash of the decoded audio, model, resolved compute type,
+    decode mode (chunked or single pass) and decode options.
+    """
     try:
         print("Transcribing audio...")
-        Device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(Device)
-        model = WhisperModel("base.en", device="cuda" if torch.cuda.is_available() else "cpu")
-        print("Model loaded")
-        segments, info = model.transcribe(audio=audio_path, beam_size=5, language="en", max_new_tokens=128, condition_on_previous_text=False)
-        segments = list(segments)
-        # print(segments)
-        extracted_texts = [[segment.text, segment.start, segment.end] for segment in segments]
+        if isinstance(audio_path, str):
+            from faster_whisper.audio import decode_audio
+            audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        else:
+            audio = audio_path
+        duration = len(audio) / SAMPLE_RATE
+        
+        device = get_device()
+        chunked = (
+            workers != 1
+            and device == "cpu"
+            and (os.cpu_count() or 1) > THREADS_PER_WORKER
+            and duration >= CHUNKED_MIN_DURATION
+        )
+        
+        key = None
+        if cache_enabled(use_cache):
+            # Chunk boundaries and precision change the output, so both are part of the key
+            options = dict(
+                TRANSCRIBE_OPTIONS,
+                word_timestamps=word_timestamps,
+                compute_type=resolve_compute_type(device, compute_type),
+                mode=f"chunked-{CHUNK_SECONDS}s" if chunked else "single"
+            )
+            key = transcription_key(audio, model_size or DEFAULT_MODEL, options["language"], options)
+            cached = load_transcription(key)
+            if cached is not None:
+                print(f"✓ Using cached transcription: {len(cached)} segments")
+                return cached
+        
+        if chunked:
+            extracted_texts = transcribe_chunked(audio, model_size, compute_type, workers, word_timestamps)
+        else:
+            model = get_model(model_size, device, compute_type)
+            segments, info = model.transcribe(audio=audio, word_timestamps=word_timestamps, **TRANSCRIBE_OPTIONS)
+            extracted_texts = _segment_rows(segments, word_timestamps=word_timestamps)
         print(f"✓ Transcription complete: {len(extracted_texts)} segments extracted")
+        
+        if key and extracted_texts:
+            store_transcription(key, extracted_texts)
         return extracted_texts
     except Exception as e:
         print("Transcription Error:", e)
@@ -26,4 +255,4 @@ if __name__ == "__main__":
 
     for text, start, end in transcriptions:
         TransText += (f"{start} - {end}: {text}")
-    print(TransText)
\ No newline at end of file
+    print(TransText)
@@ -0,0 +1,123 @@
+"""
+Transcription Cache - persistent Whisper results keyed by decoded audio
+Segments (and word timings, when requested) are stored column-wise in a
+compressed .npz per entry; least recently used entries are evicted once
+the cache grows past TRANSCRIPT_CACHE_MAX_BYTES.
+"""
+import io
+import os
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+# Cache location/helpers are shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent / "clipper"))
+try:
+    from cache_utils import cache_dir, atomic_write_bytes, touch_entry, evict_lru
+except ImportError:
+    cache_dir = None
+    atomic_write_bytes = None
+
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+
+# Bump when the stored layout changes
+TRANSCRIPT_CACHE_VERSION = 1
+
+
+def cache_enabled(use_cache=True):
+    """False if the caller, TRANSCRIPT_CACHE=0, or a missing cache root opts out"""
+    return bool(use_cache) and cache_dir is not None and os.getenv("TRANSCRIPT_CACHE", "1") != "0"
+
+
+def transcription_key(audio, model_name, language, options):
+    """Hash of the decoded samples plus everything that changes the decode"""
+    digest = hashlib.sha1(np.ascontiguousarray(audio).tobytes())
+    digest.update(json.dumps(
+        {"model": model_name, "language": language, "options": options, "version": TRANSCRIPT_CACHE_VERSION},
+        sort_keys=True
+    ).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _pack_strings(strings):
+    """Encode a list of strings as one UTF-8 blob plus end offsets"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.cumsum([len(b) for b in encoded], dtype=np.int64) if encoded else np.zeros(0, dtype=np.int64)
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    strings = []
+    start = 0
+    for end in offsets.tolist():
+        strings.append(data[start:end].decode("utf-8"))
+        start = end
+    return strings
+
+
+def load_transcription(key):
+    """
+    Return cached segments as [[text, start, end], ...] (with a 4th element
+    of [word, start, end] lists when word timings were stored), or None.
+    """
+    path = os.path.join(cache_dir("transcripts"), f"{key}.npz")
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            texts = _unpack_strings(data["text_blob"], data["text_offsets"])
+            starts = data["starts"].tolist()
+            ends = data["ends"].tolist()
+            segments = [[text, start, end] for text, start, end in zip(texts, starts, ends)]
+
+            if "word_segment" in data:
+                words = _unpack_strings(data["word_blob"], data["word_offsets"])
+                for segment in segments:
+                    segment.append([])
+                for word, seg, start, end in zip(words, data["word_segment"].tolist(),
+                                                 data["word_starts"].tolist(), data["word_ends"].tolist()):
+                    segments[seg][3].append([word, start, end])
+    except Exception as e:
+        print(f"Transcription cache read failed: {e}")
+        return None
+
+    touch_entry(path)
+    return segments
+
+
+def store_transcription(key, segments):
+    """Save segments ([text, start, end] or [text, start, end, words]) and enforce the size budget"""
+    texts = [segment[0] for segment in segments]
+    text_blob, text_offsets = _pack_strings(texts)
+    columns = {
+        "starts": np.array([segment[1] for segment in segments], dtype=np.float64),
+        "ends": np.array([segment[2] for segment in segments], dtype=np.float64),
+        "text_blob": text_blob,
+        "text_offsets": text_offsets,
+    }
+
+    if segments and len(segments[0]) > 3:
+        words = [(i, word) for i, segment in enumerate(segments) for word in segment[3]]
+        word_blob, word_offsets = _pack_strings([word[0] for _, word in words])
+        columns.update({
+            "word_segment": np.array([i for i, _ in words], dtype=np.int32),
+            "word_starts": np.array([word[1] for _, word in words], dtype=np.float64),
+            "word_ends": np.array([word[2] for _, word in words], dtype=np.float64),
+            "word_blob": word_blob,
+            "word_offsets": word_offsets,
+        })
+
+    try:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **columns)
+        directory = cache_dir("transcripts")
+        atomic_write_bytes(os.path.join(directory, f"{key}.npz"), buffer.getvalue())
+        evict_lru(directory, TRANSCRIPT_CACHE_MAX_BYTES, ".npz")
+    except Exception as e:
+        print(f"Transcription cache write failed: {e}")
+
@@ -4,9 +4,21 @@ Uses pytubefix with silent progress to avoid Unicode errors
 """
 import os
 import re
+import sys
+from pathlib import Path
 from pytubefix import YouTube
 import subprocess
 
+# Source media cache is shared with the clipper scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent / "clipper"))
+try:
+    import media_cache
+except ImportError:
+    media_cache = None
+
+# Media cache selection name for the best progressive mp4 stream below
+CACHE_SELECTION = "progressive_mp4"
+
 def _silent_progress(stream, chunk, bytes_remaining):
     """Silent progress callback to avoid Windows Unicode errors"""
     pass
@@ -26,10 +38,31 @@ def clean_filename(title):
     # Limit length
     return cleaned[:60]
 
-def download_youtube_video(url, output_dir='videos'):
+def _cached_download(url, output_dir):
+    """Serve a repeat download from the media cache. Returns (filepath, title) or None."""
+    if not media_cache:
+        return None
+    video_id = media_cache.video_id_from_url(url)
+    cached = media_cache.lookup_stream(video_id, CACHE_SELECTION)
+    if not cached:
+        return None
+
+    manifest = media_cache.load_manifest(video_id)
+    filename = manifest.get("filename") or f"{video_id}.mp4"
+    filepath = media_cache.materialize(cached, os.path.join(output_dir, filename))
+    return filepath, manifest.get("title") or video_id
+
+
+def download_youtube_video(url, output_dir='videos', use_cache=True):
     """Download using pytubefix with OAuth. Returns (filepath, title)"""
     os.makedirs(output_dir, exist_ok=True)
     
+    if use_cache:
+        cached = _cached_download(url, output_dir)
+        if cached:
+            print(f"✓ Using cached download: {cached[0]}")
+            return cached
+    
     try:
         print(f"Downloading: {url}")
         
@@ -51,7 +84,14 @@ def download_youtube_video(url, output_dir='videos'):
             return None, None
         
         print(f"Downloading {stream.resolution}...")
-        filename = stream.download(output_path=output_dir)
+        if use_cache and media_cache:
+            cached = media_cache.fetch_stream(yt.video_id, stream, selection=CACHE_SELECTION)
+            media_cache.update_manifest(
+                yt.video_id, title=video_title, filename=stream.default_filename, length=yt.length
+            )
+            filename = media_cache.materialize(cached, os.path.join(output_dir, stream.default_filename))
+        else:
+            filename = stream.download(output_path=output_dir)
         
         print(f"✓ Downloaded: {filename}")
         return filename, video_title
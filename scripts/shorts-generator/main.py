@@ -4,46 +4,16 @@ Original: OpenAI GPT-4
 Modified to use: xAI Grok (primary) / Google Gemini (fallback)
 """
 from Components.YoutubeDownloader import download_youtube_video
-from Components.Edit import extractAudio, crop_video
-from Components.Transcription import transcribeAudio
-from Components.LanguageTasks import GetHighlight
-from Components.FaceCrop import crop_to_vertical, combine_videos
+from Components.Edit import load_audio_pcm, crop_video
+from Components.Transcription import transcribeAudio, warm_up
+from Components.LanguageTasks import GetHighlight, GetHighlights
+from Components.FaceCrop import crop_to_vertical, combine_videos, render_short, render_shorts
 from Components.Subtitles import add_subtitles_to_video
 import sys
 import os
 import uuid
 import re
 
-# Generate unique session ID for this run
-session_id = str(uuid.uuid4())[:8]
-print(f"Session ID: {session_id}")
-
-# Check for auto-approve flag
-auto_approve = "--auto-approve" in sys.argv
-if auto_approve:
-    sys.argv.remove("--auto-approve")
-
-# Check if URL/file was provided as command-line argument
-if len(sys.argv) > 1:
-    url_or_file = sys.argv[1]
-    print(f"Using input from command line: {url_or_file}")
-else:
-    url_or_file = input("Enter YouTube video URL or local video file path: ")
-
-# Check if input is a local file
-video_title = None
-if os.path.isfile(url_or_file):
-    print(f"Using local video file: {url_or_file}")
-    Vid = url_or_file
-    video_title = os.path.splitext(os.path.basename(url_or_file))[0]
-else:
-    print(f"Downloading from YouTube: {url_or_file}")
-    Vid = download_youtube_video(url_or_file)
-    if Vid:
-        Vid = Vid.replace(".webm", ".mp4")
-        print(f"Downloaded video successfully at {Vid}")
-        video_title = os.path.splitext(os.path.basename(Vid))[0]
-
 
 def clean_filename(title):
     """Clean and slugify title for filename"""
@@ -55,122 +25,222 @@ def clean_filename(title):
     return cleaned[:80]
 
 
-# Process video
-if Vid:
-    # Create unique temporary filenames
-    audio_file = f"audio_{session_id}.wav"
-    temp_clip = f"temp_clip_{session_id}.mp4"
-    temp_cropped = f"temp_cropped_{session_id}.mp4"
-    temp_subtitled = f"temp_subtitled_{session_id}.mp4"
-    
-    Audio = extractAudio(Vid, audio_file)
-    if Audio:
-        transcriptions = transcribeAudio(Audio)
-        if len(transcriptions) > 0:
-            print(f"\n{'='*60}")
-            print(f"TRANSCRIPTION SUMMARY: {len(transcriptions)} segments")
-            print(f"{'='*60}\n")
-            TransText = ""
-            
-            for text, start, end in transcriptions:
-                TransText += (f"{start} - {end}: {text}\n")
-            
-            print("Analyzing transcription to find best highlight...")
-            start, stop = GetHighlight(TransText)
-            
-            if start is None or stop is None:
+def main():
+    # Generate unique session ID for this run
+    session_id = str(uuid.uuid4())[:8]
+    print(f"Session ID: {session_id}")
+
+    # Check for auto-approve flag
+    auto_approve = "--auto-approve" in sys.argv
+    if auto_approve:
+        sys.argv.remove("--auto-approve")
+
+    # Skip the LLM response cache (always ask the provider again)
+    use_llm_cache = "--no-cache" not in sys.argv
+    if not use_llm_cache:
+        sys.argv.remove("--no-cache")
+
+    # Race the next AI provider when the current one is slow
+    hedge_llm = "--hedge" in sys.argv
+    if hedge_llm:
+        sys.argv.remove("--hedge")
+
+    # Let the crop window follow the speaker instead of a fixed position
+    dynamic_crop = "--dynamic-crop" in sys.argv
+    if dynamic_crop:
+        sys.argv.remove("--dynamic-crop")
+
+    # Old three-encode render (crop -> subtitles -> combine) for comparison/debugging
+    legacy_render = "--legacy-render" in sys.argv
+    if legacy_render:
+        sys.argv.remove("--legacy-render")
+
+    # --count N: cut the N best non-overlapping highlights from one source
+    highlight_count = 1
+    if "--count" in sys.argv:
+        index = sys.argv.index("--count")
+        try:
+            highlight_count = max(1, int(sys.argv[index + 1]))
+            del sys.argv[index:index + 2]
+        except (IndexError, ValueError):
+            print("Usage: --count N")
+            sys.exit(1)
+
+    # Load Whisper in the background while the video downloads
+    if os.getenv("WHISPER_WARMUP", "1") != "0":
+        warm_up()
+
+    # Check if URL/file was provided as command-line argument
+    if len(sys.argv) > 1:
+        url_or_file = sys.argv[1]
+        print(f"Using input from command line: {url_or_file}")
+    else:
+        url_or_file = input("Enter YouTube video URL or local video file path: ")
+
+    # Check if input is a local file
+    video_title = None
+    if os.path.isfile(url_or_file):
+        print(f"Using local video file: {url_or_file}")
+        Vid = url_or_file
+        video_title = os.path.splitext(os.path.basename(url_or_file))[0]
+    else:
+        print(f"Downloading from YouTube: {url_or_file}")
+        # Returns (filepath, title)
+        Vid, _ = download_youtube_video(url_or_file)
+        if Vid:
+            Vid = Vid.replace(".webm", ".mp4")
+            print(f"Downloaded video successfully at {Vid}")
+            video_title = os.path.splitext(os.path.basename(Vid))[0]
+
+    # Process video
+    if Vid:
+        # Create unique temporary filenames
+        temp_clip = f"temp_clip_{session_id}.mp4"
+        temp_cropped = f"temp_cropped_{session_id}.mp4"
+        temp_subtitled = f"temp_subtitled_{session_id}.mp4"
+
+        # 16 kHz PCM straight from FFmpeg - no temp WAV
+        Audio = load_audio_pcm(Vid)
+        if Audio is not None:
+            transcriptions = transcribeAudio(Audio)
+            if len(transcriptions) > 0:
                 print(f"\n{'='*60}")
-                print("ERROR: Failed to get highlight from AI")
-                print(f"{'='*60}")
-                print("This could be due to:")
-                print("  - API issues or rate limiting")
-                print("  - Invalid API key")
-                print("  - Network connectivity problems")
-                print(f"\nTranscription summary:")
-                print(f"  Total segments: {len(transcriptions)}")
-                print(f"  Total length: {len(TransText)} characters")
+                print(f"TRANSCRIPTION SUMMARY: {len(transcriptions)} segments")
                 print(f"{'='*60}\n")
-                sys.exit(1)
-            
-            # Auto-approve on Windows (no select.select support)
-            approved = auto_approve or (os.name == 'nt')
-            
-            if not approved:
-                while not approved:
+                TransText = ""
+
+                for text, start, end in transcriptions:
+                    TransText += (f"{start} - {end}: {text}\n")
+
+                clean_title = clean_filename(video_title) if video_title else "output"
+
+                if highlight_count > 1:
+                    # One LLM call for all highlights, then concurrent renders from the same source
+                    print(f"Analyzing transcription to find the {highlight_count} best highlights...")
+                    segments = GetHighlights(TransText, highlight_count, use_cache=use_llm_cache, hedge=hedge_llm)
+                    if not segments:
+                        print("ERROR: Failed to get highlights from AI")
+                        sys.exit(1)
+
+                    outputs = [f"{clean_title}_{session_id}_short{i + 1}.mp4" for i in range(len(segments))]
+                    results = render_shorts(Vid, segments, outputs, transcriptions, dynamic=dynamic_crop)
+
                     print(f"\n{'='*60}")
-                    print(f"SELECTED SEGMENT DETAILS:")
-                    print(f"Time: {start}s - {stop}s ({stop-start}s duration)")
+                    for (start, stop), output, ok in zip(segments, outputs, results):
+                        status = "[OK]" if ok else "[FAILED]"
+                        print(f"{status} {output} ({start}s - {stop}s)")
                     print(f"{'='*60}\n")
-                    
-                    print("Options:")
-                    print("  [Enter/y] Approve and continue")
-                    print("  [r] Regenerate selection")
-                    print("  [n] Cancel")
-                    print("\nAuto-approving in 15 seconds if no input...")
-                    
-                    try:
-                        import select
-                        ready, _, _ = select.select([sys.stdin], [], [], 15)
-                        if ready:
-                            user_input = sys.stdin.readline().strip().lower()
-                            if user_input == 'r':
-                                print("\nRegenerating selection...")
-                                start, stop = GetHighlight(TransText)
-                            elif user_input == 'n':
-                                print("Cancelled by user")
-                                sys.exit(0)
+                    return
+
+                print("Analyzing transcription to find best highlight...")
+                start, stop = GetHighlight(TransText, use_cache=use_llm_cache, hedge=hedge_llm)
+
+                if start is None or stop is None:
+                    print(f"\n{'='*60}")
+                    print("ERROR: Failed to get highlight from AI")
+                    print(f"{'='*60}")
+                    print("This could be due to:")
+                    print("  - API issues or rate limiting")
+                    print("  - Invalid API key")
+                    print("  - Network connectivity problems")
+                    print(f"\nTranscription summary:")
+                    print(f"  Total segments: {len(transcriptions)}")
+                    print(f"  Total length: {len(TransText)} characters")
+                    print(f"{'='*60}\n")
+                    sys.exit(1)
+
+                # Auto-approve on Windows (no select.select support)
+                approved = auto_approve or (os.name == 'nt')
+
+                if not approved:
+                    while not approved:
+                        print(f"\n{'='*60}")
+                        print(f"SELECTED SEGMENT DETAILS:")
+                        print(f"Time: {start}s - {stop}s ({stop-start}s duration)")
+                        print(f"{'='*60}\n")
+
+                        print("Options:")
+                        print("  [Enter/y] Approve and continue")
+                        print("  [r] Regenerate selection")
+                        print("  [n] Cancel")
+                        print("\nAuto-approving in 15 seconds if no input...")
+
+                        try:
+                            import select
+                            ready, _, _ = select.select([sys.stdin], [], [], 15)
+                            if ready:
+                                user_input = sys.stdin.readline().strip().lower()
+                                if user_input == 'r':
+                                    print("\nRegenerating selection...")
+                                    # A cached answer would just repeat the rejected one
+                                    start, stop = GetHighlight(TransText, use_cache=False, hedge=hedge_llm)
+                                elif user_input == 'n':
+                                    print("Cancelled by user")
+                                    sys.exit(0)
+                                else:
+                                    print("Approved by user")
+                                    approved = True
                             else:
-                                print("Approved by user")
+                                print("\nTimeout - auto-approving selection")
                                 approved = True
-                        else:
-                            print("\nTimeout - auto-approving selection")
+                        except:
+                            print("\nAuto-approving (Windows mode)")
                             approved = True
-                    except:
-                        print("\nAuto-approving (Windows mode)")
-                        approved = True
-            else:
-                print(f"\n{'='*60}")
-                print(f"SELECTED SEGMENT: {start}s - {stop}s ({stop-start}s duration)")
-                print(f"{'='*60}")
-                print("Auto-approved\n")
-            
-            print(f"\n[OK] Final highlight: {start}s - {stop}s")
-            
-            if start >= 0 and stop > 0 and stop > start:
-                print(f"\nCreating short video: {start}s - {stop}s ({stop-start}s duration)")
-                
-                print("Step 1/3: Extracting and cropping to vertical format (9:16)...")
-                crop_to_vertical(Vid, temp_cropped, start, stop)
-                
-                print("Step 2/3: Adding subtitles to video...")
-                add_subtitles_to_video(temp_cropped, temp_subtitled, transcriptions, video_start_time=start)
-                
-                # Generate final output filename
-                clean_title = clean_filename(video_title) if video_title else "output"
-                final_output = f"{clean_title}_{session_id}_short.mp4"
-                
-                print("Step 3/3: Finalizing video...")
-                # If everything went well, temp_subtitled is our final video
-                # But we use combine_videos to ensure audio is correct and handle any final container issues
-                combine_videos(temp_cropped, temp_subtitled, final_output)
-                
-                print(f"\n{'='*60}")
-                print(f"[OK] SUCCESS: {final_output} is ready!")
-                print(f"{'='*60}\n")
-                
-                # Clean up temporary files
-                try:
-                    for temp_file in [audio_file, temp_clip, temp_cropped, temp_subtitled]:
-                        if os.path.exists(temp_file):
-                            os.remove(temp_file)
-                    print(f"Cleaned up temporary files for session {session_id}")
-                except Exception as e:
-                    print(f"Warning: Could not clean up some temporary files: {e}")
+                else:
+                    print(f"\n{'='*60}")
+                    print(f"SELECTED SEGMENT: {start}s - {stop}s ({stop-start}s duration)")
+                    print(f"{'='*60}")
+                    print("Auto-approved\n")
+
+                print(f"\n[OK] Final highlight: {start}s - {stop}s")
+
+                if start >= 0 and stop > 0 and stop > start:
+                    print(f"\nCreating short video: {start}s - {stop}s ({stop-start}s duration)")
+
+                    # Generate final output filename
+                    final_output = f"{clean_title}_{session_id}_short.mp4"
+
+                    if legacy_render:
+                        print("Step 1/3: Extracting and cropping to vertical format (9:16)...")
+                        crop_to_vertical(Vid, temp_cropped, start, stop, dynamic=dynamic_crop)
+
+                        print("Step 2/3: Adding subtitles to video...")
+                        add_subtitles_to_video(temp_cropped, temp_subtitled, transcriptions,
+                                               video_start_time=start, video_duration=stop - start)
+
+                        print("Step 3/3: Finalizing video...")
+                        # If everything went well, temp_subtitled is our final video
+                        # But we use combine_videos to ensure audio is correct and handle any final container issues
+                        combine_videos(temp_cropped, temp_subtitled, final_output)
+                    else:
+                        # Seek, crop, burn subtitles and encode audio in one FFmpeg pass
+                        print("Rendering vertical short with subtitles...")
+                        if not render_short(Vid, final_output, start, stop, transcriptions, dynamic=dynamic_crop):
+                            print("Error rendering short")
+                            return
+
+                    print(f"\n{'='*60}")
+                    print(f"[OK] SUCCESS: {final_output} is ready!")
+                    print(f"{'='*60}\n")
+
+                    # Clean up temporary files
+                    try:
+                        for temp_file in [temp_clip, temp_cropped, temp_subtitled]:
+                            if os.path.exists(temp_file):
+                                os.remove(temp_file)
+                        print(f"Cleaned up temporary files for session {session_id}")
+                    except Exception as e:
+                        print(f"Warning: Could not clean up some temporary files: {e}")
+                else:
+                    print("Error in getting highlight")
             else:
-                print("Error in getting highlight")
+                print("No transcriptions found")
         else:
-            print("No transcriptions found")
+            print("No audio file found")
     else:
-        print("No audio file found")
-else:
-    print("Unable to process the video")
\ No newline at end of file
+        print("Unable to process the video")
+
+
+# Guard keeps spawned transcription workers from re-running the pipeline
+if __name__ == "__main__":
+    main()